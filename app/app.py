@@ -1,6 +1,6 @@
 from flask import Flask
 from app.config.config import get_config_by_name
-from app.initialize_functions import initialize_route, initialize_db, initialize_swagger
+from app.initialize_functions import initialize_route, initialize_db, initialize_swagger, initialize_metrics, initialize_logging, initialize_json
 
 def create_app(config=None) -> Flask:
     """
@@ -16,6 +16,12 @@ def create_app(config=None) -> Flask:
     if config:
         app.config.from_object(get_config_by_name(config))
 
+    # Configure logging before anything logs
+    initialize_logging(app)
+
+    # Fast JSON serialization for responses
+    initialize_json(app)
+
     # Initialize extensions
     initialize_db(app)
 
@@ -25,4 +31,7 @@ def create_app(config=None) -> Flask:
     # Initialize Swagger
     initialize_swagger(app)
 
+    # Expose metrics
+    initialize_metrics(app)
+
     return app
@@ -0,0 +1,109 @@
+"""
+Asyncio (ASGI) serving mode for the fog API.
+
+The sync Flask app under gunicorn ties up a worker thread for as long as a
+request waits on the camera or the cloud. In this mode the early-detection
+endpoint is served natively on the event loop (see
+Cloud_fogController.early_detection_async): camera capture and cloud upload
+are awaited on an I/O thread pool and frame analysis runs on a CPU thread
+pool, so one process can hold hundreds of in-flight sensor requests. Every
+other route is delegated unchanged to the Flask app through asgiref's
+WSGI adapter.
+
+Run with:
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+
+import logging
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qsl
+from asgiref.wsgi import WsgiToAsgi
+from flask import Flask
+from werkzeug.datastructures import Headers
+from app.app import create_app
+from app.modules.cloud_fog.route import get_cloud_fog_controller, parse_early_detection_args
+
+logger = logging.getLogger(__name__)
+
+EARLY_DETECTION_PATH = '/api/v1/cloud_fog/early-detection'
+
+
+class FogASGIApp:
+    """ASGI application serving early detection asynchronously."""
+
+    def __init__(self, flask_app: Flask):
+        """
+        Initialize the ASGI application.
+
+        Args:
+            flask_app: Flask app serving every other route
+        """
+        self.flask_app = flask_app
+        self.wsgi_app = WsgiToAsgi(flask_app)
+
+    async def __call__(self, scope: Dict[str, Any], receive, send) -> None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+
+        if (scope['type'] == 'http' and scope['method'] == 'GET'
+                and scope['path'].rstrip('/') == EARLY_DETECTION_PATH):
+            await self._early_detection(scope, send)
+            return
+
+        await self.wsgi_app(scope, receive, send)
+
+    async def _early_detection(self, scope: Dict[str, Any], send) -> None:
+        """Serve GET /early-detection on the event loop."""
+        try:
+            args = dict(parse_qsl(scope.get('query_string', b'').decode('latin-1')))
+            headers = Headers([(k.decode('latin-1'), v.decode('latin-1')) for k, v in scope.get('headers', [])])
+            controller = get_cloud_fog_controller()
+
+            params, error = parse_early_detection_args(args, controller.camera_registry.ids(), headers)
+            if error:
+                await self._send_json(send, 400, {'success': False, 'error': error})
+                return
+
+            result = await controller.profiler.call_async(controller.early_detection_async, **params)
+            await self._send_json(send, 200, {'success': True, 'data': result})
+
+        except Exception as e:
+            logger.error("Async early detection failed: %s", e)
+            await self._send_json(send, 500, {'success': False, 'error': f"Detection failed: {str(e)}"})
+
+    async def _send_json(self, send, status: int, payload: Dict[str, Any]) -> None:
+        """Send a JSON response serialized like Flask's jsonify."""
+        body = (self.flask_app.json.dumps(payload) + '\n').encode('utf-8')
+        headers: List[Tuple[bytes, bytes]] = [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii')),
+        ]
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def _lifespan(self, receive, send) -> None:
+        """Handle ASGI startup/shutdown, releasing the controller thread pools."""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                from app.modules.cloud_fog import route
+                if route._cloud_fog_controller is not None:
+                    route._cloud_fog_controller.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def create_asgi_app(config=None) -> FogASGIApp:
+    """
+    Create the ASGI application.
+
+    Args:
+        config: The configuration name passed to create_app.
+
+    Returns:
+        An ASGI application instance.
+    """
+    return FogASGIApp(create_app(config))
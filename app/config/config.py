@@ -1,25 +1,44 @@
+import os
+
+
 class BaseConfig:
     """Base configuration."""
     DEBUG = False
     TESTING = False
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = 'your-secret-key'
+    # Optional startup work, skipped unless enabled (faster worker boot)
+    DB_ENABLED = os.getenv('DB_ENABLED', 'false').lower() == 'true'
+    SWAGGER_ENABLED = os.getenv('SWAGGER_ENABLED', 'false').lower() == 'true'
+    # Prometheus scrape endpoint at /metrics
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    # Root logging through a non-blocking queue, rate-limited per call site
+    LOG_CONFIGURE = os.getenv('LOG_CONFIGURE', 'true').lower() == 'true'
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_RATE_LIMIT = int(os.getenv('LOG_RATE_LIMIT', '100'))
+    LOG_RATE_INTERVAL = float(os.getenv('LOG_RATE_INTERVAL', '10'))
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
 
 class DevelopmentConfig(BaseConfig):
     """Development configuration."""
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///development.db'
+    SWAGGER_ENABLED = os.getenv('SWAGGER_ENABLED', 'true').lower() == 'true'
 
 class TestingConfig(BaseConfig):
     """Testing configuration."""
     DEBUG = True
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///testing.db'
+    # pytest captures logging itself
+    LOG_CONFIGURE = False
 
 class ProductionConfig(BaseConfig):
     """Production configuration."""
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = 'sqlite:///production.db'
+    # Swagger UI off: the spec is precomputed and served from /api/v1/openapi.json
+    SWAGGER_ENABLED = False
 
 
 def get_config_by_name(config_name):
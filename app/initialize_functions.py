@@ -1,8 +1,7 @@
 from app.modules.cloud_fog.route import cloud_fog_bp
-from flask import Flask
-from flasgger import Swagger
+from flask import Flask, Response
 from app.modules.main.route import main_bp
-from app.db.db import db
+from app.openapi import register_spec_route
 
 
 def initialize_route(app: Flask):
@@ -12,11 +11,51 @@ def initialize_route(app: Flask):
 
 
 def initialize_db(app: Flask):
+    # SQLAlchemy is only imported when the database is enabled (no models use it yet)
+    if not app.config.get('DB_ENABLED'):
+        return
+    from app.db.db import db
     with app.app_context():
         db.init_app(app)
         db.create_all()
 
+def initialize_logging(app: Flask):
+    # Request threads only enqueue records; a listener thread writes them
+    if not app.config.get('LOG_CONFIGURE'):
+        return
+    from app.utils.log_util import configure_logging
+    configure_logging(
+        level=app.config.get('LOG_LEVEL', 'INFO'),
+        max_records=app.config.get('LOG_RATE_LIMIT', 100),
+        interval=app.config.get('LOG_RATE_INTERVAL', 10.0),
+        queue_size=app.config.get('LOG_QUEUE_SIZE', 10000)
+    )
+
+def initialize_json(app: Flask):
+    # orjson-backed jsonify when installed (same output as the default provider)
+    from app.utils.json_util import OrjsonProvider, fast_json_available
+    if fast_json_available():
+        app.json = OrjsonProvider(app)
+
+def initialize_metrics(app: Flask):
+    # Prometheus text format, outside the JSON API (and its OpenAPI spec)
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    from app.utils.metrics_util import CONTENT_TYPE, REGISTRY
+
+    def metrics():
+        return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+    app.add_url_rule('/metrics', 'metrics', metrics, methods=['GET'])
+
 def initialize_swagger(app: Flask):
+    # Precomputed spec is always served from disk (see app/openapi.py)
+    register_spec_route(app)
+
+    # Flasgger (Swagger UI + runtime docstring parsing) is only loaded when enabled
+    if not app.config.get('SWAGGER_ENABLED'):
+        return None
+    from flasgger import Swagger
     with app.app_context():
         swagger = Swagger(app)
-        return swagger
\ No newline at end of file
+        return swagger
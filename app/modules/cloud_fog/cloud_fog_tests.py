@@ -1,5 +1,6 @@
 import unittest
 import json
+import numpy as np
 
 from app.modules.cloud_fog.controller import Cloud_fogController
 
@@ -8,3 +9,740 @@ def test_index():
     cloud_fog_controller = Cloud_fogController()
     result = cloud_fog_controller.index()
     assert result == {'message': 'Hello, World!'}
+
+
+def test_camera_registry_from_env(monkeypatch):
+    from app.utils.camera_registry import CameraRegistry
+    monkeypatch.setenv('CAMERAS', json.dumps([
+        {'id': 'north', 'ip': '10.0.0.1'},
+        {'id': 'south', 'url': 'http://10.0.0.2:9000/stream'}
+    ]))
+    registry = CameraRegistry.from_env()
+    assert registry.ids() == ['north', 'south']
+    assert registry.get('north').video_url == 'http://10.0.0.1:8080/video'
+    assert registry.get('south').video_url == 'http://10.0.0.2:9000/stream'
+
+
+def test_early_detection_analyzes_cameras_concurrently(monkeypatch):
+    import time
+    from app.utils.camera_util import CameraUtil
+    from app.utils.camera_registry import CameraRegistry
+
+    def slow_capture(self, num_frames=24, delay=0.1, **kwargs):
+        time.sleep(0.2)
+        return [np.full((48, 64, 3), 200, dtype=np.uint8)]
+
+    monkeypatch.setattr(CameraUtil, 'capture_frames', slow_capture)
+    cloud_fog_controller = Cloud_fogController()
+    cloud_fog_controller.camera_registry = CameraRegistry(
+        [CameraUtil(camera_ip=f'10.0.0.{i}', camera_id=f'cam{i}') for i in range(8)]
+    )
+    monkeypatch.setattr(cloud_fog_controller, '_upload_to_cloud', lambda data: {'success': True})
+
+    start = time.perf_counter()
+    result = cloud_fog_controller.early_detection(temperature=15.0, humidity=95.0)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 8 * 0.2
+    assert sorted(result['camera_results']) == [f'cam{i}' for i in range(8)]
+    assert result['detection_results']['analysis_details']['frames_analyzed'] == 8
+
+    # The controller's shutdown also releases the camera capture pool
+    cloud_fog_controller.shutdown()
+    assert cloud_fog_controller.camera_registry._executor is None
+
+
+def test_analyze_frames_groups_near_duplicate_frames():
+    from app.utils.detection_util import DetectionUtil
+
+    rng = np.random.default_rng(0)
+    scene = rng.integers(0, 255, (120, 160, 3), dtype=np.uint8)
+    other = rng.integers(0, 255, (120, 160, 3), dtype=np.uint8)
+    frames = [scene.copy() for _ in range(20)] + [other.copy() for _ in range(4)]
+
+    detection_util = DetectionUtil()
+    gated = detection_util.analyze_frames(frames)
+    detection_util.frame_diff_threshold = 0
+    exhaustive = detection_util.analyze_frames(frames)
+
+    assert gated['analysis_details']['distinct_frames'] == 2
+    assert exhaustive['analysis_details']['distinct_frames'] == 24
+    for key in ('probability_fog', 'probability_smoke', 'probability_vapor', 'probability_smug'):
+        assert gated[key] == exhaustive[key]
+
+
+class FakeVideoCapture:
+    """Stand-in for cv2.VideoCapture serving a constant frame."""
+    reads = 0
+
+    def __init__(self, url):
+        self.frame = np.full((48, 64, 3), 180, dtype=np.uint8)
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        FakeVideoCapture.reads += 1
+        return True, self.frame
+
+    def release(self):
+        pass
+
+
+def test_repeated_breach_is_served_from_detection_cache(monkeypatch):
+    from app.utils import camera_util
+    monkeypatch.setattr(camera_util.cv2, 'VideoCapture', FakeVideoCapture)
+    cloud_fog_controller = Cloud_fogController()
+    cloud_fog_controller.FRAME_DELAY = 0
+    monkeypatch.setattr(cloud_fog_controller, '_upload_to_cloud', lambda data: {'success': True})
+
+    FakeVideoCapture.reads = 0
+    first = cloud_fog_controller.early_detection(temperature=15.0, humidity=95.0)
+    assert FakeVideoCapture.reads == cloud_fog_controller.num_frames
+
+    FakeVideoCapture.reads = 0
+    second = cloud_fog_controller.early_detection(temperature=15.3, humidity=95.5)
+    assert FakeVideoCapture.reads == 1
+    assert second['detection_results']['probability_fog'] == first['detection_results']['probability_fog']
+    assert cloud_fog_controller.detection_cache_stats()['hits'] == 1
+
+    # Cache hits are not new observations: the smoothed state is not updated again
+    for _ in range(3):
+        cloud_fog_controller.early_detection(temperature=15.3, humidity=95.5)
+    assert cloud_fog_controller.detection_state('default')['cameras']['default']['samples'] == 1
+
+
+def test_concurrent_requests_share_one_camera_analysis(monkeypatch):
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from app.utils.camera_util import CameraUtil
+
+    streams = []
+
+    def slow_capture(self, num_frames=24, delay=0.1, **kwargs):
+        streams.append(self.camera_id)
+        time.sleep(0.3)
+        return [np.full((48, 64, 3), 200, dtype=np.uint8)]
+
+    monkeypatch.setattr(CameraUtil, 'capture_frames', slow_capture)
+    cloud_fog_controller = Cloud_fogController()
+    monkeypatch.setattr(cloud_fog_controller, '_upload_to_cloud', lambda data: {'success': True})
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(cloud_fog_controller.early_detection, 15.0, 95.0)
+                   for _ in range(4)]
+        results = [future.result() for future in futures]
+
+    assert streams == ['default']
+    coalesced = [r['camera_results']['default']['analysis_details'].get('coalesced', False)
+                 for r in results]
+    assert coalesced.count(True) == 3
+
+
+def test_temporal_smoother_debounces_detections():
+    from app.utils.temporal_smoother import TemporalSmoother
+
+    def sample(probability_fog):
+        return {
+            'fog_detected': probability_fog > 0.45, 'smoke_detected': False,
+            'probability_fog': probability_fog, 'probability_smoke': 0.0,
+            'probability_vapor': 0.0, 'probability_smug': 0.0,
+            'analysis_details': {'frames_analyzed': 8}
+        }
+
+    smoother = TemporalSmoother(alpha=0.5, hysteresis=0.1)
+    decisions = [smoother.update('default', sample(p), threshold=0.5)['fog_detected']
+                 for p in (0.9, 0.3, 0.6, 0.3, 0.1)]
+
+    # 0.9 -> 0.6 -> 0.6 -> 0.45 stay on above the off threshold (0.4), 0.275 turns off
+    assert decisions == [True, True, True, True, False]
+    assert smoother.state()['default']['samples'] == 5
+
+    # Switching on uses the detection threshold itself, like analyze_frames
+    smoother.reset()
+    assert smoother.update('default', sample(0.46), threshold=0.45)['fog_detected'] is True
+
+
+def test_asgi_early_detection_serves_concurrent_requests(monkeypatch):
+    import time
+    import asyncio
+    from app.utils.camera_util import CameraUtil
+    from app.modules.cloud_fog import route
+    from app.asgi_app import create_asgi_app
+
+    streams = []
+
+    def slow_capture(self, num_frames=24, delay=0.1, **kwargs):
+        streams.append(self.camera_id)
+        time.sleep(0.3)
+        return [np.full((48, 64, 3), 200, dtype=np.uint8)]
+
+    monkeypatch.setattr(CameraUtil, 'capture_frames', slow_capture)
+    cloud_fog_controller = Cloud_fogController()
+    monkeypatch.setattr(cloud_fog_controller, '_upload_to_cloud', lambda data: {'success': True})
+    monkeypatch.setattr(route, '_cloud_fog_controller', cloud_fog_controller)
+    asgi_app = create_asgi_app('testing')
+
+    async def get(query):
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {'type': 'http', 'method': 'GET', 'path': '/api/v1/cloud_fog/early-detection',
+                 'query_string': query}
+        await asgi_app(scope, receive, send)
+        return messages[0]['status'], json.loads(messages[1]['body'])
+
+    async def run():
+        return await asyncio.gather(*(get(b'temperature=15&humidity=95') for _ in range(50)),
+                                    get(b'temperature=15'))
+
+    responses = asyncio.run(run())
+    cloud_fog_controller.shutdown()
+
+    assert streams == ['default']
+    assert all(status == 200 and body['success'] for status, body in responses[:50])
+    assert responses[50] == (400, {'success': False, 'error': 'Missing required parameter: humidity'})
+
+
+def test_batch_early_detection_analyzes_each_camera_once(monkeypatch):
+    from app.app import create_app
+    from app.utils.camera_util import CameraUtil
+    from app.utils.camera_registry import CameraRegistry
+    from app.modules.cloud_fog import route
+
+    streams = []
+
+    def capture(self, num_frames=24, delay=0.1, **kwargs):
+        streams.append(self.camera_id)
+        return [np.full((48, 64, 3), 200, dtype=np.uint8)]
+
+    monkeypatch.setattr(CameraUtil, 'capture_frames', capture)
+    cloud_fog_controller = Cloud_fogController()
+    cloud_fog_controller.camera_registry = CameraRegistry(
+        [CameraUtil(camera_ip='10.0.0.1', camera_id='north'), CameraUtil(camera_ip='10.0.0.2', camera_id='south')]
+    )
+    uploads = []
+    monkeypatch.setattr(cloud_fog_controller, '_upload_to_cloud',
+                        lambda data: uploads.append(data) or {'success': True})
+    monkeypatch.setattr(route, '_cloud_fog_controller', cloud_fog_controller)
+    client = create_app('testing').test_client()
+
+    readings = [
+        {'sensor_id': 's1', 'temperature': 15.0, 'humidity': 95.0, 'camera_id': 'north'},
+        {'sensor_id': 's2', 'temperature': 16.0, 'humidity': 96.0, 'camera_id': 'north'},
+        {'sensor_id': 's3', 'temperature': 45.0, 'humidity': 20.0},
+        {'sensor_id': 's4', 'temperature': 25.0, 'humidity': 50.0},
+    ]
+    response = client.post('/api/v1/cloud_fog/early-detection/batch', json={'readings': readings})
+    cloud_fog_controller.shutdown()
+
+    assert response.status_code == 200
+    data = response.json['data']
+    assert sorted(streams) == ['north', 'south']
+    assert data['summary'] == {'readings': 4, 'triggered': 3, 'cameras_analyzed': ['north', 'south'], 'uploaded': 4}
+    assert [r['threshold_check']['conditions_detected'] for r in data['readings']] == [['FOG'], ['FOG'], ['SMOKE'], []]
+    assert len(uploads) == 4
+
+    response = client.post('/api/v1/cloud_fog/early-detection/batch',
+                           json={'readings': [{'temperature': 15.0}]})
+    assert response.status_code == 400
+    assert response.json['error'] == 'readings[0]: Missing required parameter: humidity'
+
+    # camera_id may be a list; other types and unsupported fields are 400s, not 500s
+    reading = {'temperature': 15.0, 'humidity': 95.0}
+    response = client.post('/api/v1/cloud_fog/early-detection/batch',
+                           json={'readings': [dict(reading, camera_id=['north', 'south'])]})
+    assert response.status_code == 200
+    for bad, error in (({'camera_id': 7}, 'camera_id must be a string or a list of strings'),
+                       ({'camera_id': ['north', 1]}, 'camera_id must be a string or a list of strings'),
+                       ({'tiles': '2x2'}, 'Unsupported parameter in batch readings: tiles')):
+        response = client.post('/api/v1/cloud_fog/early-detection/batch',
+                               json={'readings': [reading, dict(reading, **bad)]})
+        assert response.status_code == 400
+        assert response.json['error'] == f'readings[1]: {error}'
+
+
+def test_threshold_engine_vectorized_matches_scalar():
+    from app.utils.threshold_util import ThresholdEngine
+
+    engine = ThresholdEngine()
+    rng = np.random.default_rng(0)
+    temperatures = np.round(rng.uniform(-10.0, 60.0, 2000), 1)
+    humidities = np.round(rng.uniform(0.0, 100.0, 2000), 1)
+    # Exact boundaries are inclusive
+    temperatures[:4] = [1.0, 20.0, 38.0, 15.0]
+    humidities[:4] = [90.0, 90.0, 30.0, 89.9]
+
+    masks = engine.evaluate(temperatures, humidities)
+
+    for index, (t, h) in enumerate(zip(temperatures, humidities)):
+        assert engine.match(t, h) == {name: bool(mask[index]) for name, mask in masks.items()}
+    assert masks['FOG'][:4].tolist() == [True, True, False, False]
+    assert masks['SMOKE'][:4].tolist() == [False, False, True, False]
+
+    check = engine.check(15.0, 95.0)
+    assert check['conditions_detected'] == ['FOG']
+    assert check['thresholds']['fog'] == {'humidity': '>= 90.0%', 'temperature': '1.0°C - 20.0°C'}
+
+    frost = ThresholdEngine({'FROST': {'temperature': {'max': 0.0}}})
+    assert frost.evaluate([-5.0, 5.0], [50.0, 50.0])['FROST'].tolist() == [True, False]
+
+
+def test_thresholds_hot_reload(monkeypatch, tmp_path):
+    import json
+    from app.app import create_app
+    from app.modules.cloud_fog.controller import Cloud_fogController
+    from app.modules.cloud_fog import route
+    from app.utils.threshold_config import ThresholdStore
+
+    path = tmp_path / 'thresholds.json'
+    path.write_text(json.dumps({'detection': {'fog_brightness_threshold': 120}}))
+    monkeypatch.setenv('THRESHOLDS_FILE', str(path))
+    monkeypatch.setenv('THRESHOLDS_POLL_INTERVAL', '0')
+    cloud_fog_controller = Cloud_fogController()
+    monkeypatch.setattr(route, '_cloud_fog_controller', cloud_fog_controller)
+    client = create_app('testing').test_client()
+
+    data = client.get('/api/v1/cloud_fog/thresholds').json['data']
+    assert data['detection']['fog_brightness_threshold'] == 120
+    assert data['rules']['FOG']['humidity'] == {'min': 90.0}
+    snapshot = cloud_fog_controller.thresholds
+
+    # Updating through the API writes the file; another worker picks it up
+    other_worker = ThresholdStore(path=str(path), poll_interval=0)
+    response = client.post('/api/v1/cloud_fog/thresholds', json={
+        'detection': {'detection_threshold': 0.6},
+        'rules': {'FOG': {'humidity': {'min': 80}}}
+    })
+    assert response.status_code == 200
+    assert response.json['data']['version'] == snapshot.version + 1
+    assert cloud_fog_controller.threshold_engine.match(25.0, 85.0) == {'FOG': True}
+    assert other_worker.current().detection_util.detection_threshold == 0.6
+    assert other_worker.current().detection_util.fog_brightness_threshold == 120
+    # The old snapshot is untouched for requests still holding it
+    assert snapshot.detection_util.detection_threshold == 0.45
+
+    response = client.post('/api/v1/cloud_fog/thresholds', json={'detection': {'fog_brightnes': 1}})
+    assert response.status_code == 400
+    assert response.json['error'] == "Unknown detection threshold 'fog_brightnes'"
+
+    # An invalid file is ignored and the previous snapshot stays active
+    path.write_text('{"rules": {"FOG": {"pressure": {"min": 1}}}}')
+    assert other_worker.current().engine.rules == {'FOG': {'humidity': {'min': 80}}}
+
+
+def test_detection_threshold_update_changes_the_decision(monkeypatch):
+    from app.app import create_app
+    from app.modules.cloud_fog import route
+    from app.utils import camera_util
+
+    monkeypatch.setattr(camera_util.cv2, 'VideoCapture', FakeVideoCapture)
+    cloud_fog_controller = Cloud_fogController()
+    cloud_fog_controller.FRAME_DELAY = 0
+    monkeypatch.setattr(cloud_fog_controller, '_upload_to_cloud', lambda data: {'success': True})
+    monkeypatch.setattr(route, '_cloud_fog_controller', cloud_fog_controller)
+    client = create_app('testing').test_client()
+
+    def detect():
+        response = client.get('/api/v1/cloud_fog/early-detection?temperature=15&humidity=95')
+        return response.json['data']['camera_results']['default']
+
+    def set_threshold(value):
+        response = client.post('/api/v1/cloud_fog/thresholds', json={'detection': {'detection_threshold': value}})
+        assert response.status_code == 200
+
+    probability_fog = detect()['probability_fog']
+    cloud_fog_controller.temporal_smoother.reset()
+
+    set_threshold(probability_fog - 0.1)
+    assert detect()['fog_detected'] is True
+    set_threshold(min(probability_fog + 0.1, 1.0))
+    assert detect()['fog_detected'] is False
+    assert cloud_fog_controller.detection_state()['on_threshold'] == min(probability_fog + 0.1, 1.0)
+
+
+def test_integral_grid_stats_match_direct_computation():
+    from app.utils.detection_util import DetectionUtil
+
+    detection_util = DetectionUtil()
+    gray = np.random.default_rng(1).integers(0, 256, (481, 643), dtype=np.uint8)
+    integrals = detection_util._integral_images(gray)
+
+    for grid in (1, 3, 16):
+        means, stds = detection_util._grid_stats(integrals, grid)
+        ys = np.linspace(0, gray.shape[0], grid + 1).astype(int)
+        xs = np.linspace(0, gray.shape[1], grid + 1).astype(int)
+        for i in range(grid):
+            for j in range(grid):
+                cell = gray[ys[i]:ys[i + 1], xs[j]:xs[j + 1]]
+                assert np.isclose(means[i, j], cell.mean())
+                assert np.isclose(stds[i, j], cell.std())
+
+
+def test_texture_std_float32_matches_float64():
+    import cv2
+    from app.utils.detection_util import DetectionUtil
+
+    detection_util = DetectionUtil()
+    gray = np.random.default_rng(2).integers(0, 256, (120, 160), dtype=np.uint8)
+    gray_float = gray.astype(float)
+    mean_filtered = cv2.blur(gray_float, (15, 15))
+    expected = np.sqrt(np.maximum(cv2.blur((gray_float - mean_filtered) ** 2, (15, 15)), 0))
+
+    local_std = detection_util._texture_std(gray)
+
+    assert local_std.dtype == np.float32
+    assert np.allclose(local_std, expected, atol=1e-3)
+    # Scratch buffers are reused on the same thread
+    assert detection_util._texture_std(gray) is local_std
+
+
+def test_region_of_interest_restricts_analysis(monkeypatch):
+    import json
+    from app.utils.camera_registry import CameraRegistry
+    from app.utils.detection_util import DetectionUtil
+
+    monkeypatch.setenv('CAMERAS', json.dumps([
+        {'id': 'north', 'ip': '10.0.0.1', 'roi': [[[0.5, 0.0], [1.0, 1.0], [0.0, 1.0]]]},
+        {'id': 'south', 'ip': '10.0.0.2', 'roi': [[[0.0, 0.5], [1.0, 0.5], [1.0, 1.0], [0.0, 1.0]]]},
+    ]))
+    registry = CameraRegistry.from_env()
+    rng = np.random.default_rng(3)
+    frames = [rng.integers(0, 256, (120, 160, 3), dtype=np.uint8) for _ in range(3)]
+    detection_util = DetectionUtil()
+
+    # Rectangular ROI: same result as analyzing the cropped frames
+    south = registry.get('south').roi_for(frames[0].shape)
+    assert south.mask is None
+    assert south is registry.get('south').roi_for(frames[0].shape)
+    cropped = detection_util.analyze_frames([frame[60:120] for frame in frames])
+    with_roi = detection_util.analyze_frames(frames, roi=south)
+    assert with_roi['analysis_details'].pop('roi_fraction') == 0.5
+    assert with_roi == cropped
+
+    # Polygon ROI: pixels outside the mask do not affect the result
+    north = registry.get('north').roi_for(frames[0].shape)
+    assert north.mask is not None and 0.45 < north.area_fraction < 0.55
+    outside = np.zeros(frames[0].shape[:2], dtype=bool)
+    outside[north.bbox[0]:north.bbox[1], north.bbox[2]:north.bbox[3]] = north.mask == 0
+    outside[:north.bbox[0]] = True
+    altered = [frame.copy() for frame in frames]
+    for frame in altered:
+        frame[outside] = 255
+    assert detection_util.analyze_frames(altered, roi=north) == detection_util.analyze_frames(frames, roi=north)
+
+
+def test_tiled_detection_localizes_and_matches_frame_scorers(monkeypatch):
+    import cv2
+    from app.app import create_app
+    from app.modules.cloud_fog.controller import Cloud_fogController
+    from app.modules.cloud_fog import route
+    from app.utils.camera_util import CameraUtil
+    from app.utils.detection_util import DetectionUtil
+
+    rng = np.random.default_rng(4)
+    frame = cv2.GaussianBlur(rng.integers(0, 256, (120, 160, 3), dtype=np.uint8), (15, 15), 0)
+    frame[:60, :80] = 200  # Uniform bright patch in the top-left quarter
+    detection_util = DetectionUtil()
+
+    # A 1x1 grid uses the same heuristics as the per-frame scorers
+    gray, hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    single = detection_util._score_tiles(gray, hsv, None, 1, 1)
+    assert np.isclose(single['probability_smoke'][0, 0], detection_util._detect_smoke_in_frame(frame), atol=0.01)
+    assert np.isclose(single['probability_vapor'][0, 0], detection_util._detect_vapor_in_frame(frame), atol=0.01)
+    assert np.isclose(single['probability_smug'][0, 0], detection_util._detect_smug_in_frame(frame), atol=0.01)
+
+    tiles = detection_util.analyze_frames([frame], tiles=(2, 2))['tiles']
+    assert (tiles['rows'], tiles['cols']) == (2, 2)
+    vapor = np.array(tiles['probability_vapor'])
+    assert vapor[0, 0] > 0.8 and vapor[0, 0] == vapor.max()
+
+    def capture(self, num_frames=24, delay=0.1, **kwargs):
+        return [frame]
+
+    monkeypatch.setattr(CameraUtil, 'capture_frames', capture)
+    cloud_fog_controller = Cloud_fogController()
+    monkeypatch.setattr(cloud_fog_controller, '_upload_to_cloud', lambda data: {'success': True})
+    monkeypatch.setattr(route, '_cloud_fog_controller', cloud_fog_controller)
+    client = create_app('testing').test_client()
+
+    response = client.get('/api/v1/cloud_fog/early-detection?temperature=15&humidity=95&tiles=2x2')
+    assert response.status_code == 200
+    assert response.json['data']['camera_results']['default']['tiles']['probability_vapor'] == tiles['probability_vapor']
+
+    response = client.get('/api/v1/cloud_fog/early-detection?temperature=15&humidity=95&tiles=40x2')
+    assert response.status_code == 400
+
+    # A valid grid larger than the frame allows is reduced to fit, not a failure
+    from app.utils.camera_util import CameraUtil
+    monkeypatch.setattr(CameraUtil, 'capture_frames',
+                        lambda self, **kwargs: [np.full((20, 30, 3), 180, dtype=np.uint8)])
+    cloud_fog_controller.detection_cache.max_size = 0
+    response = client.get('/api/v1/cloud_fog/early-detection?temperature=15&humidity=95&tiles=16x16')
+    assert response.status_code == 200
+    grid = response.json['data']['camera_results']['default']['tiles']
+    assert (grid['rows'], grid['cols'], grid['requested']) == (6, 10, [16, 16])
+    assert len(grid['probability_fog']) == 6 and len(grid['probability_fog'][0]) == 10
+
+
+def test_metrics_endpoint_exposes_pipeline_metrics(monkeypatch):
+    import threading
+    from app.app import create_app
+    from app.modules.cloud_fog import route
+    from app.utils import camera_util
+    from app.utils.metrics_util import FRAMES_CAPTURED, Counter, MetricsRegistry
+
+    # Per-thread shards add up to the exact total
+    counter = Counter('test_events_total', 'Test events', registry=MetricsRegistry())
+    threads = [threading.Thread(target=lambda: [counter.inc() for _ in range(1000)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.labels().value() == 8000
+
+    monkeypatch.setattr(camera_util.cv2, 'VideoCapture', FakeVideoCapture)
+    cloud_fog_controller = Cloud_fogController()
+    cloud_fog_controller.FRAME_DELAY = 0
+    cloud_fog_controller.cloud_api_url = 'http://127.0.0.1:9'  # Refused: upload outcome "error"
+    monkeypatch.setattr(route, '_cloud_fog_controller', cloud_fog_controller)
+    client = create_app('testing').test_client()
+
+    captured_before = FRAMES_CAPTURED.labels('default').value()
+    assert client.get('/api/v1/cloud_fog/early-detection?temperature=15&humidity=95').status_code == 200
+    assert FRAMES_CAPTURED.labels('default').value() - captured_before == cloud_fog_controller.num_frames
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+    text = response.get_data(as_text=True)
+    assert '# TYPE fog_scorer_seconds histogram' in text
+    assert 'fog_scorer_seconds_bucket{scorer="smoke",le="+Inf"}' in text
+    assert 'fog_camera_capture_seconds_count{camera="default"}' in text
+    assert 'fog_cloud_upload_seconds_count{outcome="error"}' in text
+    assert 'fog_threshold_checks_total{triggered="true"}' in text
+
+    # Executor queue depth counts tasks waiting for a worker
+    from app.utils.executor_util import CountingThreadPoolExecutor
+    started, release = threading.Event(), threading.Event()
+    with CountingThreadPoolExecutor(max_workers=1) as executor:
+        executor.submit(lambda: (started.set(), release.wait()))
+        started.wait()
+        futures = [executor.submit(lambda: None) for _ in range(3)]
+        assert executor.queued() == 3
+        release.set()
+        for future in futures:
+            future.result()
+    assert executor.queued() == 0
+    assert 'fog_queue_depth{queue="analyses_in_flight"} 0' in text
+
+
+def test_early_detection_timings_breakdown(monkeypatch):
+    from app.app import create_app
+    from app.modules.cloud_fog import route
+    from app.utils import camera_util
+
+    monkeypatch.setattr(camera_util.cv2, 'VideoCapture', FakeVideoCapture)
+    cloud_fog_controller = Cloud_fogController()
+    cloud_fog_controller.FRAME_DELAY = 0
+    monkeypatch.setattr(cloud_fog_controller, '_upload_to_cloud', lambda data: {'success': True})
+    monkeypatch.setattr(route, '_cloud_fog_controller', cloud_fog_controller)
+    client = create_app('testing').test_client()
+
+    response = client.get('/api/v1/cloud_fog/early-detection?temperature=15&humidity=95')
+    assert 'timings' not in response.json['data']
+
+    cloud_fog_controller.detection_cache.clear()
+    response = client.get('/api/v1/cloud_fog/early-detection?temperature=15&humidity=95&timings=true')
+    timings = response.json['data']['timings']
+    for stage in ('threshold_check_ms', 'cameras_ms', 'upload_ms', 'total_ms'):
+        assert timings[stage] >= 0
+    camera = timings['cameras']['default']
+    assert len(camera['decode_per_item_ms']) == camera['frames'] == cloud_fog_controller.num_frames
+    for stage in ('connect_ms', 'color_conversion_ms', 'fog_ms', 'smoke_ms', 'vapor_ms', 'smug_ms', 'aggregation_ms'):
+        assert camera[stage] >= 0
+    assert camera['total_ms'] <= timings['total_ms']
+
+    # Header form; the repeated scene is now served from the detection cache
+    response = client.get('/api/v1/cloud_fog/early-detection?temperature=15&humidity=95',
+                          headers={'X-Fog-Timings': '1'})
+    camera = response.json['data']['timings']['cameras']['default']
+    assert camera['cache'] == 'hit' and camera['frames'] == 1 and 'smoke_ms' not in camera
+
+
+def test_profiler_samples_one_in_n_requests(monkeypatch, tmp_path):
+    from app.app import create_app
+    from app.modules.cloud_fog import route
+    from app.utils import camera_util
+    from app.utils.request_profiler import RequestProfiler
+
+    monkeypatch.setattr(camera_util.cv2, 'VideoCapture', FakeVideoCapture)
+    cloud_fog_controller = Cloud_fogController()
+    cloud_fog_controller.FRAME_DELAY = 0
+    cloud_fog_controller.detection_cache.max_size = 0
+    cloud_fog_controller.profiler = RequestProfiler(str(tmp_path), sample_every=0, interval=0.001, max_files=2)
+    monkeypatch.setattr(cloud_fog_controller, '_upload_to_cloud', lambda data: {'success': True})
+    monkeypatch.setattr(route, '_cloud_fog_controller', cloud_fog_controller)
+    client = create_app('testing').test_client()
+    url = '/api/v1/cloud_fog/early-detection?temperature=15&humidity=95'
+
+    assert 'profile' not in client.get(url).json['data']
+    assert client.post('/api/v1/cloud_fog/profiles', json={'sample_every': -1}).status_code == 400
+    response = client.post('/api/v1/cloud_fog/profiles', json={'sample_every': 2})
+    assert response.json['data']['sample_every'] == 2
+
+    names = [client.get(url).json['data'].get('profile') for _ in range(6)]
+    assert len([name for name in names if name]) == 3
+
+    # Only the newest max_files profiles are kept
+    profiles = client.get('/api/v1/cloud_fog/profiles').json['data']['profiles']
+    assert [p['name'] for p in profiles] == sorted(filter(None, names), reverse=True)[:2]
+
+    profile = client.get(f"/api/v1/cloud_fog/profiles/{profiles[0]['name']}").json['data']
+    assert profile['request']['temperature'] == 15 and profile['duration_ms'] > 0
+    folded = client.get(f"/api/v1/cloud_fog/profiles/{profiles[0]['name']}?format=folded")
+    assert folded.mimetype == 'text/plain'
+    assert client.get('/api/v1/cloud_fog/profiles/settings.json').status_code == 404
+    assert client.get('/api/v1/cloud_fog/profiles/..%2Fapp.py').status_code == 404
+
+
+def test_profiler_samples_only_the_request_threads():
+    import time
+    import asyncio
+    import threading
+    from app.utils.executor_util import CountingThreadPoolExecutor
+    from app.utils.request_profiler import StackSampler
+
+    def spin(seconds):
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            pass
+
+    def dispatched_work():
+        spin(0.05)
+
+    def neighbour_request():
+        spin(0.15)
+
+    def sampled_request(executor):
+        spin(0.05)
+        executor.submit(dispatched_work).result()
+
+    neighbour = threading.Thread(target=neighbour_request)
+    sampler = StackSampler(interval=0.001)
+    with CountingThreadPoolExecutor(max_workers=1) as executor:
+        neighbour.start()
+        sampler.start()
+        with sampler.tracking():
+            sampled_request(executor)
+        sampler.stop()
+    neighbour.join()
+
+    stacks = ';'.join(sampler.stacks)
+    assert 'sampled_request' in stacks and 'dispatched_work' in stacks
+    assert 'neighbour_request' not in stacks
+    assert len(sampler.threads_seen) == 2
+
+    # On an event loop only the sampled request's task is attributed
+    async def sampled_task():
+        await asyncio.sleep(0.02)
+
+    async def neighbour_task():
+        for _ in range(10):
+            neighbour_request_async()
+            await asyncio.sleep(0)
+
+    def neighbour_request_async():
+        spin(0.01)
+
+    async def run():
+        sampler = StackSampler(interval=0.001)
+        sampler.start()
+        neighbour = asyncio.ensure_future(neighbour_task())
+        with sampler.tracking():
+            await sampled_task()
+        await neighbour
+        sampler.stop()
+        return sampler
+
+    assert 'neighbour_request_async' not in ';'.join(asyncio.run(run()).stacks)
+
+
+def test_capture_and_analysis_log_one_summary_each(monkeypatch, caplog):
+    import logging
+    from app.utils import camera_util
+    from app.utils.camera_util import CameraUtil
+    from app.utils.detection_util import DetectionUtil
+
+    monkeypatch.setattr(camera_util.cv2, 'VideoCapture', FakeVideoCapture)
+    with caplog.at_level(logging.INFO):
+        frames = CameraUtil(camera_id='cam').capture_frames(num_frames=12, delay=0)
+        DetectionUtil().analyze_frames(frames)
+    assert [r.getMessage().split(' ')[0] for r in caplog.records] == ['Captured', 'Analyzed']
+
+    caplog.clear()
+    with caplog.at_level(logging.DEBUG, logger='app.utils.detection_util'):
+        DetectionUtil().analyze_frames(frames)
+    details = [r for r in caplog.records if r.levelno == logging.DEBUG]
+    assert len(details) == 1
+    assert {'fog', 'smoke', 'vapor', 'smug'} <= set(details[0].args[0][0])
+
+
+def test_queued_logging_is_rate_limited_per_call_site():
+    import io
+    import time
+    import logging
+    from app.utils.log_util import configure_logging, shutdown_logging
+
+    stream = io.StringIO()
+    configure_logging(level='INFO', fmt='%(message)s', max_records=2, interval=0.2, stream=stream)
+    try:
+        log = logging.getLogger('app.tests.rate_limit')
+        for i in range(6):
+            if i == 5:
+                time.sleep(0.25)  # Next window
+            log.warning("camera down %d", i)
+    finally:
+        shutdown_logging()
+    assert stream.getvalue().splitlines() == [
+        'camera down 0', 'camera down 1', 'camera down 5 (3 similar records suppressed)'
+    ]
+
+
+def test_orjson_provider_parses_like_default_provider():
+    import json as stdlib_json
+    from datetime import datetime
+    from decimal import Decimal
+    from flask import Flask
+    from flask.json.provider import DefaultJSONProvider
+    from app.app import create_app
+    from app.utils.json_util import OrjsonProvider
+
+    app = create_app('testing')
+    assert isinstance(app.json, OrjsonProvider)
+
+    payload = {'success': True, 'data': {
+        'probability_fog': 0.752, 'frames': 8, 'fog_scores_range': (0.61, 0.78), 'message': 'NIEBLA ñ',
+        'temperature': Decimal('15.5'), 'at': datetime(2025, 10, 19, 10, 30), 'camera_ids': ['b', 'a']
+    }}
+    default = DefaultJSONProvider(Flask(__name__))
+    assert stdlib_json.loads(app.json.dumps(payload)) == stdlib_json.loads(default.dumps(payload))
+    assert app.json.dumps({'b': 1, 'a': np.float32(0.5)}) == '{"a":0.5,"b":1}'
+
+    # Documented byte-level differences: raw UTF-8 and compact separators
+    assert app.json.dumps({'unit': '°C'}) == '{"unit":"°C"}'
+    assert default.dumps({'unit': '°C'}) == '{"unit": "\\u00b0C"}'
+    # Options orjson cannot honor fall back to the default provider
+    assert app.json.dumps({'unit': '°C'}, ensure_ascii=True) == default.dumps({'unit': '°C'})
+    assert app.json.dumps({'a': 1, 'b': 2}, separators=(', ', ': ')) == '{"a": 1, "b": 2}'
+    assert app.json.dumps({'b': 1, 'a': 2}, sort_keys=False) == '{"b":1,"a":2}'
+
+    with app.app_context():
+        response = app.json.response(payload)
+    assert response.mimetype == 'application/json'
+    assert response.get_json() == stdlib_json.loads(default.dumps(payload))
@@ -1,10 +1,25 @@
 import os
+import copy
+import time
+import asyncio
 import requests
 import logging
-from typing import Dict, Any
+import threading
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from app.utils.camera_util import CameraUtil
+from app.utils.camera_registry import CameraRegistry
+from app.utils.detection_cache import DetectionCache
+from app.utils.executor_util import CountingThreadPoolExecutor
+from app.utils.single_flight import SingleFlight, AsyncSingleFlight
+from app.utils.stage_timer import StageTimer, timed
+from app.utils.temporal_smoother import TemporalSmoother
 from app.utils.detection_util import DetectionUtil
+from app.utils.metrics_util import QUEUE_DEPTH, THRESHOLD_CHECKS, UPLOAD_SECONDS
+from app.utils.request_profiler import RequestProfiler
+from app.utils.threshold_util import ThresholdEngine
+from app.utils.threshold_config import ThresholdSnapshot, ThresholdStore
 
 logger = logging.getLogger(__name__)
 
@@ -12,19 +27,46 @@ logger = logging.getLogger(__name__)
 class Cloud_fogController:
     """Controller for early detection system (Fog Computing layer)."""
     
-    # Thresholds for fog and smoke conditions
-    FOG_HUMIDITY_THRESHOLD = 90.0  # >= 90%
-    FOG_TEMP_MIN = 1.0             # >= 1°C
-    FOG_TEMP_MAX = 20.0            # <= 20°C
-
-    SMOKE_TEMP_THRESHOLD = 38.0    # >= 38°C
-    SMOKE_HUMIDITY_THRESHOLD = 30.0  # <= 30%
+    # Frames captured per camera when thresholds are exceeded (fewer frames
+    # are needed because results are smoothed across requests)
+    NUM_FRAMES = 8
+    FRAME_DELAY = 0.1              # seconds between frames
 
     def __init__(self):
         """Initialize controller with utilities and cloud API config."""
-        self.camera_ip = os.getenv('CAMERA_IP', '192.168.15.66')
-        self.camera_util = CameraUtil(camera_ip=self.camera_ip)
-        self.detection_util = DetectionUtil()
+        self.camera_registry = CameraRegistry.from_env()
+        self.num_frames = int(os.getenv('CAPTURE_NUM_FRAMES', str(self.NUM_FRAMES)))
+        
+        # Detection thresholds and sensor rules, hot-reloaded from THRESHOLDS_FILE
+        self.threshold_store = ThresholdStore.from_env()
+        
+        # Recent detection results keyed by scene fingerprint + sensor readings
+        self.detection_cache = DetectionCache(
+            max_size=int(os.getenv('DETECTION_CACHE_SIZE', '128')),
+            ttl=float(os.getenv('DETECTION_CACHE_TTL', '30'))
+        )
+        
+        # Coalesces concurrent analyses of the same camera into one stream
+        self.single_flight = SingleFlight()
+        self.async_single_flight = AsyncSingleFlight()
+        QUEUE_DEPTH.labels('analyses_in_flight').set_function(self.single_flight.in_flight)
+        QUEUE_DEPTH.labels('async_analyses_in_flight').set_function(self.async_single_flight.in_flight)
+        
+        # Thread pools for the asyncio serving mode (created on first use)
+        self.io_workers = int(os.getenv('ASYNC_IO_WORKERS', '64'))
+        self.cpu_workers = int(os.getenv('ASYNC_CPU_WORKERS', str(os.cpu_count() or 1)))
+        self._io_executor: Optional[CountingThreadPoolExecutor] = None
+        self._cpu_executor: Optional[CountingThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        
+        # Per-camera EWMA + hysteresis state kept across requests
+        self.temporal_smoother = TemporalSmoother(
+            alpha=float(os.getenv('DETECTION_SMOOTHING_ALPHA', '0.4')),
+            hysteresis=float(os.getenv('DETECTION_HYSTERESIS', '0.05'))
+        )
+        
+        # Samples 1-in-N early detections into PROFILE_DIR (settings changeable at runtime)
+        self.profiler = RequestProfiler.from_env()
         
         # Cloud API endpoint (from environment or default)
         self.cloud_api_url = os.getenv(
@@ -32,11 +74,29 @@ class Cloud_fogController:
             'https://YOUR_API_URL.execute-api.us-east-1.amazonaws.com'
         )
         
+    @property
+    def thresholds(self) -> ThresholdSnapshot:
+        """Current threshold snapshot (grab once per operation for consistent values)."""
+        return self.threshold_store.current()
+    
+    @property
+    def threshold_engine(self) -> ThresholdEngine:
+        """Sensor threshold rules of the current snapshot."""
+        return self.thresholds.engine
+    
+    @property
+    def detection_util(self) -> DetectionUtil:
+        """Frame analyzer configured with the current snapshot's thresholds."""
+        return self.thresholds.detection_util
+    
     def index(self):
         """Simple health check endpoint."""
         return {'message': 'Hello, World!'}
     
-    def early_detection(self, temperature: float, humidity: float) -> Dict[str, Any]:
+    def early_detection(self, temperature: float, humidity: float,
+                        camera_ids: Optional[List[str]] = None,
+                        tiles: Optional[Tuple[int, int]] = None,
+                        timings: bool = False) -> Dict[str, Any]:
         """
         Early detection system with HYBRID strategy:
         1. ALWAYS receives sensor data (temperature and humidity)
@@ -47,48 +107,34 @@ class Cloud_fogController:
         Args:
             temperature: Temperature in Celsius
             humidity: Humidity as percentage (0-100)
+            camera_ids: Cameras to analyze (default: every registered camera)
+            tiles: Optional (rows, cols) grid for per-tile probabilities
+            timings: Add a 'timings' section with per-stage milliseconds
             
         Returns:
             Dictionary with detection results and cloud upload status
         """
-        logger.info(f"Early detection started - Temp: {temperature}°C, Humidity: {humidity}%")
-        
-        result = {
-            'sensor_data': {
-                'temperature': temperature,
-                'humidity': humidity
-            },
-            'threshold_check': {},
-            'detection_results': {},
-            'cloud_upload': {}
-        }
+        logger.debug("Early detection started - Temp: %s°C, Humidity: %s%%", temperature, humidity)
+        timer = StageTimer() if timings else None
         
         # Step 1: Check thresholds
-        threshold_check = self._check_thresholds(temperature, humidity)
-        result['threshold_check'] = threshold_check
+        with timed(timer, 'threshold_check'):
+            threshold_check = self._check_thresholds(temperature, humidity)
+        result = self._new_result(temperature, humidity, threshold_check)
         
         # Step 2: Decide if video analysis is needed
         if threshold_check['should_analyze']:
-            logger.info(f"Thresholds exceeded for: {threshold_check['conditions_detected']}")
-            logger.info("Capturing 24 frames from IP camera...")
+            logger.info("Thresholds exceeded for: %s", threshold_check['conditions_detected'])
+            logger.debug("Capturing %d frames from IP cameras", self.num_frames)
             
-            # Capture frames from camera
-            frames = self.camera_util.capture_frames(num_frames=24, delay=0.1)
-            
-            if not frames:
-                logger.error("Failed to capture frames from camera")
-                result['error'] = "Camera capture failed"
-                # Use default values if camera fails
-                detection_results = self._get_default_detection_results()
-            else:
-                logger.info(f"Successfully captured {len(frames)} frames")
-                
-                # Analyze frames for fog/smoke
-                logger.info("Analyzing frames for fog/smoke detection...")
-                detection_results = self.detection_util.analyze_frames(frames)
+            # Capture and analyze every selected camera concurrently
+            with timed(timer, 'cameras'):
+                camera_results = self._analyze_cameras(temperature, humidity, camera_ids, tiles, timer)
+            with timed(timer, 'fusion'):
+                detection_results = self._apply_camera_results(result, camera_results)
         else:
             # No threshold exceeded - skip video capture (save resources)
-            logger.info("Thresholds not exceeded - Skipping video capture (sending basic data only)")
+            logger.debug("Thresholds not exceeded - Skipping video capture (sending basic data only)")
             detection_results = self._get_default_detection_results()
         
         result['detection_results'] = detection_results
@@ -102,36 +148,543 @@ class Cloud_fogController:
         )
         
         # Step 4: ALWAYS upload to cloud (for historical tracking)
-        logger.info("Uploading data to cloud...")
-        upload_status = self._upload_to_cloud(cloud_data)
+        logger.debug("Uploading data to cloud")
+        with timed(timer, 'upload'):
+            upload_status = self._upload_to_cloud(cloud_data)
         result['cloud_upload'] = upload_status
         
         # Step 5: Generate summary message
+        result['message'] = self._summary_message(threshold_check, detection_results)
+        
+        logger.info("Early detection complete (%s°C, %s%%): %s", temperature, humidity, result['message'])
+        
+        if timer is not None:
+            timer.stop()
+            result['timings'] = timer.to_dict()
+        
+        return result
+    
+    async def early_detection_async(self, temperature: float, humidity: float,
+                                    camera_ids: Optional[List[str]] = None,
+                                    tiles: Optional[Tuple[int, int]] = None,
+                                    timings: bool = False) -> Dict[str, Any]:
+        """
+        Asyncio variant of early_detection for the ASGI serving mode.
+        
+        Same steps and result as early_detection, but camera capture and
+        cloud upload are awaited on an I/O thread pool and frame analysis is
+        offloaded to a CPU thread pool, so the event loop can hold hundreds
+        of in-flight sensor requests while they wait on cameras or the cloud.
+        
+        Args:
+            temperature: Temperature in Celsius
+            humidity: Humidity as percentage (0-100)
+            camera_ids: Cameras to analyze (default: every registered camera)
+            tiles: Optional (rows, cols) grid for per-tile probabilities
+            timings: Add a 'timings' section with per-stage milliseconds
+            
+        Returns:
+            Dictionary with detection results and cloud upload status
+        """
+        logger.debug("Early detection started - Temp: %s°C, Humidity: %s%%", temperature, humidity)
+        loop = asyncio.get_running_loop()
+        timer = StageTimer() if timings else None
+        
+        with timed(timer, 'threshold_check'):
+            threshold_check = self._check_thresholds(temperature, humidity)
+        result = self._new_result(temperature, humidity, threshold_check)
+        
+        if threshold_check['should_analyze']:
+            logger.info("Thresholds exceeded for: %s", threshold_check['conditions_detected'])
+            cameras = self.camera_registry.select(camera_ids)
+            with timed(timer, 'cameras'):
+                outputs = await asyncio.gather(*(
+                    self._analyze_camera_async(camera, temperature, humidity, tiles, timer) for camera in cameras
+                ))
+            camera_results = {camera.camera_id: output for camera, output in zip(cameras, outputs)}
+            with timed(timer, 'fusion'):
+                detection_results = self._apply_camera_results(result, camera_results)
+        else:
+            logger.debug("Thresholds not exceeded - Skipping video capture (sending basic data only)")
+            detection_results = self._get_default_detection_results()
+        
+        result['detection_results'] = detection_results
+        
+        cloud_data = self._prepare_cloud_data(
+            temperature=temperature,
+            humidity=humidity,
+            detection_results=detection_results,
+            threshold_check=threshold_check
+        )
+        
+        logger.debug("Uploading data to cloud")
+        with timed(timer, 'upload'):
+            result['cloud_upload'] = await loop.run_in_executor(
+                self._get_io_executor(), self._upload_to_cloud, cloud_data
+            )
+        
+        result['message'] = self._summary_message(threshold_check, detection_results)
+        
+        logger.info("Early detection complete (%s°C, %s%%): %s", temperature, humidity, result['message'])
+        
+        if timer is not None:
+            timer.stop()
+            result['timings'] = timer.to_dict()
+        
+        return result
+    
+    def early_detection_batch(self, readings: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Early detection for a batch of readings from many sensors.
+        
+        Thresholds are evaluated for the whole batch at once with NumPy, and
+        each camera is captured and analyzed at most once per batch no matter
+        how many readings trigger it. Every reading is still uploaded to the
+        cloud individually (in parallel), as in early_detection.
+        
+        Args:
+            readings: List of validated readings, each with 'temperature',
+                'humidity', optional 'sensor_id' and optional 'camera_ids'
+            
+        Returns:
+            Dictionary with per-reading results, per-camera results and a summary
+        """
+        logger.info("Batch early detection started - %d readings", len(readings))
+        
+        temperatures = np.array([r['temperature'] for r in readings], dtype=np.float64)
+        humidities = np.array([r['humidity'] for r in readings], dtype=np.float64)
+        threshold_engine = self.threshold_engine
+        masks = threshold_engine.evaluate(temperatures, humidities)
+        triggered = np.flatnonzero(np.any(list(masks.values()), axis=0))
+        THRESHOLD_CHECKS.labels('true').inc(len(triggered))
+        THRESHOLD_CHECKS.labels('false').inc(len(readings) - len(triggered))
+        
+        # One analysis per camera: keyed with the first reading that needs it
+        camera_readings: Dict[str, Dict[str, Any]] = {}
+        for index in triggered:
+            reading = readings[index]
+            for camera_id in reading.get('camera_ids') or self.camera_registry.ids():
+                camera_readings.setdefault(camera_id, reading)
+        
+        camera_results: Dict[str, Dict[str, Any]] = {}
+        if camera_readings:
+            logger.info("Thresholds exceeded by %d readings - analyzing cameras %s", len(triggered), list(camera_readings))
+            camera_results = self.camera_registry.map(
+                lambda camera: self._analyze_camera_coalesced(
+                    camera,
+                    camera_readings[camera.camera_id]['temperature'],
+                    camera_readings[camera.camera_id]['humidity']
+                ),
+                list(camera_readings)
+            )
+        
+        results = []
+        cloud_payloads = []
+        for index, reading in enumerate(readings):
+            threshold_check = threshold_engine.check_result(
+                {name: mask[index] for name, mask in masks.items()}
+            )
+            result = self._new_result(reading['temperature'], reading['humidity'], threshold_check)
+            result['sensor_id'] = reading.get('sensor_id', str(index))
+            
+            if threshold_check['should_analyze']:
+                camera_ids = reading.get('camera_ids') or self.camera_registry.ids()
+                detection_results = self._apply_camera_results(
+                    result, {camera_id: camera_results[camera_id] for camera_id in camera_ids}
+                )
+                # Per-camera results are reported once for the whole batch
+                del result['camera_results']
+                result['cameras'] = camera_ids
+            else:
+                detection_results = self._get_default_detection_results()
+            
+            result['detection_results'] = detection_results
+            result['message'] = self._summary_message(threshold_check, detection_results)
+            results.append(result)
+            cloud_payloads.append(self._prepare_cloud_data(
+                temperature=reading['temperature'],
+                humidity=reading['humidity'],
+                detection_results=detection_results,
+                threshold_check=threshold_check
+            ))
+        
+        logger.debug("Uploading %d records to cloud", len(cloud_payloads))
+        for result, upload_status in zip(results, self._get_io_executor().map(self._upload_to_cloud, cloud_payloads)):
+            result['cloud_upload'] = upload_status
+        
+        return {
+            'readings': results,
+            'camera_results': camera_results,
+            'summary': {
+                'readings': len(readings),
+                'triggered': int(len(triggered)),
+                'cameras_analyzed': list(camera_results),
+                'uploaded': sum(1 for r in results if r['cloud_upload'].get('success'))
+            }
+        }
+    
+    def detection_cache_stats(self) -> Dict[str, Any]:
+        """Return detection cache configuration and hit/miss counters."""
+        return self.detection_cache.stats()
+    
+    def threshold_config(self) -> Dict[str, Any]:
+        """Return the active thresholds and where they were loaded from."""
+        return self.thresholds.to_dict()
+    
+    def update_thresholds(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply new thresholds without restarting.
+        
+        Args:
+            config: Partial configuration ('detection' values and/or 'rules')
+            
+        Returns:
+            The new active thresholds
+            
+        Raises:
+            ValueError: If the configuration is invalid
+        """
+        return self.threshold_store.update(config).to_dict()
+    
+    def profiling_status(self) -> Dict[str, Any]:
+        """Return the profiler settings and the stored profiles (newest first)."""
+        return {**self.profiler.settings(), 'profiles': self.profiler.list_profiles()}
+    
+    def update_profiling(self, settings: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Change the profiler sampling without restarting.
+        
+        Args:
+            settings: 'sample_every' (0 disables sampling) and/or 'interval_ms'
+            
+        Returns:
+            The new profiler settings
+            
+        Raises:
+            ValueError: If profiling is disabled or the settings are invalid
+        """
+        return self.profiler.update(settings)
+    
+    def get_profile(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return a stored profile, or None if it does not exist."""
+        return self.profiler.load(name)
+    
+    def detection_state(self, camera_id: Optional[str] = None) -> Dict[str, Any]:
+        """Return the smoothed per-camera detection state."""
+        on_threshold = self.detection_util.detection_threshold
+        return {
+            'alpha': self.temporal_smoother.alpha,
+            'on_threshold': on_threshold,
+            'off_threshold': round(on_threshold - self.temporal_smoother.hysteresis, 3),
+            'cameras': self.temporal_smoother.state(camera_id)
+        }
+    
+    def _new_result(self, temperature: float, humidity: float,
+                    threshold_check: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the response skeleton for an early detection call."""
+        return {
+            'sensor_data': {
+                'temperature': temperature,
+                'humidity': humidity
+            },
+            'threshold_check': threshold_check,
+            'detection_results': {},
+            'cloud_upload': {}
+        }
+    
+    def _apply_camera_results(self, result: Dict[str, Any],
+                              camera_results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Attach per-camera results to the response and fuse them.
+        
+        Returns:
+            Fused detection results, or default results if no camera delivered frames
+        """
+        result['camera_results'] = camera_results
+        detection_results = self.detection_util.fuse_results(camera_results)
+        
+        if not detection_results['analysis_details']['frames_analyzed']:
+            logger.error("Failed to capture frames from camera")
+            result['error'] = "Camera capture failed"
+            # Use default values if camera fails
+            detection_results = self._get_default_detection_results()
+        
+        return detection_results
+    
+    def _summary_message(self, threshold_check: Dict[str, Any],
+                         detection_results: Dict[str, Any]) -> str:
+        """Generate the summary message of an early detection call."""
         if threshold_check['should_analyze']:
             if detection_results['fog_detected']:
-                result['message'] = f"FOG DETECTED ({detection_results['probability_fog']*100:.1f}%) - Video analyzed - Data uploaded to cloud"
+                return f"FOG DETECTED ({detection_results['probability_fog']*100:.1f}%) - Video analyzed - Data uploaded to cloud"
             elif detection_results['smoke_detected']:
-                result['message'] = f"SMOKE DETECTED ({detection_results['probability_smoke']*100:.1f}%) - Video analyzed - Data uploaded to cloud"
+                return f"SMOKE DETECTED ({detection_results['probability_smoke']*100:.1f}%) - Video analyzed - Data uploaded to cloud"
             else:
-                result['message'] = "Threshold exceeded - Video analyzed - Data uploaded to cloud"
-        else:
-            result['message'] = "Normal conditions - Basic data uploaded to cloud (no video analysis)"
+                return "Threshold exceeded - Video analyzed - Data uploaded to cloud"
+        return "Normal conditions - Basic data uploaded to cloud (no video analysis)"
+    
+    def _analyze_cameras(self, temperature: float, humidity: float,
+                         camera_ids: Optional[List[str]] = None,
+                         tiles: Optional[Tuple[int, int]] = None,
+                         timer: Optional[StageTimer] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Capture and analyze frames from the selected cameras in parallel.
         
-        logger.info(f"Early detection complete: {result['message']}")
+        Each camera is captured and analyzed in its own thread, so latency is
+        bounded by the slowest camera rather than the number of cameras.
         
-        return result
+        Args:
+            temperature: Temperature in Celsius (part of the cache key)
+            humidity: Humidity as percentage (part of the cache key)
+            camera_ids: Cameras to analyze (default: every registered camera)
+            tiles: Optional (rows, cols) grid for per-tile probabilities
+            timer: Optional request StageTimer (one child timer per camera)
+            
+        Returns:
+            Dictionary camera_id -> detection results
+        """
+        return self.camera_registry.map(
+            lambda camera: self._analyze_camera_coalesced(camera, temperature, humidity, tiles, timer),
+            camera_ids
+        )
+    
+    def _analyze_camera_coalesced(self, camera: CameraUtil, temperature: float, humidity: float,
+                                  tiles: Optional[Tuple[int, int]] = None,
+                                  timer: Optional[StageTimer] = None) -> Dict[str, Any]:
+        """
+        Analyze a camera, sharing the result with concurrent requests.
+        
+        Requests that arrive while an analysis of the same camera is in flight
+        wait for it and reuse its result, so each camera serves at most one
+        stream regardless of how many sensors report at the same time. The
+        leader folds the result into the camera's temporal state exactly once.
+        
+        Args:
+            camera: Camera to capture from
+            temperature: Temperature in Celsius
+            humidity: Humidity as percentage
+            tiles: Optional (rows, cols) grid for per-tile probabilities
+            timer: Optional request StageTimer; only the leader records the
+                stage breakdown, a coalesced caller records its wait
+            
+        Returns:
+            Smoothed detection results for this camera
+        """
+        camera_timer = timer.child(camera.camera_id) if timer is not None else None
+        
+        def analyze() -> Dict[str, Any]:
+            # One snapshot for the cache key, the analysis and the smoothing decision
+            thresholds = self.thresholds
+            detection_results = self._analyze_camera(camera, temperature, humidity, tiles, camera_timer, thresholds)
+            return self._smooth(camera, detection_results, thresholds)
+        
+        detection_results, shared = self.single_flight.do(self._flight_key(camera, tiles), analyze)
+        
+        if shared:
+            detection_results = self._mark_coalesced(camera, detection_results, camera_timer)
+        if camera_timer is not None:
+            camera_timer.stop()
+        
+        return detection_results
+    
+    async def _analyze_camera_async(self, camera: CameraUtil, temperature: float, humidity: float,
+                                    tiles: Optional[Tuple[int, int]] = None,
+                                    timer: Optional[StageTimer] = None) -> Dict[str, Any]:
+        """
+        Asyncio variant of _analyze_camera_coalesced.
+        
+        Capture runs on the I/O thread pool and analysis on the CPU thread
+        pool; concurrent coroutines for the same camera share one execution.
+        """
+        camera_timer = timer.child(camera.camera_id) if timer is not None else None
+        
+        async def analyze() -> Dict[str, Any]:
+            loop = asyncio.get_running_loop()
+            thresholds = self.thresholds
+            frames, lookup = await loop.run_in_executor(
+                self._get_io_executor(), self._capture_camera,
+                camera, temperature, humidity, tiles, camera_timer, thresholds
+            )
+            detection_results = await loop.run_in_executor(
+                self._get_cpu_executor(), self._analyze_captured, camera, frames, lookup
+            )
+            return self._smooth(camera, detection_results, thresholds)
+        
+        detection_results, shared = await self.async_single_flight.do(self._flight_key(camera, tiles), analyze)
+        
+        if shared:
+            detection_results = self._mark_coalesced(camera, detection_results, camera_timer)
+        if camera_timer is not None:
+            camera_timer.stop()
+        
+        return detection_results
+    
+    def _smooth(self, camera: CameraUtil, detection_results: Dict[str, Any],
+                thresholds: ThresholdSnapshot) -> Dict[str, Any]:
+        """
+        Fold freshly analyzed results into the camera's temporal state.
+        
+        Decisions use the detection_threshold of the snapshot the results
+        were analyzed with. A detection cache hit is not a new observation:
+        it is served with the current smoothed state instead of being folded
+        in again.
+        """
+        threshold = thresholds.detection_util.detection_threshold
+        if detection_results.get('analysis_details', {}).get('cache') == 'hit':
+            return self.temporal_smoother.current(camera.camera_id, detection_results, threshold)
+        return self.temporal_smoother.update(camera.camera_id, detection_results, threshold)
+    
+    def _flight_key(self, camera: CameraUtil, tiles: Optional[Tuple[int, int]]):
+        """Single-flight key: tiled and untiled analyses are not interchangeable."""
+        return camera.camera_id if tiles is None else (camera.camera_id, tiles)
+    
+    def _mark_coalesced(self, camera: CameraUtil, detection_results: Dict[str, Any],
+                        timer: Optional[StageTimer] = None) -> Dict[str, Any]:
+        """Return a private copy of a result shared with an in-flight analysis."""
+        logger.debug("Reusing in-flight analysis for camera %s", camera.camera_id)
+        detection_results = copy.deepcopy(detection_results)
+        detection_results['analysis_details']['coalesced'] = True
+        if timer is not None:
+            timer.attributes['coalesced'] = True
+        return detection_results
+    
+    def _analyze_camera(self, camera: CameraUtil, temperature: float, humidity: float,
+                        tiles: Optional[Tuple[int, int]] = None,
+                        timer: Optional[StageTimer] = None,
+                        thresholds: Optional[ThresholdSnapshot] = None) -> Dict[str, Any]:
+        """
+        Capture frames from a single camera and analyze them.
+        
+        The first grabbed frame is fingerprinted and looked up in the detection
+        cache together with the bucketed sensor readings. On a hit, capture
+        stops after that frame and the cached result is returned.
+        
+        Args:
+            camera: Camera to capture from
+            temperature: Temperature in Celsius
+            humidity: Humidity as percentage
+            tiles: Optional (rows, cols) grid for per-tile probabilities
+            timer: Optional StageTimer of this camera
+            thresholds: Threshold snapshot to use (default: the current one)
+            
+        Returns:
+            Detection results for this camera
+        """
+        frames, lookup = self._capture_camera(camera, temperature, humidity, tiles, timer, thresholds)
+        return self._analyze_captured(camera, frames, lookup)
+    
+    def _capture_camera(self, camera: CameraUtil, temperature: float, humidity: float,
+                        tiles: Optional[Tuple[int, int]] = None,
+                        timer: Optional[StageTimer] = None,
+                        thresholds: Optional[ThresholdSnapshot] = None) -> Tuple[List[Any], Dict[str, Any]]:
+        """
+        Capture frames from a camera, stopping early on a detection cache hit.
+        
+        Returns:
+            Tuple (frames, cache lookup) to pass to _analyze_captured
+        """
+        # Pin the threshold snapshot so the cache key and the analysis agree
+        lookup: Dict[str, Any] = {'thresholds': thresholds or self.thresholds, 'tiles': tiles, 'timer': timer}
+        
+        def check_cache(frame) -> bool:
+            with timed(timer, 'cache_lookup'):
+                # Fingerprint only the region of interest (ignores overlays and sky)
+                roi = camera.roi_for(frame.shape)
+                scene = frame if roi is None else roi.masked(frame)
+                lookup['key'] = self.detection_cache.make_key(
+                    camera.camera_id, scene, temperature, humidity,
+                    version=lookup['thresholds'].version, tiles=tiles
+                )
+                lookup['result'] = self.detection_cache.get(lookup['key'])
+            return lookup['result'] is not None
+        
+        frames = camera.capture_frames(
+            num_frames=self.num_frames,
+            delay=self.FRAME_DELAY,
+            stop_condition=check_cache if self.detection_cache.enabled else None,
+            timer=timer
+        )
+        
+        return frames, lookup
+    
+    def _analyze_captured(self, camera: CameraUtil, frames: List[Any],
+                          lookup: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Analyze frames captured by _capture_camera (or serve the cache hit).
+        
+        Returns:
+            Detection results for this camera
+        """
+        timer = lookup.get('timer')
+        if timer is not None:
+            timer.attributes['frames'] = len(frames)
+        
+        if lookup.get('result') is not None:
+            logger.debug("Detection cache hit for camera %s", camera.camera_id)
+            if timer is not None:
+                timer.attributes['cache'] = 'hit'
+            cached = lookup['result']
+            cached['analysis_details']['cache'] = 'hit'
+            return cached
+        
+        detection_util = lookup['thresholds'].detection_util
+        
+        if not frames:
+            logger.error("Failed to capture frames from camera %s", camera.camera_id)
+            return detection_util.analyze_frames(frames)
+        
+        logger.debug("Captured %d frames from camera %s", len(frames), camera.camera_id)
+        detection_results = detection_util.analyze_frames(
+            frames, roi=camera.roi_for(frames[0].shape), tiles=lookup.get('tiles'), timer=timer
+        )
+        
+        if 'key' in lookup:
+            self.detection_cache.put(lookup['key'], detection_results)
+            detection_results['analysis_details']['cache'] = 'miss'
+        
+        return detection_results
+    
+    def _get_io_executor(self) -> CountingThreadPoolExecutor:
+        """Thread pool for blocking camera reads and cloud uploads."""
+        with self._executor_lock:
+            if self._io_executor is None:
+                self._io_executor = CountingThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix='fog-io')
+                # Tasks submitted but not yet picked up by a worker
+                QUEUE_DEPTH.labels('io_executor').set_function(self._io_executor.queued)
+            return self._io_executor
+    
+    def _get_cpu_executor(self) -> CountingThreadPoolExecutor:
+        """Thread pool for frame analysis (OpenCV/NumPy release the GIL)."""
+        with self._executor_lock:
+            if self._cpu_executor is None:
+                self._cpu_executor = CountingThreadPoolExecutor(max_workers=self.cpu_workers, thread_name_prefix='fog-cpu')
+                QUEUE_DEPTH.labels('cpu_executor').set_function(self._cpu_executor.queued)
+            return self._cpu_executor
+    
+    def shutdown(self) -> None:
+        """Release the asyncio-mode thread pools and the camera capture pool."""
+        with self._executor_lock:
+            executors = (self._io_executor, self._cpu_executor)
+            self._io_executor = None
+            self._cpu_executor = None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=False)
+        self.camera_registry.shutdown()
     
     def _check_thresholds(self, temperature: float, humidity: float) -> Dict[str, Any]:
         """
         Check if sensor readings exceed thresholds for fog or smoke.
         
+        Default rules (see ThresholdEngine.DEFAULT_RULES):
+        
         FOG conditions:
         - Humidity >= 90%
-        - Temperature between 5°C and 20°C
+        - Temperature between 1°C and 20°C
         
         SMOKE conditions:
-        - Temperature >= 45°C
-        - Humidity <= 40%
+        - Temperature >= 38°C
+        - Humidity <= 30%
         
         Args:
             temperature: Temperature in Celsius
@@ -140,38 +693,9 @@ class Cloud_fogController:
         Returns:
             Dictionary with threshold check results
         """
-        fog_conditions = (
-            humidity >= self.FOG_HUMIDITY_THRESHOLD and
-            self.FOG_TEMP_MIN <= temperature <= self.FOG_TEMP_MAX
-        )
-        
-        smoke_conditions = (
-            temperature >= self.SMOKE_TEMP_THRESHOLD and
-            humidity <= self.SMOKE_HUMIDITY_THRESHOLD
-        )
-        
-        conditions_detected = []
-        if fog_conditions:
-            conditions_detected.append('FOG')
-        if smoke_conditions:
-            conditions_detected.append('SMOKE')
-        
-        return {
-            'should_analyze': fog_conditions or smoke_conditions,
-            'fog_conditions_met': fog_conditions,
-            'smoke_conditions_met': smoke_conditions,
-            'conditions_detected': conditions_detected,
-            'thresholds': {
-                'fog': {
-                    'humidity': f'>= {self.FOG_HUMIDITY_THRESHOLD}%',
-                    'temperature': f'{self.FOG_TEMP_MIN}°C - {self.FOG_TEMP_MAX}°C'
-                },
-                'smoke': {
-                    'temperature': f'>= {self.SMOKE_TEMP_THRESHOLD}°C',
-                    'humidity': f'<= {self.SMOKE_HUMIDITY_THRESHOLD}%'
-                }
-            }
-        }
+        threshold_check = self.threshold_engine.check(temperature, humidity)
+        THRESHOLD_CHECKS.labels('true' if threshold_check['should_analyze'] else 'false').inc()
+        return threshold_check
     
     def _get_default_detection_results(self) -> Dict[str, Any]:
         """
@@ -249,10 +773,11 @@ class Cloud_fogController:
         Returns:
             Upload status and response
         """
+        start = time.perf_counter()
         try:
             endpoint = f"{self.cloud_api_url}/sensor-data"
             
-            logger.info(f"Sending data to cloud: {endpoint}")
+            logger.debug("Sending data to cloud: %s", endpoint)
             
             response = requests.post(
                 endpoint,
@@ -263,7 +788,8 @@ class Cloud_fogController:
             
             response.raise_for_status()
             
-            logger.info(f"Cloud upload successful: {response.status_code}")
+            logger.debug("Cloud upload successful: %s", response.status_code)
+            UPLOAD_SECONDS.labels('success').observe(time.perf_counter() - start)
             
             return {
                 'success': True,
@@ -274,6 +800,7 @@ class Cloud_fogController:
             
         except requests.exceptions.Timeout:
             logger.error("Cloud upload timeout")
+            UPLOAD_SECONDS.labels('timeout').observe(time.perf_counter() - start)
             return {
                 'success': False,
                 'error': 'Request timeout',
@@ -281,7 +808,8 @@ class Cloud_fogController:
             }
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Cloud upload failed: {str(e)}")
+            logger.error("Cloud upload failed: %s", e)
+            UPLOAD_SECONDS.labels('error').observe(time.perf_counter() - start)
             return {
                 'success': False,
                 'error': str(e),
@@ -289,7 +817,8 @@ class Cloud_fogController:
             }
         
         except Exception as e:
-            logger.error(f"Unexpected error during cloud upload: {str(e)}")
+            logger.error("Unexpected error during cloud upload: %s", e)
+            UPLOAD_SECONDS.labels('error').observe(time.perf_counter() - start)
             return {
                 'success': False,
                 'error': f'Unexpected error: {str(e)}',
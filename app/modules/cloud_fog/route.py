@@ -1,9 +1,119 @@
-from flask import Blueprint, make_response, jsonify, request
-from .controller import Cloud_fogController
+import threading
+from typing import Any, Dict, Optional, Tuple
+from flask import Blueprint, Response, make_response, jsonify, request
 
 
 cloud_fog_bp = Blueprint('cloud_fog', __name__)
-cloud_fog_controller = Cloud_fogController()
+
+# Maximum number of readings accepted by the batch endpoint
+MAX_BATCH_SIZE = 500
+# Early-detection parameters the batch endpoint does not support per reading
+BATCH_UNSUPPORTED_FIELDS = ('tiles', 'timings')
+# Maximum rows/columns of the tiled detection grid
+MAX_TILES = 16
+# Request header enabling the per-stage timing breakdown (same as ?timings=true)
+TIMINGS_HEADER = 'X-Fog-Timings'
+_cloud_fog_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_cloud_fog_controller():
+    """
+    Return the shared controller, building it on first use.
+
+    Importing the controller pulls in OpenCV, NumPy and requests, so it is
+    deferred until a request needs it instead of slowing down worker boot.
+    """
+    global _cloud_fog_controller
+    if _cloud_fog_controller is None:
+        with _controller_lock:
+            if _cloud_fog_controller is None:
+                from .controller import Cloud_fogController
+                _cloud_fog_controller = Cloud_fogController()
+    return _cloud_fog_controller
+
+
+def parse_early_detection_args(args, known_camera_ids,
+                               headers=None) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Parse and validate the early-detection query parameters.
+
+    Shared by the Flask route and the ASGI serving mode.
+
+    Args:
+        args: Mapping of query parameter names to string values (or a JSON
+            reading, whose camera_id may also be a list of camera ids)
+        known_camera_ids: Ids of the registered cameras
+        headers: Optional request headers (case-insensitive mapping), checked
+            for TIMINGS_HEADER
+
+    Returns:
+        Tuple (params, error): keyword arguments for early_detection, or an
+        error message when the parameters are invalid
+    """
+    temperature = _get_float(args, 'temperature')
+    humidity = _get_float(args, 'humidity')
+    camera_id = args.get('camera_id')
+    tiles = args.get('tiles')
+    
+    # Validate parameters
+    if temperature is None:
+        return None, "Missing required parameter: temperature"
+    
+    if humidity is None:
+        return None, "Missing required parameter: humidity"
+    
+    # Validate ranges
+    if not (-50 <= temperature <= 160):
+        return None, "Temperature out of valid range (-50 to 160°C)"
+    
+    if not (0 <= humidity <= 100):
+        return None, "Humidity out of valid range (0-100%)"
+    
+    camera_ids = None
+    if camera_id:
+        if isinstance(camera_id, str):
+            camera_id = camera_id.split(',')
+        elif not isinstance(camera_id, list) or not all(isinstance(c, str) for c in camera_id):
+            return None, "camera_id must be a string or a list of strings"
+        camera_ids = [c.strip() for c in camera_id if c.strip()]
+        unknown = [c for c in camera_ids if c not in known_camera_ids]
+        if unknown:
+            return None, f"Unknown camera id: {', '.join(unknown)}"
+    
+    if tiles:
+        tiles = _parse_tiles(tiles)
+        if tiles is None:
+            return None, f"Invalid tiles (expected RxC with 1-{MAX_TILES} rows and columns, e.g. 4x4)"
+    
+    timings = _is_true(args.get('timings')) or (headers is not None and _is_true(headers.get(TIMINGS_HEADER)))
+    
+    return {'temperature': temperature, 'humidity': humidity, 'camera_ids': camera_ids,
+            'tiles': tiles or None, 'timings': timings}, None
+
+
+def _parse_tiles(value: str) -> Optional[Tuple[int, int]]:
+    """Parse a 'RxC' tile grid, returning None when malformed or out of range."""
+    try:
+        rows, cols = (int(part) for part in str(value).lower().split('x'))
+    except ValueError:
+        return None
+    if not (1 <= rows <= MAX_TILES and 1 <= cols <= MAX_TILES):
+        return None
+    return rows, cols
+
+
+def _is_true(value) -> bool:
+    """Interpret a flag parameter or header value."""
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _get_float(args, name: str) -> Optional[float]:
+    """Read a float parameter, returning None when missing or malformed."""
+    try:
+        return float(args.get(name))
+    except (TypeError, ValueError):
+        return None
 
 
 @cloud_fog_bp.route('/', methods=['GET'])
@@ -25,7 +135,7 @@ def index():
                   type: string
                   example: "Hello World!"
     """
-    result = cloud_fog_controller.index()
+    result = get_cloud_fog_controller().index()
     return make_response(jsonify(data=result))
 
 
@@ -52,6 +162,29 @@ def early_detection():
         required: true
         description: Humidity percentage (0-100)
         example: 92.0
+      - name: camera_id
+        in: query
+        type: string
+        required: false
+        description: Comma-separated camera ids to analyze (default - all registered cameras)
+        example: "north,south"
+      - name: tiles
+        in: query
+        type: string
+        required: false
+        description: Optional RxC grid (up to 16x16); each camera result then includes per-tile probabilities under "tiles" (the grid is reduced to fit small frames; "requested" then holds the asked grid)
+        example: "4x4"
+      - name: timings
+        in: query
+        type: boolean
+        required: false
+        description: Add a "timings" section with per-stage milliseconds (also enabled by the X-Fog-Timings header)
+        example: true
+      - name: X-Fog-Timings
+        in: header
+        type: string
+        required: false
+        description: Set to "1" or "true" to add the "timings" section
     responses:
       200:
         description: Detection completed successfully
@@ -111,6 +244,9 @@ def early_detection():
                     probability_smug:
                       type: number
                       example: 0.089
+                camera_results:
+                  type: object
+                  description: Per-camera detection results keyed by camera id (only when video was analyzed); with tiles, each has a "tiles" grid (rows, cols, probability_fog, probability_smoke, probability_vapor, probability_smug)
                 cloud_upload:
                   type: object
                   properties:
@@ -123,6 +259,13 @@ def early_detection():
                 message:
                   type: string
                   example: "FOG DETECTED (75.2%) - Data uploaded to cloud"
+                timings:
+                  type: object
+                  description: Only with timings enabled. Milliseconds per stage (threshold_check_ms, cameras_ms, fusion_ms, upload_ms, total_ms) and per camera under "cameras" (connect_ms, decode_ms, decode_per_item_ms, delay_ms, cache_lookup_ms, grouping_ms, color_conversion_ms, edges_ms, fog_ms, smoke_ms, vapor_ms, smug_ms, tiles_ms, aggregation_ms, total_ms)
+                profile:
+                  type: string
+                  description: Only when this request was sampled by the profiler. Name of the stored profile (see /profiles)
+                  example: "20251019T103000123456-4242.json"
       400:
         description: Invalid parameters
         schema:
@@ -147,47 +290,505 @@ def early_detection():
               example: "Detection failed"
     """
     try:
-        # Get query parameters
-        temperature = request.args.get('temperature', type=float)
-        humidity = request.args.get('humidity', type=float)
+        cloud_fog_controller = get_cloud_fog_controller()
         
-        # Validate parameters
-        if temperature is None:
-            return make_response(
-                jsonify(success=False, error="Missing required parameter: temperature"),
-                400
-            )
+        # Get and validate query parameters
+        params, error = parse_early_detection_args(
+            request.args, cloud_fog_controller.camera_registry.ids(), request.headers
+        )
+        if error:
+            return make_response(jsonify(success=False, error=error), 400)
+        
+        # Execute early detection (profiled when sampled)
+        result = cloud_fog_controller.profiler.call(cloud_fog_controller.early_detection, **params)
+        
+        return make_response(jsonify(success=True, data=result), 200)
         
-        if humidity is None:
+    except Exception as e:
+        return make_response(
+            jsonify(success=False, error=f"Detection failed: {str(e)}"),
+            500
+        )
+
+
+@cloud_fog_bp.route('/early-detection/batch', methods=['POST'])
+def early_detection_batch():
+    """
+    Batch early detection endpoint.
+    
+    Accepts many readings from many sensors in one request. Thresholds are
+    evaluated for the whole batch at once and each camera is analyzed at most
+    once per batch.
+    ---
+    tags:
+      - Cloud Fog API
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            readings:
+              type: array
+              items:
+                type: object
+                properties:
+                  sensor_id:
+                    type: string
+                    example: "arduino-01"
+                  temperature:
+                    type: number
+                    example: 15.5
+                  humidity:
+                    type: number
+                    example: 92.0
+                  camera_id:
+                    type: string
+                    description: Comma-separated camera ids, or a list of camera ids (default - all registered cameras). tiles and timings are not supported per reading
+                    example: "north"
+    responses:
+      200:
+        description: Batch processed
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+              example: true
+            data:
+              type: object
+              properties:
+                readings:
+                  type: array
+                  description: Per-reading results (same fields as early-detection plus sensor_id and cameras)
+                  items:
+                    type: object
+                camera_results:
+                  type: object
+                  description: Detection results keyed by camera id (one analysis per camera)
+                summary:
+                  type: object
+                  properties:
+                    readings:
+                      type: integer
+                      example: 12
+                    triggered:
+                      type: integer
+                      example: 3
+                    cameras_analyzed:
+                      type: array
+                      items:
+                        type: string
+                      example: ["north"]
+                    uploaded:
+                      type: integer
+                      example: 12
+      400:
+        description: Invalid body or reading
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+              example: false
+            error:
+              type: string
+              example: "readings[2]: Missing required parameter: humidity"
+      500:
+        description: Internal server error
+    """
+    try:
+        body = request.get_json(silent=True)
+        readings = body.get('readings') if isinstance(body, dict) else None
+        
+        if not isinstance(readings, list) or not readings:
             return make_response(
-                jsonify(success=False, error="Missing required parameter: humidity"),
+                jsonify(success=False, error="Body must contain a non-empty 'readings' list"),
                 400
             )
         
-        # Validate ranges
-        if not (-50 <= temperature <= 160):
+        if len(readings) > MAX_BATCH_SIZE:
             return make_response(
-                jsonify(success=False, error="Temperature out of valid range (-50 to 160°C)"),
+                jsonify(success=False, error=f"Too many readings (max {MAX_BATCH_SIZE})"),
                 400
             )
         
-        if not (0 <= humidity <= 100):
+        cloud_fog_controller = get_cloud_fog_controller()
+        known_camera_ids = cloud_fog_controller.camera_registry.ids()
+        
+        validated = []
+        for index, reading in enumerate(readings):
+            if not isinstance(reading, dict):
+                return make_response(
+                    jsonify(success=False, error=f"readings[{index}]: must be an object"),
+                    400
+                )
+            unsupported = [field for field in BATCH_UNSUPPORTED_FIELDS if field in reading]
+            if unsupported:
+                return make_response(
+                    jsonify(success=False, error=f"readings[{index}]: Unsupported parameter in batch readings: {', '.join(unsupported)}"),
+                    400
+                )
+            params, error = parse_early_detection_args(reading, known_camera_ids)
+            if error:
+                return make_response(jsonify(success=False, error=f"readings[{index}]: {error}"), 400)
+            params['sensor_id'] = str(reading.get('sensor_id', index))
+            validated.append(params)
+        
+        result = cloud_fog_controller.early_detection_batch(validated)
+        
+        return make_response(jsonify(success=True, data=result), 200)
+        
+    except Exception as e:
+        return make_response(
+            jsonify(success=False, error=f"Batch detection failed: {str(e)}"),
+            500
+        )
+
+@cloud_fog_bp.route('/detection-cache', methods=['GET'])
+def detection_cache():
+    """
+    Detection cache statistics.
+    ---
+    tags:
+      - Cloud Fog API
+    responses:
+      200:
+        description: Cache configuration and hit/miss counters
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+              example: true
+            data:
+              type: object
+              properties:
+                enabled:
+                  type: boolean
+                  example: true
+                size:
+                  type: integer
+                  example: 3
+                max_size:
+                  type: integer
+                  example: 128
+                ttl_seconds:
+                  type: number
+                  example: 30
+                hits:
+                  type: integer
+                  example: 42
+                misses:
+                  type: integer
+                  example: 7
+                evictions:
+                  type: integer
+                  example: 0
+                hit_rate:
+                  type: number
+                  example: 0.857
+    """
+    result = get_cloud_fog_controller().detection_cache_stats()
+    return make_response(jsonify(success=True, data=result), 200)
+
+
+@cloud_fog_bp.route('/detection-state', methods=['GET'])
+def detection_state():
+    """
+    Smoothed per-camera detection state.
+    
+    Exposes the exponentially weighted moving average of each probability
+    and the debounced fog/smoke decisions kept across requests.
+    ---
+    tags:
+      - Cloud Fog API
+    parameters:
+      - name: camera_id
+        in: query
+        type: string
+        required: false
+        description: Camera to report (default - all cameras)
+        example: "default"
+    responses:
+      200:
+        description: Smoothing parameters and per-camera state
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+              example: true
+            data:
+              type: object
+              properties:
+                alpha:
+                  type: number
+                  example: 0.4
+                on_threshold:
+                  type: number
+                  description: Active detection_threshold (a detection switches on above it)
+                  example: 0.45
+                off_threshold:
+                  type: number
+                  description: on_threshold - DETECTION_HYSTERESIS (a detection switches off below it)
+                  example: 0.4
+                cameras:
+                  type: object
+                  description: State keyed by camera id (probabilities, fog_detected, smoke_detected, samples, updated_at)
+    """
+    result = get_cloud_fog_controller().detection_state(request.args.get('camera_id'))
+    return make_response(jsonify(success=True, data=result), 200)
+
+
+@cloud_fog_bp.route('/thresholds', methods=['GET'])
+def get_thresholds():
+    """
+    Active detection thresholds.
+    
+    Returns the threshold snapshot currently used by this worker. Thresholds
+    are reloaded from THRESHOLDS_FILE when it changes, without a restart.
+    ---
+    tags:
+      - Cloud Fog API
+    responses:
+      200:
+        description: Active threshold snapshot
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+              example: true
+            data:
+              type: object
+              properties:
+                version:
+                  type: integer
+                  example: 2
+                source:
+                  type: string
+                  example: "/etc/fog/thresholds.json"
+                loaded_at:
+                  type: string
+                  example: "2025-10-19T10:30:00"
+                detection:
+                  type: object
+                  description: Frame analysis thresholds (fog_brightness_threshold, detection_threshold, ...)
+                rules:
+                  type: object
+                  description: Sensor threshold rules (FOG, SMOKE) with inclusive min/max bounds
+    """
+    result = get_cloud_fog_controller().threshold_config()
+    return make_response(jsonify(success=True, data=result), 200)
+
+
+@cloud_fog_bp.route('/thresholds', methods=['POST'])
+def update_thresholds():
+    """
+    Update detection thresholds without restarting.
+    
+    Detection values are merged into the active ones and a 'rules' section
+    replaces the active rules. When THRESHOLDS_FILE is configured the new
+    configuration is written to it and every worker reloads it.
+    ---
+    tags:
+      - Cloud Fog API
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            detection:
+              type: object
+              example: {"fog_brightness_threshold": 125, "detection_threshold": 0.5}
+            rules:
+              type: object
+              example: {"FOG": {"humidity": {"min": 88}, "temperature": {"min": 1, "max": 20}}}
+    responses:
+      200:
+        description: New active threshold snapshot
+      400:
+        description: Invalid threshold configuration
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+              example: false
+            error:
+              type: string
+              example: "Unknown detection threshold 'fog_brightnes'"
+      500:
+        description: Internal server error
+    """
+    try:
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict) or not body:
             return make_response(
-                jsonify(success=False, error="Humidity out of valid range (0-100%)"),
+                jsonify(success=False, error="Body must be a non-empty JSON object"),
                 400
             )
         
-        # Execute early detection
-        result = cloud_fog_controller.early_detection(
-            temperature=temperature,
-            humidity=humidity
-        )
+        result = get_cloud_fog_controller().update_thresholds(body)
         
         return make_response(jsonify(success=True, data=result), 200)
         
+    except ValueError as e:
+        return make_response(jsonify(success=False, error=str(e)), 400)
     except Exception as e:
         return make_response(
-            jsonify(success=False, error=f"Detection failed: {str(e)}"),
+            jsonify(success=False, error=f"Threshold update failed: {str(e)}"),
             500
         )
-      
\ No newline at end of file
+
+
+@cloud_fog_bp.route('/profiles', methods=['GET'])
+def list_profiles():
+    """
+    Profiler settings and stored profiles.
+    
+    When PROFILE_DIR is set, one early-detection request out of every
+    sample_every is profiled: the stacks of the request, camera and analysis
+    threads are sampled every interval_ms and written to PROFILE_DIR, which
+    keeps the newest PROFILE_MAX_FILES profiles.
+    ---
+    tags:
+      - Cloud Fog API
+    responses:
+      200:
+        description: Profiler settings and profiles (newest first)
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+              example: true
+            data:
+              type: object
+              properties:
+                enabled:
+                  type: boolean
+                  example: true
+                directory:
+                  type: string
+                  example: "/var/lib/fog/profiles"
+                sample_every:
+                  type: integer
+                  example: 100
+                interval_ms:
+                  type: number
+                  example: 5
+                max_files:
+                  type: integer
+                  example: 50
+                profiles:
+                  type: array
+                  items:
+                    type: object
+                    properties:
+                      name:
+                        type: string
+                        example: "20251019T103000123456-4242.json"
+                      size:
+                        type: integer
+                        example: 18234
+                      created_at:
+                        type: string
+                        example: "2025-10-19T10:30:00.123456"
+    """
+    result = get_cloud_fog_controller().profiling_status()
+    return make_response(jsonify(success=True, data=result), 200)
+
+
+@cloud_fog_bp.route('/profiles', methods=['POST'])
+def update_profiling():
+    """
+    Change the profiler sampling without restarting.
+    
+    The settings are written to PROFILE_DIR and picked up by every worker
+    within a few seconds. Set sample_every to 0 to stop sampling.
+    ---
+    tags:
+      - Cloud Fog API
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            sample_every:
+              type: integer
+              example: 100
+            interval_ms:
+              type: number
+              example: 5
+    responses:
+      200:
+        description: New profiler settings
+      400:
+        description: Profiling disabled or invalid settings
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+              example: false
+            error:
+              type: string
+              example: "sample_every must be a non-negative integer (0 disables sampling)"
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict) or not body:
+        return make_response(
+            jsonify(success=False, error="Body must be a non-empty JSON object"),
+            400
+        )
+    try:
+        result = get_cloud_fog_controller().update_profiling(body)
+    except ValueError as e:
+        return make_response(jsonify(success=False, error=str(e)), 400)
+    return make_response(jsonify(success=True, data=result), 200)
+
+
+@cloud_fog_bp.route('/profiles/<name>', methods=['GET'])
+def download_profile(name):
+    """
+    Download a stored profile.
+    
+    Returns the profile as JSON (request parameters, duration, sample count
+    and stacks), or with format=folded as collapsed stacks for flamegraph.pl
+    or speedscope.
+    ---
+    tags:
+      - Cloud Fog API
+    parameters:
+      - name: name
+        in: path
+        type: string
+        required: true
+        example: "20251019T103000123456-4242.json"
+      - name: format
+        in: query
+        type: string
+        enum: [json, folded]
+        default: json
+    responses:
+      200:
+        description: The profile
+      404:
+        description: Unknown profile
+    """
+    profile = get_cloud_fog_controller().get_profile(name)
+    if profile is None:
+        return make_response(jsonify(success=False, error=f"Unknown profile '{name}'"), 404)
+    if request.args.get('format') == 'folded':
+        return Response(
+            get_cloud_fog_controller().profiler.folded(profile), mimetype='text/plain',
+            headers={'Content-Disposition': f'attachment; filename={name[:-len(".json")]}.folded'}
+        )
+    return make_response(jsonify(success=True, data=profile), 200)
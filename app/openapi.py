@@ -0,0 +1,61 @@
+"""
+Precomputed OpenAPI spec.
+
+Flasgger builds the spec by parsing the YAML docstrings of every route at
+runtime. This module does that once at build time and writes the result to
+app/static/openapi.json, which the app serves from disk at
+/api/v1/openapi.json without loading Flasgger.
+
+Regenerate after changing route docstrings:
+    python -m app.openapi
+"""
+
+import json
+from pathlib import Path
+from flask import Flask, send_from_directory
+
+SPEC_DIR = Path(__file__).resolve().parent / 'static'
+SPEC_FILENAME = 'openapi.json'
+SPEC_ROUTE = '/api/v1/openapi.json'
+
+
+def generate_spec() -> dict:
+    """
+    Parse the route docstrings with Flasgger and return the spec.
+
+    Returns:
+        OpenAPI (Swagger 2.0) spec as a dictionary
+    """
+    from flasgger import Swagger
+    from app.initialize_functions import initialize_route
+
+    app = Flask(__name__)
+    initialize_route(app)
+    swagger = Swagger(app)
+
+    with app.test_request_context():
+        return json.loads(json.dumps(swagger.get_apispecs()))
+
+
+def write_spec(path: Path = SPEC_DIR / SPEC_FILENAME) -> Path:
+    """Generate the spec and write it to disk."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(generate_spec(), f, indent=2, sort_keys=True, ensure_ascii=False)
+        f.write('\n')
+    return path
+
+
+def register_spec_route(app: Flask) -> None:
+    """Serve the precomputed spec from disk, if it has been generated."""
+    if not (SPEC_DIR / SPEC_FILENAME).is_file():
+        return
+
+    def openapi_spec():
+        return send_from_directory(SPEC_DIR, SPEC_FILENAME, mimetype='application/json')
+
+    app.add_url_rule(SPEC_ROUTE, 'openapi_spec', openapi_spec, methods=['GET'])
+
+
+if __name__ == '__main__':
+    print(f"OpenAPI spec written to {write_spec()}")
@@ -5,4 +5,13 @@ class TestCloud_fog():
         response = client.get('/')
         assert response.status_code == 200
         assert response.json == {'message': 'Hello, World!'}
-            
\ No newline at end of file
+
+    def test_openapi_spec_is_served_from_disk(self, client):
+        response = client.get('/api/v1/openapi.json')
+        assert response.status_code == 200
+        assert '/api/v1/cloud_fog/early-detection' in response.json['paths']
+
+    def test_openapi_spec_is_up_to_date(self):
+        from app.openapi import generate_spec, SPEC_DIR, SPEC_FILENAME
+        with open(SPEC_DIR / SPEC_FILENAME) as f:
+            assert json.load(f) == generate_spec()
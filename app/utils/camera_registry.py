@@ -0,0 +1,158 @@
+import os
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from app.utils.camera_util import CameraUtil
+from app.utils.request_profiler import propagate
+
+logger = logging.getLogger(__name__)
+
+
+class CameraRegistry:
+    """
+    Registry of the IP cameras attached to this fog node.
+
+    Cameras are configured through the CAMERAS environment variable (JSON list)
+    or the CAMERAS_FILE environment variable (path to a JSON file). Each entry
+    accepts the keys "id", "ip", "port", "path", "url" and "roi" (polygons in
+    normalized coordinates restricting the analyzed area, see RegionOfInterest):
+
+        [{"id": "north", "ip": "192.168.15.66"},
+         {"id": "south", "url": "http://192.168.15.67:8080/video",
+          "roi": [[[0.0, 0.3], [1.0, 0.3], [1.0, 1.0], [0.0, 1.0]]]}]
+
+    When neither variable is set, a single camera with id "default" is built
+    from CAMERA_IP, which keeps single-camera deployments working unchanged.
+    """
+
+    DEFAULT_CAMERA_ID = 'default'
+
+    def __init__(self, cameras: Iterable[CameraUtil], max_workers: Optional[int] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            cameras: Cameras to register (ids must be unique)
+            max_workers: Maximum concurrent camera streams (default: one per camera)
+        """
+        self._cameras: Dict[str, CameraUtil] = {}
+        for camera in cameras:
+            if camera.camera_id in self._cameras:
+                raise ValueError(f"Duplicate camera id: {camera.camera_id}")
+            self._cameras[camera.camera_id] = camera
+
+        self._max_workers = max_workers or max(len(self._cameras), 1)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'CameraRegistry':
+        """Build the registry from CAMERAS / CAMERAS_FILE / CAMERA_IP."""
+        raw = os.getenv('CAMERAS')
+        cameras_file = os.getenv('CAMERAS_FILE')
+
+        if not raw and cameras_file:
+            with open(cameras_file) as f:
+                raw = f.read()
+
+        if not raw:
+            camera_ip = os.getenv('CAMERA_IP', '192.168.15.66')
+            return cls([CameraUtil(camera_ip=camera_ip, camera_id=cls.DEFAULT_CAMERA_ID)])
+
+        return cls([cls._camera_from_config(entry) for entry in json.loads(raw)])
+
+    @staticmethod
+    def _camera_from_config(entry: Dict[str, Any]) -> CameraUtil:
+        """Build a CameraUtil from a single camera config entry."""
+        if 'id' not in entry:
+            raise ValueError(f"Camera config is missing 'id': {entry}")
+        if 'ip' not in entry and 'url' not in entry:
+            raise ValueError(f"Camera '{entry['id']}' needs an 'ip' or a 'url'")
+
+        return CameraUtil(
+            camera_ip=entry.get('ip', ''),
+            camera_id=str(entry['id']),
+            port=int(entry.get('port', 8080)),
+            path=entry.get('path', '/video'),
+            video_url=entry.get('url'),
+            roi=entry.get('roi')
+        )
+
+    def __len__(self) -> int:
+        return len(self._cameras)
+
+    def ids(self) -> List[str]:
+        """Return the ids of all registered cameras."""
+        return list(self._cameras)
+
+    def get(self, camera_id: str) -> CameraUtil:
+        """
+        Get a camera by id.
+
+        Raises:
+            KeyError: If the camera is not registered
+        """
+        try:
+            return self._cameras[camera_id]
+        except KeyError:
+            raise KeyError(f"Unknown camera id: {camera_id}") from None
+
+    def select(self, camera_ids: Optional[Iterable[str]] = None) -> List[CameraUtil]:
+        """
+        Select cameras by id.
+
+        Args:
+            camera_ids: Ids to select, or None for every registered camera
+
+        Returns:
+            List of cameras in the requested order
+        """
+        if camera_ids is None:
+            return list(self._cameras.values())
+        return [self.get(camera_id) for camera_id in camera_ids]
+
+    def map(self, fn: Callable[[CameraUtil], Any],
+            camera_ids: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Run fn(camera) for the selected cameras concurrently, one thread per stream.
+
+        Blocking camera reads and OpenCV analysis release the GIL, so cameras
+        are processed in parallel and total latency tracks the slowest camera
+        instead of the sum of all of them. A single camera runs inline.
+
+        Args:
+            fn: Callable receiving a CameraUtil
+            camera_ids: Ids to process, or None for every registered camera
+
+        Returns:
+            Dictionary camera_id -> fn result (exceptions are re-raised)
+        """
+        cameras = self.select(camera_ids)
+
+        if len(cameras) == 1:
+            return {cameras[0].camera_id: fn(cameras[0])}
+
+        # Pool threads are sampled with the caller's profile, if any
+        fn = propagate(fn)
+        futures = {camera.camera_id: self._get_executor().submit(fn, camera)
+                   for camera in cameras}
+        return {camera_id: future.result() for camera_id, future in futures.items()}
+
+    def shutdown(self) -> None:
+        """Release the capture thread pool (it is recreated on next use)."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the capture thread pool on first use."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix='camera'
+                )
+            return self._executor
@@ -1,9 +1,12 @@
 import cv2
 import numpy as np
 import requests
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 import time
 import logging
+from app.utils.metrics_util import CAPTURE_SECONDS, FRAMES_CAPTURED, FRAMES_FAILED
+from app.utils.roi_util import RegionOfInterest
+from app.utils.stage_timer import StageTimer
 
 logger = logging.getLogger(__name__)
 
@@ -11,62 +14,119 @@ logger = logging.getLogger(__name__)
 class CameraUtil:
     """Utility class for capturing frames from IP camera."""
     
-    def __init__(self, camera_ip: str = "192.168.15.66"):
+    def __init__(self, camera_ip: str = "192.168.15.66", camera_id: str = "default",
+                 port: int = 8080, path: str = "/video", video_url: Optional[str] = None,
+                 roi: Optional[Sequence[Sequence[Sequence[float]]]] = None):
         """
         Initialize CameraUtil with camera IP address.
         
         Args:
             camera_ip: IP address of the camera (default: 192.168.15.66)
+            camera_id: Identifier of the camera inside the registry (default: "default")
+            port: HTTP port of the video stream (default: 8080)
+            path: Path of the video stream (default: /video)
+            video_url: Full stream URL, overrides camera_ip/port/path when given
+            roi: Optional region of interest, a list of polygons in normalized
+                [x, y] coordinates (see RegionOfInterest); default: whole frame
         """
+        self.camera_id = camera_id
         self.camera_ip = camera_ip
-        self.video_url = f"http://{camera_ip}:8080/video"
+        self.video_url = video_url or f"http://{camera_ip}:{port}{path}"
+        self.roi = RegionOfInterest.validate(roi) if roi is not None else None
+        self._roi_cache: Dict[Tuple[int, int], RegionOfInterest] = {}
+    
+    def roi_for(self, shape: Tuple[int, ...]) -> Optional[RegionOfInterest]:
+        """
+        Get the region of interest rasterized for a frame shape.
+        
+        Rasterization happens once per frame size and is cached.
         
-    def capture_frames(self, num_frames: int = 24, delay: float = 0.1) -> List[np.ndarray]:
+        Args:
+            shape: Frame shape (height, width[, channels])
+            
+        Returns:
+            RegionOfInterest, or None when the whole frame is analyzed
+        """
+        if self.roi is None:
+            return None
+        key = tuple(shape[:2])
+        region = self._roi_cache.get(key)
+        if region is None:
+            region = self._roi_cache[key] = RegionOfInterest(self.roi, key)
+        return region
+        
+    def capture_frames(self, num_frames: int = 24, delay: float = 0.1,
+                       stop_condition: Optional[Callable[[np.ndarray], bool]] = None,
+                       timer: Optional[StageTimer] = None) -> List[np.ndarray]:
         """
         Capture multiple frames from IP camera.
         
         Args:
             num_frames: Number of frames to capture (default: 24)
             delay: Delay between frame captures in seconds (default: 0.1)
+            stop_condition: Optional callable invoked with the first captured frame;
+                capture stops early (returning only that frame) when it returns True
+            timer: Optional StageTimer receiving 'connect', per-frame 'decode'
+                and 'delay' durations
             
         Returns:
             List of captured frames as numpy arrays (BGR format)
         """
         frames = []
         cap = None
+        start = time.perf_counter()
+        captured_total = FRAMES_CAPTURED.labels(self.camera_id)
+        failed_total = FRAMES_FAILED.labels(self.camera_id)
         
         try:
-            logger.info(f"Connecting to camera at {self.video_url}")
+            logger.debug("Connecting to camera at %s", self.video_url)
             cap = cv2.VideoCapture(self.video_url)
+            opened = cap.isOpened()
+            if timer is not None:
+                timer.add('connect', time.perf_counter() - start)
             
-            if not cap.isOpened():
-                logger.error(f"Failed to open video stream from {self.video_url}")
+            if not opened:
+                logger.error("Failed to open video stream from %s", self.video_url)
                 return frames
             
-            logger.info(f"Capturing {num_frames} frames...")
-            
+            failed = 0
             for i in range(num_frames):
+                read_start = time.perf_counter()
                 ret, frame = cap.read()
+                if timer is not None:
+                    timer.add('decode', time.perf_counter() - read_start, per_item=True)
                 
                 if ret and frame is not None:
                     frames.append(frame.copy())
-                    logger.info(f"Captured frame {i+1}/{num_frames}")
+                    captured_total.inc()
+                    
+                    if stop_condition is not None and len(frames) == 1 and stop_condition(frames[0]):
+                        logger.debug("Stop condition met after first frame (camera %s)", self.camera_id)
+                        break
                 else:
-                    logger.warning(f"Failed to capture frame {i+1}/{num_frames}")
+                    failed_total.inc()
+                    failed += 1
                 
                 # Small delay between captures
                 if delay > 0 and i < num_frames - 1:
                     time.sleep(delay)
+                    if timer is not None:
+                        timer.add('delay', delay)
             
-            logger.info(f"Successfully captured {len(frames)} frames")
+            # One summary record per capture instead of one per frame
+            logger.log(
+                logging.WARNING if failed else logging.INFO,
+                "Captured %d/%d frames from camera %s in %.1f ms (%d failed reads)",
+                len(frames), num_frames, self.camera_id, (time.perf_counter() - start) * 1000, failed
+            )
             
         except Exception as e:
-            logger.error(f"Error capturing frames: {str(e)}")
+            logger.error("Error capturing frames: %s", e)
             
         finally:
             if cap is not None:
                 cap.release()
-                logger.info("Camera connection released")
+            CAPTURE_SECONDS.labels(self.camera_id).observe(time.perf_counter() - start)
         
         return frames
     
@@ -83,14 +143,14 @@ class CameraUtil:
             cap.release()
             
             if is_opened:
-                logger.info(f"Camera at {self.video_url} is accessible")
+                logger.info("Camera at %s is accessible", self.video_url)
             else:
-                logger.warning(f"Cannot access camera at {self.video_url}")
+                logger.warning("Cannot access camera at %s", self.video_url)
             
             return is_opened
             
         except Exception as e:
-            logger.error(f"Error testing camera connection: {str(e)}")
+            logger.error("Error testing camera connection: %s", e)
             return False
     
     def capture_single_frame(self) -> Optional[np.ndarray]:
@@ -0,0 +1,155 @@
+import copy
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class DetectionCache:
+    """
+    TTL + LRU cache for detection results.
+
+    During a stable fog or smoke event every threshold breach would otherwise
+    trigger a full capture and analysis that yields nearly the same result.
+    Entries are keyed by camera, a compact fingerprint of the scene (average
+    hash of an 8x8 thumbnail of the first grabbed frame) and bucketed sensor
+    readings, so a repeated breach on an unchanged scene is answered from
+    memory.
+    """
+
+    def __init__(self, max_size: int = 128, ttl: float = 30.0,
+                 temperature_bucket: float = 1.0, humidity_bucket: float = 2.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of entries kept (least recently used are evicted)
+            ttl: Freshness bound in seconds (0 disables the cache)
+            temperature_bucket: Temperature bucket width in °C
+            humidity_bucket: Humidity bucket width in percentage points
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.temperature_bucket = temperature_bucket
+        self.humidity_bucket = humidity_bucket
+
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        """True when the cache stores and serves results."""
+        return self.ttl > 0 and self.max_size > 0
+
+    @staticmethod
+    def scene_fingerprint(frame: np.ndarray) -> int:
+        """
+        Compute a 64-bit average hash of a frame.
+
+        The frame is reduced to an 8x8 grayscale thumbnail and each bit tells
+        whether a cell is brighter than the thumbnail mean, which is stable
+        under sensor noise and compression artifacts.
+
+        Args:
+            frame: Frame in BGR format
+
+        Returns:
+            Scene fingerprint as an integer
+        """
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        thumbnail = cv2.resize(gray, (8, 8), interpolation=cv2.INTER_AREA)
+        bits = (thumbnail > thumbnail.mean()).flatten()
+        return int(np.packbits(bits).view('>u8')[0])
+
+    def make_key(self, camera_id: str, frame: np.ndarray, temperature: float, humidity: float,
+                 version: int = 0, tiles: Optional[Tuple[int, int]] = None) -> Tuple:
+        """
+        Build a cache key from the camera, the scene and the sensor readings.
+
+        Args:
+            camera_id: Camera the frame comes from
+            frame: Latest grabbed frame (BGR format)
+            temperature: Temperature in Celsius
+            humidity: Humidity as percentage
+            version: Threshold snapshot version (results computed with older
+                thresholds are not reused; they simply age out)
+            tiles: Tile grid requested with the result, if any
+
+        Returns:
+            Hashable cache key
+        """
+        return (
+            camera_id,
+            self.scene_fingerprint(frame),
+            int(temperature // self.temperature_bucket),
+            int(humidity // self.humidity_bucket),
+            version,
+            tiles
+        )
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """
+        Get a fresh cached result.
+
+        Returns:
+            A copy of the cached result, or None on a miss or stale entry
+        """
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[1]
+
+        return copy.deepcopy(value)
+
+    def put(self, key: Hashable, value: Dict[str, Any]) -> None:
+        """Store a result, evicting the least recently used entry when full."""
+        if not self.enabled:
+            return
+
+        expires_at = time.monotonic() + self.ttl
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache configuration and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
@@ -1,10 +1,37 @@
 import cv2
+import time
+import threading
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import Any, List, Dict, Mapping, Optional, Tuple
 import logging
+from app.utils.metrics_util import ANALYSIS_SECONDS, SCORER_SECONDS
+from app.utils.roi_util import RegionOfInterest
+from app.utils.stage_timer import StageTimer
 
 logger = logging.getLogger(__name__)
 
+# Per-stage timing children, resolved once (samples are recorded per analyzed frame)
+_STAGE_SECONDS = {
+    stage: SCORER_SECONDS.labels(stage)
+    for stage in ('preprocess', 'fog', 'smoke', 'vapor', 'smug', 'tiles')
+}
+
+# Scorer details of the analysis running on this thread, collected only when
+# DEBUG is enabled and logged as one record per analysis
+_details = threading.local()
+
+
+def _collecting() -> bool:
+    """Whether scorer details are being collected on this thread."""
+    return bool(getattr(_details, 'frames', None))
+
+
+def _record_detail(scorer: str, **values) -> None:
+    """Attach a scorer's intermediate values to the frame being analyzed (no-op unless collecting)."""
+    frames = getattr(_details, 'frames', None)
+    if frames:
+        frames[-1][scorer] = {name: round(float(value), 3) for name, value in values.items()}
+
 
 class DetectionUtil:
     """
@@ -12,8 +39,29 @@ class DetectionUtil:
     Uses non-ML approaches based on image analysis.
     """
     
-    def __init__(self):
-        """Initialize DetectionUtil with default parameters."""
+    # Tunable thresholds that can be overridden at construction (see
+    # app/utils/threshold_config.py for hot reloading them from a file)
+    THRESHOLD_FIELDS = (
+        'fog_brightness_threshold',
+        'fog_contrast_threshold',
+        'fog_saturation_threshold',
+        'fog_dynamic_range_threshold',
+        'smoke_brightness_range',
+        'smoke_edge_threshold',
+        'smoke_density_threshold',
+        'detection_threshold',
+    )
+    
+    def __init__(self, thresholds: Optional[Mapping[str, Any]] = None):
+        """
+        Initialize DetectionUtil with default parameters.
+        
+        Args:
+            thresholds: Optional overrides for the values in THRESHOLD_FIELDS
+            
+        Raises:
+            ValueError: If an override is unknown or has an invalid value
+        """
         # FOG DETECTION - Adjusted thresholds based on real fog images
         # Real fog images typically have:
         # - Brightness: 130-160 (not extremely high like white paper)
@@ -29,13 +77,63 @@ class DetectionUtil:
         self.smoke_brightness_range = (80, 200)  # Medium brightness
         self.smoke_edge_threshold = 20           # Blurred edges
         self.smoke_density_threshold = 0.3       # Coverage percentage
+        self.smoke_grid_size = 3                 # Local contrast grid (3x3 up to 16x16)
+        
+        # Averaged probability above which fog/smoke is reported as detected
+        self.detection_threshold = 0.45
+        
+        # Frame-difference gating: near-duplicate frames (mean absolute
+        # difference of downsampled grayscale thumbnails below the threshold,
+        # on the 0-255 scale) are scored once and weighted by group size.
+        # Set frame_diff_threshold to 0 to score every frame.
+        self.frame_diff_threshold = 2.0
+        self.frame_diff_size = (32, 32)
+        
+        # Texture box-filter size and per-thread float32 scratch buffers
+        # (reused across frames so texture analysis does not allocate)
+        self.texture_kernel_size = 15
+        self._scratch = threading.local()
+        
+        for name, value in (thresholds or {}).items():
+            self._set_threshold(name, value)
+    
+    def _set_threshold(self, name: str, value: Any) -> None:
+        """Validate and set one tunable threshold."""
+        if name not in self.THRESHOLD_FIELDS:
+            raise ValueError(f"Unknown detection threshold '{name}'")
+        try:
+            if name == 'smoke_brightness_range':
+                low, high = (float(v) for v in value)
+                if low > high:
+                    raise ValueError
+                value = (low, high)
+            else:
+                value = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid value for detection threshold '{name}': {value!r}")
+        setattr(self, name, value)
+    
+    def thresholds(self) -> Dict[str, Any]:
+        """Return the current values of the tunable thresholds."""
+        return {name: getattr(self, name) for name in self.THRESHOLD_FIELDS}
     
-    def analyze_frames(self, frames: List[np.ndarray]) -> Dict[str, any]: # type: ignore
+    def analyze_frames(self, frames: List[np.ndarray],
+                       roi: Optional[RegionOfInterest] = None,
+                       tiles: Optional[Tuple[int, int]] = None,
+                       timer: Optional[StageTimer] = None) -> Dict[str, any]: # type: ignore
         """
         Analyze captured frames to detect fog or smoke.
         
         Args:
             frames: List of frames (BGR format) to analyze
+            roi: Optional region of interest; statistics are then computed
+                only over its pixels (bounding-box crop plus mask)
+            tiles: Optional (rows, cols) grid; adds per-tile probabilities
+                under 'tiles' (see _score_tiles). The grid is reduced to fit
+                small frames (see _fit_tiles); 'tiles' then reports the
+                effective rows/cols and the 'requested' grid
+            timer: Optional StageTimer receiving the duration of each stage
+                (grouping, color conversion, edges, each scorer, aggregation)
             
         Returns:
             Dictionary with detection results:
@@ -53,35 +151,90 @@ class DetectionUtil:
             logger.warning("No frames to analyze")
             return self._empty_result()
         
-        logger.info(f"Analyzing {len(frames)} frames for fog/smoke detection")
+        started = time.perf_counter()
+        debug = logger.isEnabledFor(logging.DEBUG)
+        _details.frames = [] if debug else None
         
-        # Analyze each frame
+        # Group near-duplicate frames so each distinct scene is scored once
+        groups = self._group_similar_frames(frames, roi)
+        weights = [size for _, size in groups]
+        mask = roi.mask if roi is not None else None
+        if timer is not None:
+            timer.add('grouping', time.perf_counter() - started)
+        
+        requested_tiles = tiles
+        if tiles is not None:
+            first = frames[groups[0][0]] if roi is None else roi.crop(frames[groups[0][0]])
+            tiles = self._fit_tiles(first.shape, *tiles)
+        
+        # Analyze one representative frame per group
         fog_scores = []
         smoke_scores = []
         vapor_scores = []
         smug_scores = []
+        tile_scores = []
         
-        for i, frame in enumerate(frames):
-            fog_score = self._detect_fog_in_frame(frame)
-            smoke_score = self._detect_smoke_in_frame(frame)
-            vapor_score = self._detect_vapor_in_frame(frame)
-            smug_score = self._detect_smug_in_frame(frame)
+        for index, size in groups:
+            t0 = time.perf_counter()
+            if debug:
+                _details.frames.append({'frame': index, 'group_size': size})
+            
+            # Crop to the region of interest and convert color spaces once
+            frame = frames[index] if roi is None else roi.crop(frames[index])
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+            t_color = time.perf_counter()
+            
+            # Canny edges are shared by the smoke scorer and the tile scorer
+            edges = cv2.Canny(gray, 50, 150)
+            t1 = time.perf_counter()
+            
+            fog_score = self._detect_fog_in_frame(frame, gray, hsv, mask)
+            t2 = time.perf_counter()
+            smoke_score = self._detect_smoke_in_frame(frame, gray, hsv, mask, edges)
+            t3 = time.perf_counter()
+            vapor_score = self._detect_vapor_in_frame(frame, gray, hsv, mask)
+            t4 = time.perf_counter()
+            smug_score = self._detect_smug_in_frame(frame, gray, hsv, mask)
+            t5 = time.perf_counter()
+            
+            _STAGE_SECONDS['preprocess'].observe(t1 - t0)
+            _STAGE_SECONDS['fog'].observe(t2 - t1)
+            _STAGE_SECONDS['smoke'].observe(t3 - t2)
+            _STAGE_SECONDS['vapor'].observe(t4 - t3)
+            _STAGE_SECONDS['smug'].observe(t5 - t4)
+            
+            if timer is not None:
+                timer.add('color_conversion', t_color - t0)
+                timer.add('edges', t1 - t_color)
+                timer.add('fog', t2 - t1)
+                timer.add('smoke', t3 - t2)
+                timer.add('vapor', t4 - t3)
+                timer.add('smug', t5 - t4)
+            
+            if tiles is not None:
+                tile_scores.append(self._score_tiles(gray, hsv, mask, *tiles, edges=edges))
+                elapsed = time.perf_counter() - t5
+                _STAGE_SECONDS['tiles'].observe(elapsed)
+                if timer is not None:
+                    timer.add('tiles', elapsed)
             
             fog_scores.append(fog_score)
             smoke_scores.append(smoke_score)
             vapor_scores.append(vapor_score)
             smug_scores.append(smug_score)
         
-        # Average scores across all frames
-        avg_fog = np.mean(fog_scores)
-        avg_smoke = np.mean(smoke_scores)
-        avg_vapor = np.mean(vapor_scores)
-        avg_smug = np.mean(smug_scores)
+        # Average scores across all frames (each group weighted by its size)
+        aggregation_started = time.perf_counter()
+        avg_fog = np.average(fog_scores, weights=weights)
+        avg_smoke = np.average(smoke_scores, weights=weights)
+        avg_vapor = np.average(vapor_scores, weights=weights)
+        avg_smug = np.average(smug_scores, weights=weights)
         
-        # Determine detection (threshold: 0.45)
+        # Determine detection (threshold: 0.45 by default)
         # Convert to native Python bool to avoid np.bool_ type issues
-        fog_detected = bool(avg_fog > 0.45)
-        smoke_detected = bool(avg_smoke > 0.45)
+        fog_detected = bool(avg_fog > self.detection_threshold)
+        smoke_detected = bool(avg_smoke > self.detection_threshold)
 
         result = {
             'fog_detected': fog_detected,
@@ -92,17 +245,121 @@ class DetectionUtil:
             'probability_smug': round(float(avg_smug), 3),
             'analysis_details': {
                 'frames_analyzed': len(frames),
+                'distinct_frames': len(groups),
                 'fog_scores_range': (float(np.min(fog_scores)), float(np.max(fog_scores))),
                 'smoke_scores_range': (float(np.min(smoke_scores)), float(np.max(smoke_scores))),
             }
         }
         
-        logger.info(f"Detection result: Fog={fog_detected} ({avg_fog:.3f}), "
-                   f"Smoke={smoke_detected} ({avg_smoke:.3f})")
+        if roi is not None:
+            result['analysis_details']['roi_fraction'] = round(roi.area_fraction, 3)
+        
+        if tiles is not None:
+            result['tiles'] = self._average_tiles(tile_scores, weights, *tiles)
+            if tiles != requested_tiles:
+                result['tiles']['requested'] = list(requested_tiles)
+        elif requested_tiles is not None:
+            result['analysis_details']['tiles_skipped'] = 'frame smaller than one tile'
+        
+        finished = time.perf_counter()
+        ANALYSIS_SECONDS.observe(finished - started)
+        if timer is not None:
+            timer.add('aggregation', finished - aggregation_started)
+        
+        logger.info(
+            "Analyzed %d frames (%d distinct) in %.1f ms: fog=%s (%.3f), smoke=%s (%.3f)",
+            len(frames), len(groups), (finished - started) * 1000,
+            fog_detected, avg_fog, smoke_detected, avg_smoke
+        )
+        if debug:
+            logger.debug("Scorer details per distinct frame: %s", _details.frames)
+            _details.frames = None
         
         return result
+
+    def _group_similar_frames(self, frames: List[np.ndarray],
+                              roi: Optional[RegionOfInterest] = None) -> List[Tuple[int, int]]:
+        """
+        Group consecutive near-duplicate frames with a cheap change detector.
+        
+        Each frame is reduced to a small grayscale thumbnail and compared with
+        the thumbnail of the first frame of the current group. Frames whose
+        mean absolute difference stays below frame_diff_threshold join the
+        group; otherwise they start a new one. Comparing against the group's
+        first frame (not the previous frame) prevents slow drift from being
+        absorbed into a single group.
+        
+        Args:
+            frames: List of frames (BGR format)
+            roi: Optional region of interest (changes outside it are ignored)
+            
+        Returns:
+            List of (representative frame index, group size) tuples
+        """
+        if self.frame_diff_threshold <= 0 or len(frames) < 2:
+            return [(i, 1) for i in range(len(frames))]
+        
+        groups = []
+        reference = None
+        
+        for i, frame in enumerate(frames):
+            if roi is not None:
+                frame = roi.masked(frame)
+            thumbnail = cv2.resize(
+                cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY),
+                self.frame_diff_size,
+                interpolation=cv2.INTER_AREA
+            )
+            
+            if reference is not None and reference.shape == thumbnail.shape:
+                difference = cv2.mean(cv2.absdiff(reference, thumbnail))[0]
+                if difference < self.frame_diff_threshold:
+                    index, size = groups[-1]
+                    groups[-1] = (index, size + 1)
+                    continue
+            
+            groups.append((i, 1))
+            reference = thumbnail
+        
+        return groups
     
-    def _detect_fog_in_frame(self, frame: np.ndarray) -> float:
+    def fuse_results(self, camera_results: Dict[str, Dict[str, any]]) -> Dict[str, any]: # type: ignore
+        """
+        Fuse per-camera detection results into a single site-level result.
+
+        A condition seen by any camera is a condition at the site, so each
+        probability is the maximum across cameras and a detection is reported
+        when any camera reports it.
+
+        Args:
+            camera_results: Dictionary camera_id -> analyze_frames() result
+
+        Returns:
+            Dictionary with the same shape as analyze_frames()
+        """
+        analyzed = {camera_id: res for camera_id, res in camera_results.items()
+                    if res.get('analysis_details', {}).get('frames_analyzed', 0) > 0}
+
+        if not analyzed:
+            return self._empty_result()
+
+        result = {
+            'fog_detected': any(res['fog_detected'] for res in analyzed.values()),
+            'smoke_detected': any(res['smoke_detected'] for res in analyzed.values()),
+        }
+        for key in ('probability_fog', 'probability_smoke', 'probability_vapor', 'probability_smug'):
+            result[key] = max(res[key] for res in analyzed.values())
+
+        result['analysis_details'] = {
+            'frames_analyzed': sum(res['analysis_details']['frames_analyzed'] for res in analyzed.values()),
+            'cameras_analyzed': list(analyzed),
+            'fusion': 'max'
+        }
+
+        return result
+
+    def _detect_fog_in_frame(self, frame: np.ndarray, gray: Optional[np.ndarray] = None,
+                             hsv: Optional[np.ndarray] = None, mask: Optional[np.ndarray] = None) -> float:
         """
         Detect fog in a single frame using brightness, contrast, and saturation.
         
@@ -113,18 +370,19 @@ class DetectionUtil:
         
         Args:
             frame: Input frame in BGR format
+            gray: Precomputed grayscale frame (optional)
+            hsv: Precomputed HSV frame (optional)
+            mask: Optional uint8 mask; statistics use only its nonzero pixels
             
         Returns:
             Fog probability score (0.0-1.0)
         """
-        # Convert to different color spaces
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        # Convert to different color spaces (unless given)
+        gray, hsv = self._color_spaces(frame, gray, hsv)
         
         # ===== MÉTODO 1: Análisis HSV =====
-        brightness = np.mean(hsv[:, :, 2]) # type: ignore
-        contrast = np.std(gray) # type: ignore
-        saturation = np.mean(hsv[:, :, 1]) # type: ignore
+        _, saturation, brightness = self._channel_means(hsv, mask)
+        _, contrast = self._mean_std(gray, mask)
         
         # Scores individuales (0-1, donde 1 = indica niebla)
         brightness_score = self._normalize_score(
@@ -150,8 +408,9 @@ class DetectionUtil:
         
         # ===== MÉTODO 2: Rango Dinámico =====
         # Niebla hace que los píxeles sean muy similares (bajo rango)
-        min_brightness = np.min(hsv[:, :, 2])
-        max_brightness = np.max(hsv[:, :, 2])
+        value = self._masked_pixels(hsv[:, :, 2], mask)
+        min_brightness = np.min(value)
+        max_brightness = np.max(value)
         dynamic_range = max_brightness - min_brightness
         
         # Rango bajo (<100) = posible niebla
@@ -202,18 +461,18 @@ class DetectionUtil:
                         0.20 * saturation_score +
                         0.10 * range_score)
         
-        # Detailed logging for debugging
-        logger.debug(f"FOG DETECTION (IMPROVED):")
-        logger.debug(f"  Brightness: {brightness:.2f} (th:{self.fog_brightness_threshold}) -> {brightness_score:.3f}")
-        logger.debug(f"  Contrast: {contrast:.2f} (th:{self.fog_contrast_threshold}) -> {contrast_score:.3f}")
-        logger.debug(f"  Saturation: {saturation:.2f} (th:{self.fog_saturation_threshold}) -> {saturation_score:.3f}")
-        logger.debug(f"  Range: {dynamic_range:.2f} -> {range_score:.3f}")
-        logger.debug(f"  Indicators ({num_indicators}): {[name for name, _ in indicators]}")
-        logger.debug(f"  ► FINAL FOG SCORE: {fog_score:.3f}")
+        # Detailed values for the per-analysis debug record
+        _record_detail('fog', brightness=brightness, brightness_score=brightness_score,
+                       contrast=contrast, contrast_score=contrast_score,
+                       saturation=saturation, saturation_score=saturation_score,
+                       range=dynamic_range, range_score=range_score,
+                       indicators=num_indicators, score=fog_score)
         
         return float(np.clip(fog_score, 0.0, 1.0))
     
-    def _detect_smoke_in_frame(self, frame: np.ndarray) -> float:
+    def _detect_smoke_in_frame(self, frame: np.ndarray, gray: Optional[np.ndarray] = None,
+                               hsv: Optional[np.ndarray] = None, mask: Optional[np.ndarray] = None,
+                               edges: Optional[np.ndarray] = None) -> float:
         """
         Detect smoke in a single frame using edge detection and density.
         
@@ -235,16 +494,18 @@ class DetectionUtil:
         
         Args:
             frame: Input frame in BGR format
+            gray: Precomputed grayscale frame (optional)
+            hsv: Precomputed HSV frame (optional)
+            mask: Optional uint8 mask; statistics use only its nonzero pixels
+            edges: Precomputed Canny edges of gray (optional)
             
         Returns:
             Smoke probability score (0.0-1.0)
         """
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        gray, hsv = self._color_spaces(frame, gray, hsv)
         
         try:
-            saturation = np.mean(hsv[:, :, 1]) # type: ignore
-            brightness = np.mean(gray) # type: ignore
+            _, saturation, _ = self._channel_means(hsv, mask)
             
             # ===== STEP 1: Check if this might be FOG instead of SMOKE =====
             # FOG GATE (improved): Check for UNIFORM global fog
@@ -254,7 +515,12 @@ class DetectionUtil:
             # - Medium-low brightness (90-140)
             # AND these conditions PERSISTENT across entire image
             
-            contrast_global = np.std(gray) # type: ignore
+            # Sum and sum-of-squares integral images answer the mean/std of
+            # any rectangle in O(1); computed once and shared by all grids
+            integrals = self._integral_images(gray, mask)
+            global_means, global_stds = self._grid_stats(integrals, 1)
+            brightness = float(global_means[0, 0])
+            contrast_global = float(global_stds[0, 0])
             
             # ONLY reject smoke if ALL fog conditions are met:
             is_likely_fog = (
@@ -264,8 +530,8 @@ class DetectionUtil:
             )
             
             if is_likely_fog:
-                logger.debug(f"Smoke detection - Likely FOG (saturation:{saturation:.1f}, "
-                            f"contrast:{contrast_global:.1f}, brightness:{brightness:.1f}). Score: 0.0")
+                _record_detail('smoke', likely_fog=True, saturation=saturation,
+                               contrast=contrast_global, brightness=brightness, score=0.0)
                 return 0.0
             
             # ===== STEP 2: Brightness analysis =====
@@ -295,35 +561,28 @@ class DetectionUtil:
             # Smoke has VARIABLE local contrast (aglomerados of density)
             # Fog has UNIFORM low contrast everywhere
             
-            # Calculate local contrast in different regions
-            h, w = gray.shape
-            region_h, region_w = h // 3, w // 3
-            local_contrasts = []
-            
-            for i in range(0, h - region_h, region_h):
-                for j in range(0, w - region_w, region_w):
-                    region = gray[i:i+region_h, j:j+region_w].flatten()
-                    local_contrasts.append(float(np.std(region)))  # type: ignore
-            
-            if local_contrasts:
-                # Variance of local contrasts = how different regions are
-                contrast_variance = np.std(local_contrasts)
-                local_contrast_mean = np.mean(local_contrasts)
-                
-                # Smoke: high variance (aglomerados) + medium-low mean contrast
-                # Fog: low variance (uniform) + very low mean contrast
-                localization_score = 0.0
-                if local_contrast_mean > 15:  # Not completely uniform fog
-                    localization_score = min(contrast_variance / 30, 1.0)
-                else:
-                    # Low mean contrast = could be fog or dense smoke
-                    localization_score = contrast_variance / 10 * 0.5
+            # Calculate local contrast in each cell of an NxN grid
+            grid = int(np.clip(self.smoke_grid_size, 3, 16))
+            _, local_contrasts = self._grid_stats(integrals, grid)
+            
+            # Variance of local contrasts = how different regions are
+            # (cells outside the region of interest are NaN)
+            contrast_variance = np.nanstd(local_contrasts)
+            local_contrast_mean = np.nanmean(local_contrasts)
+            
+            # Smoke: high variance (aglomerados) + medium-low mean contrast
+            # Fog: low variance (uniform) + very low mean contrast
+            localization_score = 0.0
+            if local_contrast_mean > 15:  # Not completely uniform fog
+                localization_score = min(contrast_variance / 30, 1.0)
             else:
-                localization_score = 0.5
+                # Low mean contrast = could be fog or dense smoke
+                localization_score = contrast_variance / 10 * 0.5
             
             # ===== STEP 4: Edge detection (Canny) =====
-            edges = cv2.Canny(gray, 50, 150)
-            edge_density = np.sum(edges > 0) / edges.size
+            if edges is None:
+                edges = cv2.Canny(gray, 50, 150)
+            edge_density = self._coverage(edges, mask)
             
             # Smoke edges: moderate density (not crisp like clear, not absent like uniform fog)
             if edge_density < 0.005:
@@ -354,22 +613,6 @@ class DetectionUtil:
                 # Very colored = less likely smoke
                 saturation_factor = 0.4
             
-            
-            # ===== STEP 6: Texture analysis =====
-            kernel_size = 15
-            gray_float = gray.astype(float)
-            mean_filtered = cv2.blur(gray_float, (kernel_size, kernel_size))
-            squared_diff = (gray_float - mean_filtered) ** 2
-            local_var = cv2.blur(squared_diff, (kernel_size, kernel_size))
-            local_var = np.maximum(local_var, 0)
-            local_std = np.sqrt(local_var)
-            
-            texture_mean = np.nanmean(local_std)
-            if np.isnan(texture_mean) or texture_mean == 0:
-                texture_score = 0.0
-            else:
-                texture_score = min(texture_mean / 50.0, 1.0)
-            
             # ===== FINAL SCORING =====
             # Weight components:
             # - brightness_score (0.25): Can vary widely with smoke+fire
@@ -382,20 +625,121 @@ class DetectionUtil:
                           0.20 * edge_score +
                           0.20 * saturation_factor)
             
-            logger.debug(f"Smoke detection - Brightness: {brightness:.2f} (score:{brightness_score:.2f}), "
-                        f"Localization: {localization_score:.2f}, "
-                        f"Edge density: {edge_density*100:.2f}% (score:{edge_score:.2f}), "
-                        f"Saturation: {saturation:.2f} (factor:{saturation_factor:.2f}), "
-                        f"Texture: {texture_mean:.2f} (score:{texture_score:.2f}), "
-                        f"Final Score: {smoke_score:.3f}")
+            if _collecting():
+                # ===== Texture analysis =====
+                # Not part of the score: only computed for the debug record
+                local_std = self._texture_std(gray)
+                texture_mean = cv2.mean(local_std, mask=mask)[0]
+                if np.isnan(texture_mean) or texture_mean == 0:
+                    texture_score = 0.0
+                else:
+                    texture_score = min(texture_mean / 50.0, 1.0)
+                _record_detail('smoke', brightness=brightness, brightness_score=brightness_score,
+                               localization_score=localization_score,
+                               edge_density=edge_density, edge_score=edge_score,
+                               saturation=saturation, saturation_factor=saturation_factor,
+                               texture=texture_mean, texture_score=texture_score, score=smoke_score)
             
             return float(np.clip(smoke_score, 0.0, 1.0))
         
         except Exception as e:
-            logger.error(f"Error in smoke detection: {str(e)}")
+            logger.error("Error in smoke detection: %s", e)
             return 0.0
     
-    def _detect_vapor_in_frame(self, frame: np.ndarray) -> float:
+    def _texture_std(self, gray: np.ndarray) -> np.ndarray:
+        """
+        Local standard deviation of a grayscale frame (box filter texture).
+        
+        Computed in float32 with in-place operations on scratch buffers that
+        belong to the calling thread, so no full-frame temporaries are
+        allocated once a thread has seen a frame size.
+        
+        Args:
+            gray: Grayscale frame (uint8)
+            
+        Returns:
+            Local std per pixel (float32). This is a scratch buffer: it is
+            overwritten by the next call on the same thread.
+        """
+        gray_f, local, work = self._scratch_buffers(gray.shape)
+        ksize = (self.texture_kernel_size, self.texture_kernel_size)
+        
+        np.copyto(gray_f, gray)
+        cv2.blur(gray_f, ksize, dst=local)              # local mean
+        np.subtract(gray_f, local, out=work)
+        np.square(work, out=work)
+        cv2.blur(work, ksize, dst=local)                # local variance
+        np.maximum(local, 0.0, out=local)
+        np.sqrt(local, out=local)
+        return local
+    
+    def _scratch_buffers(self, shape: Tuple[int, ...]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return this thread's three float32 scratch buffers for a frame shape."""
+        buffers = getattr(self._scratch, 'buffers', None)
+        if buffers is None:
+            buffers = self._scratch.buffers = {}
+        if shape not in buffers:
+            buffers[shape] = tuple(np.empty(shape, dtype=np.float32) for _ in range(3))
+        return buffers[shape]
+    
+    def _integral_images(self, gray: np.ndarray,
+                         mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """
+        Compute the sum and sum-of-squares integral images of a grayscale frame.
+        
+        With a mask, pixels outside it are zeroed and a pixel-count integral
+        image is added so cell statistics cover only masked pixels.
+        
+        Returns:
+            Tuple (sum, squared sum, count or None), each of shape (h + 1, w + 1)
+        """
+        if mask is None:
+            total, sq_total = cv2.integral2(gray, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+            return total, sq_total, None
+        
+        masked = cv2.bitwise_and(gray, gray, mask=mask)
+        total, sq_total = cv2.integral2(masked, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+        count = cv2.integral(np.minimum(mask, 1), sdepth=cv2.CV_64F)
+        return total, sq_total, count
+    
+    def _grid_stats(self, integrals: Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]],
+                    grid: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Mean and standard deviation of every cell of a grid x grid partition.
+        
+        Each cell costs four lookups per integral image, so the cost does not
+        depend on the frame size or on how many grids are queried. Cell edges
+        are spread evenly so the cells cover the whole frame.
+        
+        Args:
+            integrals: Output of _integral_images
+            grid: Number of cells per side (capped at the frame size)
+            
+        Returns:
+            Tuple (means, stds), each of shape (grid, grid); cells without
+            masked pixels are NaN
+        """
+        total, sq_total, count = integrals
+        h, w = total.shape[0] - 1, total.shape[1] - 1
+        ys = np.linspace(0, h, min(grid, h) + 1).astype(int)
+        xs = np.linspace(0, w, min(grid, w) + 1).astype(int)
+        
+        def cell_sums(integral: np.ndarray) -> np.ndarray:
+            corners = integral[np.ix_(ys, xs)]
+            return corners[1:, 1:] - corners[:-1, 1:] - corners[1:, :-1] + corners[:-1, :-1]
+        
+        if count is None:
+            area = np.outer(np.diff(ys), np.diff(xs)).astype(np.float64)
+        else:
+            area = cell_sums(count)
+            area[area == 0] = np.nan
+        
+        means = cell_sums(total) / area
+        variances = np.maximum(cell_sums(sq_total) / area - means ** 2, 0.0)
+        return means, np.sqrt(variances)
+    
+    def _detect_vapor_in_frame(self, frame: np.ndarray, gray: Optional[np.ndarray] = None,
+                               hsv: Optional[np.ndarray] = None, mask: Optional[np.ndarray] = None) -> float:
         """
         Detect water vapor (water mist, light fog, light rain mist).
         
@@ -411,16 +755,17 @@ class DetectionUtil:
         
         Args:
             frame: Input frame in BGR format
+            gray: Precomputed grayscale frame (optional)
+            hsv: Precomputed HSV frame (optional)
+            mask: Optional uint8 mask; statistics use only its nonzero pixels
             
         Returns:
             Vapor probability score (0.0-1.0)
         """
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray, hsv = self._color_spaces(frame, gray, hsv)
         
-        brightness = np.mean(hsv[:, :, 2]) # type: ignore
-        saturation = np.mean(hsv[:, :, 1]) # type: ignore
-        contrast = np.std(gray) # type: ignore
+        _, saturation, brightness = self._channel_means(hsv, mask)
+        _, contrast = self._mean_std(gray, mask)
         
         # ===== STEP 1: Brightness score =====
         # Vapor is typically bright (water scatters light)
@@ -494,15 +839,15 @@ class DetectionUtil:
                       0.20 * contrast_score +
                       0.10 * 1.0) * fog_penalty  # 10% baseline
         
-        logger.debug(f"Vapor detection - Brightness: {brightness:.2f} (score:{brightness_score:.2f}), "
-                    f"Saturation: {saturation:.2f} (score:{saturation_score:.2f}), "
-                    f"Contrast: {contrast:.2f} (score:{contrast_score:.2f}), "
-                    f"Fog penalty: {fog_penalty:.2f}, "
-                    f"Final Score: {vapor_score:.3f}")
+        _record_detail('vapor', brightness=brightness, brightness_score=brightness_score,
+                       saturation=saturation, saturation_score=saturation_score,
+                       contrast=contrast, contrast_score=contrast_score,
+                       fog_penalty=fog_penalty, score=vapor_score)
         
         return float(np.clip(vapor_score, 0.0, 1.0))
     
-    def _detect_smug_in_frame(self, frame: np.ndarray) -> float:
+    def _detect_smug_in_frame(self, frame: np.ndarray, gray: Optional[np.ndarray] = None,
+                              hsv: Optional[np.ndarray] = None, mask: Optional[np.ndarray] = None) -> float:
         """
         Detect smog/smug (urban pollution haze from vehicle emissions).
         
@@ -514,20 +859,22 @@ class DetectionUtil:
         
         Args:
             frame: Input frame in BGR format
+            gray: Precomputed grayscale frame (optional)
+            hsv: Precomputed HSV frame (optional)
+            mask: Optional uint8 mask; statistics use only its nonzero pixels
             
         Returns:
             Smug probability score (0.0-1.0)
         """
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray, hsv = self._color_spaces(frame, gray, hsv)
         
         try:
             # Get color and brightness information
             hue = hsv[:, :, 0]
             saturation = hsv[:, :, 1]
             value = hsv[:, :, 2]
-            brightness = np.mean(value) # type: ignore
-            contrast = np.std(gray) # type: ignore
+            _, _, brightness = self._channel_means(hsv, mask)
+            _, contrast = self._mean_std(gray, mask)
             
             # CRITICAL FIX: Smug is NOT just yellow/brown colors
             # It's yellow/brown colors WITH turbidity (low contrast + medium darkness)
@@ -536,7 +883,7 @@ class DetectionUtil:
             #    BUT also require moderate saturation (not vivid, but not desaturated)
             yellow_brown_mask = ((hue >= 15) & (hue <= 35) & 
                                  (saturation > 20) & (saturation < 150))
-            color_coverage = np.sum(yellow_brown_mask) / yellow_brown_mask.size
+            color_coverage = self._coverage(yellow_brown_mask, mask)
             
             # 2. Brightness should be medium (not too bright like clear sky)
             brightness_factor = 0.0
@@ -560,17 +907,260 @@ class DetectionUtil:
             # If any factor is low, smug probability is low
             smug_score = color_coverage * brightness_factor * contrast_factor
             
-            logger.debug(f"Smug detection - Color coverage: {color_coverage*100:.2f}%, "
-                        f"Brightness: {brightness:.2f} (factor: {brightness_factor:.2f}), "
-                        f"Contrast: {contrast:.2f} (factor: {contrast_factor:.2f}), "
-                        f"Final score: {smug_score:.3f}")
+            _record_detail('smug', color_coverage=color_coverage,
+                           brightness=brightness, brightness_factor=brightness_factor,
+                           contrast=contrast, contrast_factor=contrast_factor, score=smug_score)
             
             return float(np.clip(smug_score, 0.0, 1.0))
         
         except Exception as e:
-            logger.error(f"Error in smug detection: {str(e)}")
+            logger.error("Error in smug detection: %s", e)
             return 0.0
     
+    # Smoke localization compares local contrasts of a 3x3 cell grid per tile
+    TILE_CELLS = 3
+    
+    def _fit_tiles(self, shape: Tuple[int, ...], rows: int, cols: int) -> Optional[Tuple[int, int]]:
+        """
+        Reduce a tile grid so every tile has at least one pixel per cell.
+        
+        Args:
+            shape: Shape of the (cropped) frame
+            rows: Requested tile rows
+            cols: Requested tile columns
+            
+        Returns:
+            Effective (rows, cols), or None if the frame is smaller than one tile
+        """
+        max_rows, max_cols = shape[0] // self.TILE_CELLS, shape[1] // self.TILE_CELLS
+        if max_rows == 0 or max_cols == 0:
+            return None
+        return min(rows, max_rows), min(cols, max_cols)
+    
+    def _score_tiles(self, gray: np.ndarray, hsv: np.ndarray, mask: Optional[np.ndarray],
+                     rows: int, cols: int, edges: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Score every tile of a rows x cols grid in one vectorized pass.
+        
+        The frame is trimmed to a multiple of the cell grid (rows*3 x cols*3
+        cells, at most a few pixels are dropped) and reshaped into cell views,
+        so per-cell sums come from a single NumPy reduction per statistic and
+        tile statistics are sums of their cells. The per-frame heuristics are
+        then applied to the arrays of tile statistics with np.select/np.where
+        (same thresholds and weights as the _detect_*_in_frame scorers; the
+        smoke texture term and the per-frame logging are omitted, and the fog
+        dynamic range is computed in floating point).
+        
+        Args:
+            gray: Grayscale frame
+            hsv: HSV frame
+            mask: Optional uint8 mask restricting the statistics
+            rows: Number of tile rows
+            cols: Number of tile columns
+            edges: Precomputed Canny edges of gray (optional)
+            
+        Returns:
+            Dictionary probability key -> (rows, cols) array (NaN for tiles
+            without masked pixels)
+        """
+        k = self.TILE_CELLS
+        cell_rows, cell_cols = rows * k, cols * k
+        cell_h, cell_w = gray.shape[0] // cell_rows, gray.shape[1] // cell_cols
+        if cell_h == 0 or cell_w == 0:
+            raise ValueError(f"Frame too small for a {rows}x{cols} tile grid")
+        h, w = cell_h * cell_rows, cell_w * cell_cols
+        
+        def cell_sums(image: np.ndarray) -> np.ndarray:
+            view = image[:h, :w].reshape(cell_rows, cell_h, cell_cols, cell_w, *image.shape[2:])
+            return view.sum(axis=(1, 3), dtype=np.float64)
+        
+        def tile_sums(cells: np.ndarray) -> np.ndarray:
+            return cells.reshape(rows, k, cols, k, *cells.shape[2:]).sum(axis=(1, 3))
+        
+        gray = gray[:h, :w]
+        hsv = hsv[:h, :w]
+        weight = None if mask is None else np.minimum(mask[:h, :w], 1)
+        
+        def weighted(image: np.ndarray) -> np.ndarray:
+            return image if weight is None else image * weight
+        
+        gray_sq = gray.astype(np.uint16)
+        gray_sq *= gray_sq
+        if edges is None:
+            edges = cv2.Canny(gray, 50, 150)
+        edges = edges[:h, :w] > 0
+        hue, saturation, value = cv2.split(hsv)
+        yellow_brown = (hue >= 15) & (hue <= 35) & (saturation > 20) & (saturation < 150)
+        
+        # Per-cell sums (one reduction each)
+        if weight is None:
+            cell_count = np.full((cell_rows, cell_cols), float(cell_h * cell_w))
+        else:
+            cell_count = cell_sums(weight)
+        cell_gray = cell_sums(weighted(gray))
+        cell_gray_sq = cell_sums(weighted(gray_sq))
+        cell_saturation = cell_sums(weighted(saturation))
+        cell_value = cell_sums(weighted(value))
+        cell_edges = cell_sums(weighted(edges.view(np.uint8)))
+        cell_yellow = cell_sums(weighted(yellow_brown.view(np.uint8)))
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # Local contrast of every cell, grouped per tile
+            cell_mean = cell_gray / cell_count
+            cell_std = np.sqrt(np.maximum(cell_gray_sq / cell_count - cell_mean ** 2, 0.0))
+            cell_std[cell_count == 0] = np.nan
+            local = cell_std.reshape(rows, k, cols, k).transpose(0, 2, 1, 3).reshape(rows, cols, k * k)
+            all_empty = np.all(np.isnan(local), axis=2)
+            local[all_empty] = 0.0
+            local_contrast_mean = np.nanmean(local, axis=2)
+            contrast_variance = np.nanstd(local, axis=2)
+            
+            # Tile statistics
+            count = tile_sums(cell_count)
+            brightness_gray = tile_sums(cell_gray) / count
+            contrast = np.sqrt(np.maximum(tile_sums(cell_gray_sq) / count - brightness_gray ** 2, 0.0))
+            saturation_mean = tile_sums(cell_saturation) / count
+            value_mean = tile_sums(cell_value) / count
+            edge_density = tile_sums(cell_edges) / count
+            color_coverage = tile_sums(cell_yellow) / count
+        
+        # Dynamic range of V per tile (min/max over masked pixels)
+        tile_h, tile_w = cell_h * k, cell_w * k
+        if weight is None:
+            low, high = value, value
+        else:
+            low, high = np.where(weight > 0, value, 255), np.where(weight > 0, value, 0)
+        tile_view = lambda image: image.reshape(rows, tile_h, cols, tile_w)
+        dynamic_range = (tile_view(high).max(axis=(1, 3)).astype(np.float64)
+                         - tile_view(low).min(axis=(1, 3)))
+        
+        scores = {
+            'probability_fog': self._fog_tile_scores(value_mean, contrast, saturation_mean, dynamic_range),
+            'probability_smoke': self._smoke_tile_scores(brightness_gray, contrast, saturation_mean,
+                                                         local_contrast_mean, contrast_variance, edge_density),
+            'probability_vapor': self._vapor_tile_scores(value_mean, contrast, saturation_mean),
+            'probability_smug': self._smug_tile_scores(value_mean, contrast, color_coverage),
+        }
+        
+        empty = count == 0
+        for key in scores:
+            scores[key] = np.clip(scores[key], 0.0, 1.0)
+            scores[key][empty] = np.nan
+        return scores
+    
+    def _fog_tile_scores(self, brightness: np.ndarray, contrast: np.ndarray,
+                         saturation: np.ndarray, dynamic_range: np.ndarray) -> np.ndarray:
+        """Vectorized _detect_fog_in_frame scoring over tile statistics."""
+        brightness_score = self._normalize_array(brightness, self.fog_brightness_threshold, 255)
+        contrast_score = 1.0 - self._normalize_array(contrast, 0, self.fog_contrast_threshold)
+        saturation_score = 1.0 - self._normalize_array(saturation, 0, self.fog_saturation_threshold)
+        range_score = 1.0 - self._normalize_array(dynamic_range, 100, 0)
+        
+        scores = (brightness_score, contrast_score, saturation_score, range_score)
+        present = (brightness_score > 0.4, contrast_score > 0.4, saturation_score > 0.3, range_score > 0.4)
+        num_indicators = np.sum(present, axis=0)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avg_indicator_score = sum(score * flag for score, flag in zip(scores, present)) / num_indicators
+        confidence_boost = np.minimum(num_indicators / 4.0, 1.0)
+        baseline = (0.35 * brightness_score + 0.35 * contrast_score +
+                    0.20 * saturation_score + 0.10 * range_score)
+        return np.where(num_indicators >= 2, avg_indicator_score * (0.7 + 0.3 * confidence_boost), baseline)
+    
+    def _smoke_tile_scores(self, brightness: np.ndarray, contrast: np.ndarray, saturation: np.ndarray,
+                           local_contrast_mean: np.ndarray, contrast_variance: np.ndarray,
+                           edge_density: np.ndarray) -> np.ndarray:
+        """Vectorized _detect_smoke_in_frame scoring over tile statistics."""
+        is_likely_fog = (saturation < 35) & (contrast < 25) & (brightness < 140)
+        brightness_score = np.select(
+            [brightness < 60, brightness < 100, brightness < 150, brightness < 200],
+            [0.2, 0.8, 1.0, 0.9], 0.3
+        )
+        localization_score = np.where(
+            local_contrast_mean > 15, np.minimum(contrast_variance / 30, 1.0), contrast_variance / 10 * 0.5
+        )
+        edge_score = np.select([edge_density < 0.005, edge_density < 0.02], [0.2, 0.8], 0.3)
+        saturation_factor = np.select([saturation < 25, saturation < 50, saturation < 80], [0.9, 0.85, 0.7], 0.4)
+        
+        smoke_score = (0.25 * brightness_score + 0.35 * localization_score +
+                       0.20 * edge_score + 0.20 * saturation_factor)
+        return np.where(is_likely_fog, 0.0, smoke_score)
+    
+    def _vapor_tile_scores(self, brightness: np.ndarray, contrast: np.ndarray,
+                           saturation: np.ndarray) -> np.ndarray:
+        """Vectorized _detect_vapor_in_frame scoring over tile statistics."""
+        brightness_score = np.select(
+            [brightness < 140, brightness < 160, brightness < 200],
+            [0.0, (brightness - 140) / 20.0 * 0.7, 1.0], 0.8
+        )
+        saturation_score = np.select(
+            [saturation < 30, saturation < 50, saturation < 70],
+            [1.0, 1.0 - (saturation - 30) / 20.0 * 0.3, np.maximum(0.0, 0.7 - (saturation - 50) / 20.0 * 0.5)],
+            0.0
+        )
+        contrast_score = np.select(
+            [contrast < 20, contrast < 40, contrast < 60],
+            [1.0, 1.0 - (contrast - 20) / 20.0 * 0.4, np.maximum(0.0, 0.6 - (contrast - 40) / 20.0 * 0.5)],
+            0.0
+        )
+        fog_penalty = np.where((brightness < 150) & (saturation < 40) & (contrast < 25), 0.6, 1.0)
+        return (0.35 * brightness_score + 0.35 * saturation_score +
+                0.20 * contrast_score + 0.10 * 1.0) * fog_penalty
+    
+    def _smug_tile_scores(self, brightness: np.ndarray, contrast: np.ndarray,
+                          color_coverage: np.ndarray) -> np.ndarray:
+        """Vectorized _detect_smug_in_frame scoring over tile statistics."""
+        brightness_factor = np.select(
+            [(brightness >= 100) & (brightness <= 180), brightness > 180],
+            [1.0, np.maximum(0.0, 1 - (brightness - 180) / 75)],
+            np.maximum(0.0, (brightness - 80) / 20)
+        )
+        contrast_factor = np.select([contrast < 50, contrast < 100], [1.0, 1.0 - (contrast - 50) / 50], 0.0)
+        return color_coverage * brightness_factor * contrast_factor
+    
+    def _average_tiles(self, tile_scores: List[Dict[str, np.ndarray]], weights: List[int],
+                       rows: int, cols: int) -> Dict[str, Any]:
+        """Average per-frame tile scores (weighted by group size) into a JSON-friendly grid."""
+        grid: Dict[str, Any] = {'rows': rows, 'cols': cols}
+        for key in tile_scores[0]:
+            average = np.average(np.stack([scores[key] for scores in tile_scores]), axis=0, weights=weights)
+            grid[key] = [[None if np.isnan(v) else round(float(v), 3) for v in row] for row in average]
+        return grid
+    
+    def _normalize_array(self, value: np.ndarray, min_val: float, max_val: float) -> np.ndarray:
+        """Vectorized _normalize_score (without inversion)."""
+        if max_val == min_val:
+            return np.full_like(value, 0.5, dtype=np.float64)
+        return np.clip((value - min_val) / (max_val - min_val), 0.0, 1.0)
+    
+    def _color_spaces(self, frame: np.ndarray, gray: Optional[np.ndarray],
+                      hsv: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the grayscale and HSV frames, converting only the missing ones."""
+        if gray is None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if hsv is None:
+            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        return gray, hsv
+    
+    def _channel_means(self, image: np.ndarray, mask: Optional[np.ndarray]) -> Tuple[float, float, float]:
+        """Per-channel means of a 3-channel image over the masked pixels."""
+        return cv2.mean(image, mask=mask)[:3]
+    
+    def _mean_std(self, channel: np.ndarray, mask: Optional[np.ndarray]) -> Tuple[float, float]:
+        """Mean and standard deviation of a single channel over the masked pixels."""
+        mean, std = cv2.meanStdDev(channel, mask=mask)
+        return float(mean[0, 0]), float(std[0, 0])
+    
+    def _masked_pixels(self, channel: np.ndarray, mask: Optional[np.ndarray]) -> np.ndarray:
+        """Values of the masked pixels (the channel itself without a mask)."""
+        return channel if mask is None else channel[mask > 0]
+    
+    def _coverage(self, selected: np.ndarray, mask: Optional[np.ndarray]) -> float:
+        """Fraction of the masked pixels that are selected (nonzero)."""
+        if mask is None:
+            return np.count_nonzero(selected) / selected.size
+        return np.count_nonzero(np.logical_and(selected, mask)) / cv2.countNonZero(mask)
+    
     def _normalize_score(self, value: float, min_val: float, max_val: float, 
                         inverse: bool = False) -> float:
         """
@@ -0,0 +1,42 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from app.utils.request_profiler import propagate
+
+
+class CountingThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    ThreadPoolExecutor that counts the tasks waiting for a worker.
+
+    Every submitted task increments the count and decrements it when a
+    worker starts running it, so queued() reports the backlog without
+    reaching into the executor's private work queue. map() and
+    loop.run_in_executor() both go through submit() and are counted too.
+    Tasks submitted by a profiled request are sampled with its profile.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._queued = 0
+        self._queued_lock = threading.Lock()
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        with self._queued_lock:
+            self._queued += 1
+        fn = propagate(fn)
+
+        def run():
+            with self._queued_lock:
+                self._queued -= 1
+            return fn(*args, **kwargs)
+
+        try:
+            return super().submit(run)
+        except BaseException:
+            # Rejected (e.g. after shutdown): the task will never start
+            with self._queued_lock:
+                self._queued -= 1
+            raise
+
+    def queued(self) -> int:
+        """Number of submitted tasks not yet picked up by a worker."""
+        return self._queued
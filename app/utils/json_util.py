@@ -0,0 +1,76 @@
+from typing import Any, Union
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional: the default provider is kept without it
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider serializing with orjson.
+
+    jsonify() and app.json.dumps() encode in one pass in C: str, int, float,
+    list, dict, bool and NumPy arrays/scalars (OPT_SERIALIZE_NUMPY) are
+    handled natively, and only the remaining types (Decimal, date, UUID,
+    dataclasses) go through DefaultJSONProvider.default. The parsed result
+    is the same as with the default provider, with keys sorted likewise,
+    but the bytes differ:
+
+      - non-ASCII characters ("°C", "ñ") are written as raw UTF-8 instead of
+        \\u escapes (ensure_ascii is False)
+      - separators are compact (",", ":") instead of ", " and ": "
+      - indentation is always 2 spaces
+
+    dumps() options orjson cannot honor (ensure_ascii=True, other separators
+    or indents, cls, ...) fall back to DefaultJSONProvider.dumps.
+    """
+
+    ensure_ascii = False
+
+    # dumps() keyword arguments orjson can honor (within the limits checked in dumps)
+    ORJSON_KWARGS = frozenset(('sort_keys', 'indent', 'separators', 'ensure_ascii'))
+    COMPACT_SEPARATORS = (',', ':')
+
+    OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+               | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson else 0
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize obj; sort_keys, indent=2 and compact separators are honored by orjson."""
+        indent = kwargs.get('indent')
+        if (set(kwargs) - self.ORJSON_KWARGS
+                or kwargs.get('ensure_ascii', self.ensure_ascii)
+                or indent not in (None, 0, 2)
+                or kwargs.get('separators') not in (None, self.COMPACT_SEPARATORS)
+                or (indent and 'separators' in kwargs)):
+            return super().dumps(obj, **kwargs)
+        option = self._options(kwargs.get('sort_keys', self.sort_keys), bool(indent))
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        """Build a JSON response directly from the encoded bytes."""
+        if self.ensure_ascii:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=self.default, option=self._options(self.sort_keys, indent)) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+    def _options(self, sort_keys: bool, indent: bool) -> int:
+        """orjson option flags for these sort_keys/indent settings."""
+        option = self.OPTIONS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+
+def fast_json_available() -> bool:
+    """Whether orjson is installed."""
+    return orjson is not None
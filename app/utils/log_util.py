@@ -0,0 +1,154 @@
+"""
+Logging setup for the request hot path.
+
+configure_logging() routes every record through a QueueHandler: request
+threads only put the record on an in-memory queue and a QueueListener
+thread formats and writes it, so slow log I/O (a full pipe, a blocked
+terminal, a remote collector) never stalls a request. The queue is
+bounded; when it is full, records are dropped and counted instead of
+blocking.
+
+A RateLimitFilter caps how many records each call site (logger + line)
+emits per interval, so an error storm (a camera down for every request)
+costs a few records instead of one per request; the number of suppressed
+records is appended to the next record let through.
+
+Log calls on the hot path use %-style arguments (logger.debug("x=%s", x))
+so the message is only built for records that pass the level check.
+"""
+
+import sys
+import time
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+from typing import Dict, Optional, Tuple
+
+DEFAULT_FORMAT = '%(asctime)s %(levelname)s [%(threadName)s] %(name)s: %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional['NonBlockingQueueHandler'] = None
+_lock = threading.Lock()
+
+
+class RateLimitFilter(logging.Filter):
+    """Let at most max_records records per call site through each interval."""
+
+    def __init__(self, max_records: int = 100, interval: float = 10.0):
+        """
+        Initialize the filter.
+
+        Args:
+            max_records: Records allowed per call site and interval (0 disables the limit)
+            interval: Window length in seconds
+        """
+        super().__init__()
+        self.max_records = max_records
+        self.interval = interval
+        # (logger name, line) -> [window start, records in window, suppressed]
+        self._sites: Dict[Tuple[str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.max_records <= 0:
+            return True
+        now = time.monotonic()
+        key = (record.name, record.lineno)
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None or now - site[0] >= self.interval:
+                suppressed = site[2] if site is not None else 0
+                self._sites[key] = [now, 1, 0]
+            elif site[1] < self.max_records:
+                site[1] += 1
+                suppressed = 0
+            else:
+                site[2] += 1
+                return False
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} similar records suppressed)"
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records when the queue is full and leaves formatting to the listener."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments now (they may change after the call) but leave
+        # the timestamp/level formatting to the listener thread
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Traceback objects keep frames alive; render them here
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(level: str = 'INFO', fmt: str = DEFAULT_FORMAT, max_records: int = 100,
+                      interval: float = 10.0, queue_size: int = 10000,
+                      stream=None) -> NonBlockingQueueHandler:
+    """
+    Route the root logger through a non-blocking, rate-limited queue.
+
+    Calling it again replaces the previous configuration.
+
+    Args:
+        level: Root log level name (e.g. 'INFO', 'DEBUG')
+        fmt: Format of the written records
+        max_records: Records allowed per call site and interval (0 disables the limit)
+        interval: Rate limit window in seconds
+        queue_size: Records buffered before new ones are dropped
+        stream: Where records are written (default: stderr)
+
+    Returns:
+        The queue handler installed on the root logger
+    """
+    global _listener, _handler
+    with _lock:
+        _stop()
+        output = logging.StreamHandler(stream if stream is not None else sys.stderr)
+        output.setFormatter(logging.Formatter(fmt))
+
+        log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        _handler = NonBlockingQueueHandler(log_queue)
+        _handler.addFilter(RateLimitFilter(max_records, interval))
+        _listener = logging.handlers.QueueListener(log_queue, output)
+
+        root = logging.getLogger()
+        root.addHandler(_handler)
+        root.setLevel(level.upper())
+        _listener.start()
+        return _handler
+
+
+def shutdown_logging() -> None:
+    """Flush the queued records and remove the handler installed by configure_logging."""
+    with _lock:
+        _stop()
+
+
+def _stop() -> None:
+    global _listener, _handler
+    if _listener is not None:
+        _listener.stop()  # Writes the records still in the queue
+        _listener = None
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,289 @@
+"""
+Prometheus-style metrics for the fog API.
+
+Counters, histograms and gauges are rendered in the Prometheus text
+exposition format (version 0.0.4) at /metrics. Recording is built for the
+hot path:
+
+  - every thread writes to its own list of values (a shard), so samples
+    take no lock and never contend; the scrape sums the shards
+  - label children are resolved once with labels() and can be kept by the
+    caller, so a sample is an index lookup and a float addition
+  - no string is formatted until the scrape
+
+Values are per process: with several gunicorn workers, every worker exposes
+its own counters (scrape each worker or aggregate in Prometheus).
+"""
+
+import bisect
+import math
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Seconds; covers a fast scorer (ms) up to a stalled camera or upload
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Shards:
+    """Per-thread value arrays summed on read."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[List[float]] = []
+
+    def get(self) -> List[float]:
+        """Return the calling thread's values (created on first use)."""
+        try:
+            return self._local.values
+        except AttributeError:
+            values = [0.0] * self.size
+            with self._lock:
+                self._shards.append(values)
+            self._local.values = values
+            return values
+
+    def total(self) -> List[float]:
+        """Sum the values of every thread."""
+        with self._lock:
+            shards = list(self._shards)
+        total = [0.0] * self.size
+        for values in shards:
+            for i, value in enumerate(values):
+                total[i] += value
+        return total
+
+
+class _Metric:
+    """Base class: a named metric with optional labels."""
+
+    TYPE = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional['MetricsRegistry'] = None):
+        """
+        Initialize the metric and register it.
+
+        Args:
+            name: Metric name (e.g. fog_frames_captured_total)
+            documentation: HELP text
+            labelnames: Label names; values are given to labels() in the same order
+            registry: Registry to add the metric to (default: REGISTRY)
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def labels(self, *values) -> object:
+        """Return the child for these label values (kept by callers on hot paths)."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self) -> object:
+        raise NotImplementedError
+
+    def _label_text(self, key: Tuple[str, ...], extra: str = '') -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        with self._lock:
+            children = list(self._children.items())
+        for key, child in sorted(children):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key: Tuple[str, ...], child) -> List[str]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ('_shards',)
+
+    def __init__(self):
+        self._shards = _Shards(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._shards.get()[0] += amount
+
+    def value(self) -> float:
+        return self._shards.total()[0]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    TYPE = 'counter'
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the unlabeled counter."""
+        self.labels().inc(amount)
+
+    def _render_child(self, key, child) -> List[str]:
+        return [f"{self.name}{self._label_text(key)} {_number(child.value())}"]
+
+
+class _HistogramChild:
+    __slots__ = ('_bounds', '_shards')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._bounds = bounds
+        # One slot per bucket, one for +Inf and one for the sum
+        self._shards = _Shards(len(bounds) + 2)
+
+    def observe(self, value: float) -> None:
+        values = self._shards.get()
+        values[bisect.bisect_left(self._bounds, value)] += 1
+        values[-1] += value
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        """Return (cumulative bucket counts, sum, count)."""
+        values = self._shards.total()
+        cumulative, running = [], 0.0
+        for count in values[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, values[-1], running
+
+
+class Histogram(_Metric):
+    """Distribution of observations (e.g. latencies in seconds) in fixed buckets."""
+
+    TYPE = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Optional['MetricsRegistry'] = None):
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Record an observation on the unlabeled histogram."""
+        self.labels().observe(value)
+
+    def _render_child(self, key, child) -> List[str]:
+        cumulative, total, count = child.snapshot()
+        lines = []
+        for bound, value in zip(self.buckets + (math.inf,), cumulative):
+            le = '+Inf' if bound == math.inf else _number(bound)
+            labels = self._label_text(key, f'le="{le}"')
+            lines.append(f"{self.name}_bucket{labels} {_number(value)}")
+        lines.append(f"{self.name}_sum{self._label_text(key)} {_number(total)}")
+        lines.append(f"{self.name}_count{self._label_text(key)} {_number(count)}")
+        return lines
+
+
+class _GaugeChild:
+    __slots__ = ('_value', '_function')
+
+    def __init__(self):
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Compute the value at scrape time (e.g. a queue size)."""
+        self._function = function
+
+    def value(self) -> float:
+        if self._function is not None:
+            try:
+                return float(self._function())
+            except Exception:
+                return math.nan
+        return self._value
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, set directly or computed at scrape time."""
+
+    TYPE = 'gauge'
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def _render_child(self, key, child) -> List[str]:
+        return [f"{self.name}{self._label_text(key)} {_number(child.value())}"]
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value: float) -> str:
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+REGISTRY = MetricsRegistry()
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Fog API metrics
+
+CAPTURE_SECONDS = Histogram(
+    'fog_camera_capture_seconds', 'Time to capture the frames of one request from a camera', ['camera']
+)
+FRAMES_CAPTURED = Counter('fog_frames_captured_total', 'Frames read from a camera', ['camera'])
+FRAMES_FAILED = Counter('fog_frames_failed_total', 'Frame reads that returned no frame', ['camera'])
+SCORER_SECONDS = Histogram(
+    'fog_scorer_seconds', 'Time spent per analyzed frame in each analysis stage', ['scorer']
+)
+ANALYSIS_SECONDS = Histogram('fog_analysis_seconds', 'Time to analyze the frames of one camera')
+UPLOAD_SECONDS = Histogram(
+    'fog_cloud_upload_seconds', 'Cloud upload latency by outcome (success, timeout, error)', ['outcome']
+)
+THRESHOLD_CHECKS = Counter(
+    'fog_threshold_checks_total', 'Sensor readings checked, by whether they triggered video analysis',
+    ['triggered']
+)
+QUEUE_DEPTH = Gauge('fog_queue_depth', 'Work waiting or in flight, by queue', ['queue'])
@@ -0,0 +1,373 @@
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import itertools
+import threading
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROFILE_NAME = re.compile(r'^[\w.-]+\.json$')
+
+
+class StackSampler:
+    """
+    Statistical profiler sampling the threads working for one request.
+
+    A background thread reads sys._current_frames() every interval and
+    counts each distinct stack (root to leaf, in the collapsed "folded"
+    format used by flame graph tools). Only threads tracked for this
+    sampler are read: the request thread (see tracking()) and the pool
+    threads it dispatches work to (see propagate()), so requests running
+    concurrently in the same worker do not leak into the profile. On an
+    asyncio event loop the loop thread is shared, so it is only sampled
+    while the request's own task is running.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        """
+        Initialize the sampler (not started).
+
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.stacks: Dict[str, int] = {}
+        self.samples = 0
+        self.threads_seen = set()
+        self._threads: Dict[int, int] = {}
+        self._tasks: Dict[int, Tuple[asyncio.AbstractEventLoop, asyncio.Task]] = {}
+        self._threads_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    @contextmanager
+    def tracking(self) -> Iterator[None]:
+        """
+        Sample the calling thread while the block runs.
+
+        On an event loop thread only the current task is sampled. Work the
+        block dispatches through propagate() is sampled as well.
+        """
+        ident = threading.get_ident()
+        task = None
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            pass  # No running event loop in this thread
+        with self._threads_lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+            if task is not None:
+                self._tasks[ident] = (task.get_loop(), task)
+        token = _current_sampler.set(self)
+        try:
+            yield
+        finally:
+            _current_sampler.reset(token)
+            with self._threads_lock:
+                self._threads[ident] -= 1
+                if not self._threads[ident]:
+                    del self._threads[ident]
+                    self._tasks.pop(ident, None)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            with self._threads_lock:
+                threads = list(self._threads)
+                tasks = dict(self._tasks)
+            frames = sys._current_frames()
+            for ident in threads:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                if ident in tasks:
+                    loop, task = tasks[ident]
+                    if asyncio.current_task(loop) is not task:
+                        continue  # The loop is running another request (or idle)
+                self.threads_seen.add(ident)
+                stack = self._fold(frame)
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def _fold(self, frame) -> str:
+        """Return the folded stack of a frame."""
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+
+# Sampler of the request being profiled in the current context (None if not sampled)
+_current_sampler: ContextVar[Optional[StackSampler]] = ContextVar('profile_sampler', default=None)
+
+
+def propagate(fn: Callable) -> Callable:
+    """
+    Wrap fn so the thread that runs it is sampled with the caller's profile.
+
+    Call it when handing work to a thread pool (the pools do not copy the
+    caller's context). When the caller is not being profiled fn is returned
+    unchanged, so this costs one context variable lookup.
+    """
+    sampler = _current_sampler.get()
+    if sampler is None:
+        return fn
+
+    def run(*args, **kwargs):
+        with sampler.tracking():
+            return fn(*args, **kwargs)
+    return run
+
+
+class RequestProfiler:
+    """
+    Samples 1-in-N detection requests with a StackSampler.
+
+    Each sampled request writes one JSON profile (request parameters,
+    duration, folded stacks) to a directory that keeps only the newest
+    max_files profiles. The settings (sample_every, interval) live in
+    <directory>/settings.json, checked at most every poll_interval seconds,
+    so changing them from one gunicorn worker reaches all workers without a
+    restart. Requests that are not sampled only pay a counter increment.
+    """
+
+    def __init__(self, directory: Optional[str] = None, sample_every: int = 0,
+                 interval: float = 0.005, max_files: int = 50, poll_interval: float = 2.0):
+        """
+        Initialize the profiler.
+
+        Args:
+            directory: Where profiles and settings are stored (None disables profiling)
+            sample_every: Profile one request out of this many (0 disables sampling)
+            interval: Seconds between stack samples
+            max_files: Number of profiles kept (older ones are deleted)
+            poll_interval: Minimum seconds between settings file checks
+        """
+        self.directory = directory
+        self.sample_every = sample_every
+        self.interval = interval
+        self.max_files = max_files
+        self.poll_interval = poll_interval
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+        self._settings_state = None
+        self._next_check = 0.0
+
+    @classmethod
+    def from_env(cls) -> 'RequestProfiler':
+        """Build the profiler from PROFILE_DIR, PROFILE_SAMPLE_EVERY, PROFILE_INTERVAL_MS and PROFILE_MAX_FILES."""
+        return cls(
+            directory=os.getenv('PROFILE_DIR') or None,
+            sample_every=int(os.getenv('PROFILE_SAMPLE_EVERY', '0')),
+            interval=float(os.getenv('PROFILE_INTERVAL_MS', '5')) / 1000,
+            max_files=int(os.getenv('PROFILE_MAX_FILES', '50'))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def settings(self) -> Dict[str, Any]:
+        """Return the current settings."""
+        self._poll()
+        return {
+            'enabled': self.enabled,
+            'directory': self.directory,
+            'sample_every': self.sample_every,
+            'interval_ms': round(self.interval * 1000, 3),
+            'max_files': self.max_files
+        }
+
+    def update(self, settings: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Change sample_every and/or interval_ms at runtime.
+
+        Returns:
+            The new settings
+
+        Raises:
+            ValueError: If profiling is disabled or the values are invalid
+        """
+        if not self.enabled:
+            raise ValueError("Profiling is disabled (PROFILE_DIR is not set)")
+        unknown = set(settings) - {'sample_every', 'interval_ms'}
+        if unknown:
+            raise ValueError(f"Unknown profiler settings: {sorted(unknown)}")
+
+        sample_every = settings.get('sample_every', self.sample_every)
+        interval_ms = settings.get('interval_ms', self.interval * 1000)
+        if isinstance(sample_every, bool) or not isinstance(sample_every, int) or sample_every < 0:
+            raise ValueError("sample_every must be a non-negative integer (0 disables sampling)")
+        if isinstance(interval_ms, bool) or not isinstance(interval_ms, (int, float)) or not 0.5 <= interval_ms <= 1000:
+            raise ValueError("interval_ms must be a number between 0.5 and 1000")
+
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, 'settings.json')
+            tmp_path = f"{path}.tmp.{os.getpid()}"
+            with open(tmp_path, 'w') as f:
+                json.dump({'sample_every': sample_every, 'interval_ms': interval_ms}, f)
+            os.replace(tmp_path, path)
+            self.sample_every = sample_every
+            self.interval = interval_ms / 1000
+            self._settings_state = self._stat(path)
+
+        logger.info("Profiler settings updated: 1 in %s requests, %s ms interval", sample_every, interval_ms)
+        return self.settings()
+
+    def should_sample(self) -> bool:
+        """Decide whether the current request is profiled."""
+        if not self.enabled:
+            return False
+        if time.monotonic() >= self._next_check:
+            self._poll()
+        return self.sample_every > 0 and next(self._counter) % self.sample_every == 0
+
+    def call(self, fn: Callable[..., Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """Call fn(**kwargs), profiling it when the request is sampled."""
+        if not self.should_sample():
+            return fn(**kwargs)
+        sampler = StackSampler(self.interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            with sampler.tracking():
+                result = fn(**kwargs)
+        finally:
+            sampler.stop()
+        return self._attach(result, kwargs, sampler, time.perf_counter() - started)
+
+    async def call_async(self, fn: Callable[..., Awaitable[Dict[str, Any]]], **kwargs) -> Dict[str, Any]:
+        """
+        Asyncio variant of call.
+
+        Stopping the sampler (a thread join) and writing the profile (file
+        I/O and rotation) run in a worker thread, not on the event loop.
+        """
+        if not self.should_sample():
+            return await fn(**kwargs)
+        sampler = StackSampler(self.interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            with sampler.tracking():
+                result = await fn(**kwargs)
+        finally:
+            await asyncio.to_thread(sampler.stop)
+        return await asyncio.to_thread(self._attach, result, kwargs, sampler, time.perf_counter() - started)
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """Return the stored profiles, newest first."""
+        if not self.enabled or not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for name in os.listdir(self.directory):
+            if not PROFILE_NAME.match(name) or name == 'settings.json':
+                continue
+            st = os.stat(os.path.join(self.directory, name))
+            profiles.append({
+                'name': name,
+                'size': st.st_size,
+                'created_at': datetime.fromtimestamp(st.st_mtime).isoformat()
+            })
+        profiles.sort(key=lambda p: p['name'], reverse=True)
+        return profiles
+
+    def load(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return a stored profile, or None if it does not exist."""
+        if not self.enabled or not PROFILE_NAME.match(name) or name == 'settings.json':
+            return None
+        try:
+            with open(os.path.join(self.directory, name)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def folded(profile: Dict[str, Any]) -> str:
+        """Render a profile's stacks in the folded format (flamegraph.pl, speedscope)."""
+        return ''.join(f"{stack} {count}\n" for stack, count in profile['stacks'].items())
+
+    def _attach(self, result: Dict[str, Any], params: Dict[str, Any], sampler: StackSampler,
+                duration: float) -> Dict[str, Any]:
+        """Write the profile and reference it from the result."""
+        try:
+            result['profile'] = self._write(params, sampler, duration)
+        except OSError as e:
+            logger.error("Failed to write profile: %s", e)
+        return result
+
+    def _write(self, params: Dict[str, Any], sampler: StackSampler, duration: float) -> str:
+        """Write a profile and delete the oldest ones beyond max_files."""
+        now = datetime.now()
+        name = f"{now.strftime('%Y%m%dT%H%M%S%f')}-{os.getpid()}.json"
+        profile = {
+            'created_at': now.isoformat(),
+            'pid': os.getpid(),
+            'request': params,
+            'duration_ms': round(duration * 1000, 3),
+            'interval_ms': round(sampler.interval * 1000, 3),
+            'samples': sampler.samples,
+            # Only this request's threads are sampled (not the whole process)
+            'scope': 'request',
+            'threads': len(sampler.threads_seen),
+            'stacks': dict(sorted(sampler.stacks.items(), key=lambda item: -item[1]))
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, name), 'w') as f:
+            json.dump(profile, f, default=str)
+
+        for old in self.list_profiles()[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.directory, old['name']))
+            except FileNotFoundError:
+                pass  # Removed by another worker
+        logger.info("Profile written: %s (%d samples)", name, sampler.samples)
+        return name
+
+    def _poll(self) -> None:
+        """Reload settings.json if another worker changed it."""
+        if not self.enabled or not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._next_check = time.monotonic() + self.poll_interval
+            path = os.path.join(self.directory, 'settings.json')
+            state = self._stat(path)
+            if state is None or state == self._settings_state:
+                return
+            self._settings_state = state
+            try:
+                with open(path) as f:
+                    settings = json.load(f)
+                self.sample_every = int(settings.get('sample_every', self.sample_every))
+                self.interval = float(settings.get('interval_ms', self.interval * 1000)) / 1000
+            except (OSError, ValueError, TypeError, AttributeError) as e:
+                logger.error("Ignoring invalid profiler settings %s: %s", path, e)
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _stat(path: str):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
@@ -0,0 +1,87 @@
+import cv2
+import numpy as np
+from typing import Optional, Sequence, Tuple
+
+
+class RegionOfInterest:
+    """
+    Rasterized region of interest of a camera for one frame size.
+
+    Polygons are given in normalized [x, y] coordinates (0.0-1.0 of the frame
+    width/height) so the same configuration works at any resolution:
+
+        [[[0.0, 0.25], [1.0, 0.25], [1.0, 1.0], [0.0, 1.0]]]   # skip the sky
+
+    The union of the polygons is rasterized once. Frames are cropped to its
+    bounding box (a view, no copy) and, unless the region is exactly that
+    rectangle, statistics are restricted to the pixels of mask.
+    """
+
+    def __init__(self, polygons: Sequence[Sequence[Sequence[float]]], shape: Tuple[int, ...]):
+        """
+        Rasterize the polygons for a frame shape.
+
+        Args:
+            polygons: List of polygons, each a list of [x, y] normalized points
+            shape: Frame shape (height, width[, channels])
+
+        Raises:
+            ValueError: If the polygons are invalid or cover no pixels
+        """
+        self.polygons = self.validate(polygons)
+        height, width = shape[:2]
+
+        full = np.zeros((height, width), dtype=np.uint8)
+        scale = np.array([width - 1, height - 1], dtype=np.float64)
+        points = [np.round(np.asarray(polygon) * scale).astype(np.int32) for polygon in self.polygons]
+        cv2.fillPoly(full, points, 1)
+
+        x, y, w, h = cv2.boundingRect(full)
+        if w == 0 or h == 0:
+            raise ValueError("Region of interest covers no pixels")
+
+        self.bbox = (y, y + h, x, x + w)
+        mask = full[y:y + h, x:x + w].copy()
+        self.pixels = int(cv2.countNonZero(mask))
+        # uint8 mask (1 inside), or None when the region is its bounding box
+        self.mask: Optional[np.ndarray] = None if self.pixels == mask.size else mask
+        self.area_fraction = self.pixels / float(height * width)
+
+    @staticmethod
+    def validate(polygons) -> list:
+        """
+        Validate a polygon configuration.
+
+        Returns:
+            Polygons as lists of (x, y) float tuples
+
+        Raises:
+            ValueError: If the configuration is not a list of polygons with at
+                least three normalized points each
+        """
+        if not isinstance(polygons, (list, tuple)) or not polygons:
+            raise ValueError("ROI must be a non-empty list of polygons")
+        result = []
+        for polygon in polygons:
+            try:
+                points = [(float(x), float(y)) for x, y in polygon]
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid ROI polygon: {polygon!r}")
+            if len(points) < 3:
+                raise ValueError("ROI polygons need at least three points")
+            if any(not (0.0 <= v <= 1.0) for point in points for v in point):
+                raise ValueError("ROI coordinates must be normalized to 0.0-1.0")
+            result.append(points)
+        return result
+
+    def crop(self, image: np.ndarray) -> np.ndarray:
+        """Return the bounding-box view of an image (no copy)."""
+        y0, y1, x0, x1 = self.bbox
+        return image[y0:y1, x0:x1]
+
+    def masked(self, image: np.ndarray) -> np.ndarray:
+        """Return the cropped image with pixels outside the region set to zero."""
+        cropped = self.crop(image)
+        if self.mask is None:
+            return cropped
+        return cv2.bitwise_and(cropped, cropped, mask=self.mask)
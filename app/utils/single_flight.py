@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import logging
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into a single execution.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is still running wait for it and receive the same result
+    (or exception) instead of starting a duplicate execution. Once the call
+    finishes the key is released, so the next call runs again.
+    """
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn once per key among concurrent callers.
+
+        Args:
+            key: Key identifying the shared work (e.g. a camera id)
+            fn: Callable executed by the leader
+
+        Returns:
+            Tuple (result, shared) where shared is True when the result was
+            produced by another caller's execution
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            logger.debug("Joining in-flight call for key %s", key)
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def in_flight(self) -> int:
+        """Return the number of keys currently being executed."""
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    Asyncio counterpart of SingleFlight for coroutines on one event loop.
+
+    The leader's coroutine runs as a task shielded from cancellation, so a
+    disconnecting client does not abort the work other callers are waiting on.
+    """
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Await fn() once per key among concurrent callers.
+
+        Args:
+            key: Key identifying the shared work (e.g. a camera id)
+            fn: Coroutine function executed by the leader
+
+        Returns:
+            Tuple (result, shared) where shared is True when the result was
+            produced by another caller's execution
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+
+        if not shared:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            logger.debug("Joining in-flight call for key %s", key)
+
+        return await asyncio.shield(task), shared
+
+    def in_flight(self) -> int:
+        """Return the number of keys currently being executed."""
+        return len(self._calls)
@@ -0,0 +1,100 @@
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class StageTimer:
+    """
+    Per-request stage timings for diagnosing slow sites.
+
+    Durations are measured with time.perf_counter (monotonic, high
+    resolution) and accumulated per stage name; repeated stages (e.g. one
+    decode per frame) are summed and also kept individually when recorded
+    with add(..., per_item=True). Child timers hold the breakdown of one
+    camera, which is analyzed on its own thread.
+
+    Usage:
+        timer = StageTimer()
+        with timer.stage('upload'):
+            upload()
+        timer.to_dict()   # {'upload_ms': 12.345, 'total_ms': ...}
+    """
+
+    def __init__(self):
+        """Start the timer."""
+        self._started = time.perf_counter()
+        self._stages: Dict[str, float] = {}
+        self._items: Dict[str, List[float]] = {}
+        self._children: Dict[str, 'StageTimer'] = {}
+        self._lock = threading.Lock()
+        self._total: Optional[float] = None
+        # Non-timing context reported with the stages (e.g. frames, cache)
+        self.attributes: Dict[str, Any] = {}
+
+    def add(self, stage: str, seconds: float, per_item: bool = False) -> None:
+        """
+        Add a measured duration to a stage.
+
+        Args:
+            stage: Stage name (reported as '<stage>_ms')
+            seconds: Duration in seconds
+            per_item: Also keep this duration individually ('<stage>_per_item_ms')
+        """
+        self._stages[stage] = self._stages.get(stage, 0.0) + seconds
+        if per_item:
+            self._items.setdefault(stage, []).append(seconds)
+
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """Time the enclosed block as a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def child(self, name: str) -> 'StageTimer':
+        """Return the child timer for name (e.g. a camera id), created on first use."""
+        with self._lock:
+            child = self._children.get(name)
+            if child is None:
+                child = self._children[name] = StageTimer()
+            return child
+
+    def stop(self) -> None:
+        """Freeze the total (otherwise measured when to_dict is called)."""
+        if self._total is None:
+            self._total = time.perf_counter() - self._started
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the timings in milliseconds (rounded to microseconds)."""
+        result: Dict[str, Any] = {f'{stage}_ms': _ms(seconds) for stage, seconds in self._stages.items()}
+        for stage, items in self._items.items():
+            result[f'{stage}_per_item_ms'] = [_ms(seconds) for seconds in items]
+        result.update(self.attributes)
+        total = self._total if self._total is not None else time.perf_counter() - self._started
+        result['total_ms'] = _ms(total)
+        if self._children:
+            result['cameras'] = {name: child.to_dict() for name, child in self._children.items()}
+        return result
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def timed(timer: Optional[StageTimer], stage: str):
+    """Return timer.stage(stage), or a no-op context when timing is disabled."""
+    return timer.stage(stage) if timer is not None else _NULL_STAGE
+
+
+class _NullStage:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
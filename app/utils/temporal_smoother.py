@@ -0,0 +1,182 @@
+import time
+import threading
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TemporalSmoother:
+    """
+    Per-camera temporal smoothing of detection probabilities.
+
+    Keeps an exponentially weighted moving average (EWMA) of the four
+    probabilities for every camera across requests, and debounces the
+    fog/smoke decisions with hysteresis around the detection threshold: a
+    detection switches on when the smoothed probability rises above the
+    threshold and only switches off once it falls below threshold - hysteresis.
+    Each request can therefore capture fewer frames and still produce stable
+    decisions.
+    """
+
+    PROBABILITY_KEYS = ('probability_fog', 'probability_smoke', 'probability_vapor', 'probability_smug')
+    DETECTION_KEYS = {'fog_detected': 'probability_fog', 'smoke_detected': 'probability_smoke'}
+
+    def __init__(self, alpha: float = 0.4, hysteresis: float = 0.05, max_age: float = 300.0):
+        """
+        Initialize the smoother.
+
+        Args:
+            alpha: Weight of the newest sample (1.0 disables smoothing)
+            hysteresis: How far below the detection threshold the smoothed
+                probability must fall before a detection switches off
+            max_age: Seconds without updates after which a camera's state is reset
+        """
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        if hysteresis < 0:
+            raise ValueError("hysteresis must not be negative")
+
+        self.alpha = alpha
+        self.hysteresis = hysteresis
+        self.max_age = max_age
+
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, camera_id: str, detection_results: Dict[str, Any],
+               threshold: float) -> Dict[str, Any]:
+        """
+        Fold a new detection result into the camera state.
+
+        Results without analyzed frames leave the state untouched.
+
+        Args:
+            camera_id: Camera the result belongs to
+            detection_results: analyze_frames() result
+            threshold: Detection threshold the result was produced with
+                (DetectionUtil.detection_threshold); a detection switches on
+                above it and off below threshold - hysteresis
+
+        Returns:
+            Copy of detection_results with smoothed probabilities and debounced
+            decisions; the raw probabilities are kept in analysis_details['raw']
+        """
+        details = detection_results.get('analysis_details', {})
+        if not details.get('frames_analyzed'):
+            return detection_results
+
+        now = time.monotonic()
+        with self._lock:
+            state = self._live_state(camera_id, now)
+            if state is None:
+                state = {
+                    'ewma': {key: detection_results[key] for key in self.PROBABILITY_KEYS},
+                    'fog_detected': False,
+                    'smoke_detected': False,
+                    'samples': 0
+                }
+                self._states[camera_id] = state
+            else:
+                for key in self.PROBABILITY_KEYS:
+                    state['ewma'][key] += self.alpha * (detection_results[key] - state['ewma'][key])
+
+            for flag, key in self.DETECTION_KEYS.items():
+                limit = threshold - self.hysteresis if state[flag] else threshold
+                state[flag] = state['ewma'][key] > limit
+
+            state['samples'] += 1
+            state['updated_monotonic'] = now
+            state['updated_at'] = datetime.now().isoformat()
+
+            smoothed, samples = self._overlay(state, detection_results)
+
+        return self._with_details(smoothed, detection_results, details, samples)
+
+    def current(self, camera_id: str, detection_results: Dict[str, Any],
+                threshold: float) -> Dict[str, Any]:
+        """
+        Return the camera's current smoothed state without folding a result in.
+
+        For results that are not new observations (detection cache hits):
+        folding them in again would count the same stale sample repeatedly
+        and drag the average toward it. A camera without live state falls
+        back to update().
+
+        Args:
+            camera_id: Camera the result belongs to
+            detection_results: Result to overlay the smoothed values on
+            threshold: Detection threshold, used only by the update() fallback
+
+        Returns:
+            Same shape as update()
+        """
+        details = detection_results.get('analysis_details', {})
+        if not details.get('frames_analyzed'):
+            return detection_results
+
+        with self._lock:
+            state = self._live_state(camera_id, time.monotonic())
+            if state is not None:
+                smoothed, samples = self._overlay(state, detection_results)
+                return self._with_details(smoothed, detection_results, details, samples)
+
+        return self.update(camera_id, detection_results, threshold)
+
+    def _live_state(self, camera_id: str, now: float) -> Optional[Dict[str, Any]]:
+        """Return the camera state unless it is missing or expired (lock held)."""
+        state = self._states.get(camera_id)
+        if state is None or now - state['updated_monotonic'] > self.max_age:
+            return None
+        return state
+
+    def _overlay(self, state: Dict[str, Any], detection_results: Dict[str, Any]):
+        """Copy detection_results with the state's probabilities and decisions (lock held)."""
+        smoothed = dict(detection_results)
+        for key in self.PROBABILITY_KEYS:
+            smoothed[key] = round(state['ewma'][key], 3)
+        for flag in self.DETECTION_KEYS:
+            smoothed[flag] = state[flag]
+        return smoothed, state['samples']
+
+    def _with_details(self, smoothed: Dict[str, Any], detection_results: Dict[str, Any],
+                      details: Dict[str, Any], samples: int) -> Dict[str, Any]:
+        """Attach the raw probabilities and smoothing parameters to analysis_details."""
+        smoothed['analysis_details'] = dict(
+            details,
+            raw={key: detection_results[key] for key in self.PROBABILITY_KEYS},
+            smoothing={'alpha': self.alpha, 'samples': samples}
+        )
+        return smoothed
+
+    def state(self, camera_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Snapshot of the smoothing state.
+
+        Args:
+            camera_id: Camera to report, or None for every camera
+
+        Returns:
+            Dictionary camera_id -> smoothed probabilities and decisions
+        """
+        with self._lock:
+            return {
+                cid: {
+                    'probabilities': {key: round(value, 3) for key, value in state['ewma'].items()},
+                    'fog_detected': state['fog_detected'],
+                    'smoke_detected': state['smoke_detected'],
+                    'samples': state['samples'],
+                    'updated_at': state['updated_at']
+                }
+                for cid, state in self._states.items()
+                if camera_id is None or cid == camera_id
+            }
+
+    def reset(self, camera_id: Optional[str] = None) -> None:
+        """Forget the state of one camera, or of every camera."""
+        with self._lock:
+            if camera_id is None:
+                self._states.clear()
+            else:
+                self._states.pop(camera_id, None)
@@ -0,0 +1,204 @@
+import os
+import json
+import time
+import threading
+import logging
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional
+from app.utils.detection_util import DetectionUtil
+from app.utils.threshold_util import ThresholdEngine
+
+logger = logging.getLogger(__name__)
+
+
+class ThresholdSnapshot:
+    """
+    Immutable set of detection thresholds and sensor threshold rules.
+
+    A snapshot is never modified after it is built: a new configuration
+    produces a new snapshot that replaces the previous one with a single
+    reference assignment, so a request that grabbed a snapshot keeps using
+    consistent values even if a reload happens while it is running.
+    """
+
+    __slots__ = ('version', 'source', 'loaded_at', 'detection_util', 'engine')
+
+    def __init__(self, version: int, source: str, detection_util: DetectionUtil, engine: ThresholdEngine):
+        """
+        Initialize the snapshot.
+
+        Args:
+            version: Monotonic version number (increases on every swap)
+            source: Where the values came from ('defaults', a file path or 'api')
+            detection_util: DetectionUtil configured with the frame thresholds
+            engine: ThresholdEngine compiled from the sensor rules
+        """
+        self.version = version
+        self.source = source
+        self.loaded_at = datetime.now().isoformat()
+        self.detection_util = detection_util
+        self.engine = engine
+
+    def to_config(self) -> Dict[str, Any]:
+        """Return the configuration (file format) this snapshot was built from."""
+        detection = self.detection_util.thresholds()
+        detection['smoke_brightness_range'] = list(detection['smoke_brightness_range'])
+        return {'detection': detection, 'rules': self.engine.rules}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the snapshot metadata and values."""
+        return {
+            'version': self.version,
+            'source': self.source,
+            'loaded_at': self.loaded_at,
+            **self.to_config()
+        }
+
+
+class ThresholdStore:
+    """
+    Hot-reloadable holder of the current ThresholdSnapshot.
+
+    The configuration file is JSON with two optional sections:
+
+        {
+            "detection": {"fog_brightness_threshold": 130, "detection_threshold": 0.45},
+            "rules": {"FOG": {"humidity": {"min": 90}, "temperature": {"min": 1, "max": 20}}}
+        }
+
+    Missing detection values keep the DetectionUtil defaults and missing
+    rules keep the base rules (THRESHOLD_RULES or ThresholdEngine defaults).
+    The file's mtime is checked at most once every poll_interval seconds,
+    lazily on access, so every gunicorn worker picks up an edited file without
+    a restart and without losing caches or smoothing state. An invalid file is
+    logged and ignored; the previous snapshot stays active.
+    """
+
+    SECTIONS = ('detection', 'rules')
+
+    def __init__(self, path: Optional[str] = None, poll_interval: float = 2.0,
+                 base_rules: Optional[Mapping[str, Any]] = None):
+        """
+        Initialize the store and load the file if it exists.
+
+        Args:
+            path: Threshold configuration file (None keeps the defaults, in memory only)
+            poll_interval: Minimum seconds between file modification checks
+            base_rules: Sensor rules used when the file has no 'rules' section
+        """
+        self.path = path
+        self.poll_interval = poll_interval
+        self._base_rules = base_rules
+        self._lock = threading.Lock()
+        self._file_state = None
+        self._next_check = 0.0
+        self._snapshot = self._build({}, 'defaults', version=1)
+
+        if self.path:
+            self._poll()
+
+    @classmethod
+    def from_env(cls) -> 'ThresholdStore':
+        """Build the store from THRESHOLDS_FILE, THRESHOLDS_POLL_INTERVAL and THRESHOLD_RULES."""
+        return cls(
+            path=os.getenv('THRESHOLDS_FILE') or None,
+            poll_interval=float(os.getenv('THRESHOLDS_POLL_INTERVAL', '2')),
+            base_rules=ThresholdEngine.from_env().rules
+        )
+
+    def current(self) -> ThresholdSnapshot:
+        """Return the current snapshot, reloading the file first if it changed."""
+        if self.path and time.monotonic() >= self._next_check:
+            self._poll()
+        return self._snapshot
+
+    def update(self, config: Mapping[str, Any]) -> ThresholdSnapshot:
+        """
+        Apply new values on top of the current snapshot.
+
+        Detection values are merged into the current ones; a 'rules' section
+        replaces the current rules. When a file is configured the merged
+        configuration is written to it atomically, so the other workers
+        reload it on their next poll.
+
+        Args:
+            config: Partial configuration in the file format
+
+        Returns:
+            The new snapshot
+
+        Raises:
+            ValueError: If the configuration is invalid
+            OSError: If the file cannot be written
+        """
+        self._validate_sections(config)
+
+        with self._lock:
+            merged = self._snapshot.to_config()
+            merged['detection'].update(config.get('detection') or {})
+            if config.get('rules'):
+                merged['rules'] = config['rules']
+
+            snapshot = self._build(merged, self.path or 'api', version=self._snapshot.version + 1)
+
+            if self.path:
+                tmp_path = f"{self.path}.tmp.{os.getpid()}"
+                with open(tmp_path, 'w') as f:
+                    json.dump(merged, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, self.path)
+                self._file_state = self._stat()
+
+            self._snapshot = snapshot
+
+        logger.info("Thresholds updated to version %d", snapshot.version)
+        return snapshot
+
+    def _poll(self) -> None:
+        """Reload the file if its modification time or size changed."""
+        if not self._lock.acquire(blocking=False):
+            return  # Another thread is already checking
+        try:
+            self._next_check = time.monotonic() + self.poll_interval
+            state = self._stat()
+            if state is None or state == self._file_state:
+                return
+            self._file_state = state
+
+            try:
+                with open(self.path) as f:
+                    config = json.load(f)
+                self._validate_sections(config)
+                snapshot = self._build(config, self.path, version=self._snapshot.version + 1)
+            except (OSError, ValueError) as e:
+                logger.error("Ignoring invalid threshold file %s: %s", self.path, e)
+                return
+
+            self._snapshot = snapshot
+            logger.info("Thresholds reloaded from %s (version %d)", self.path, snapshot.version)
+        finally:
+            self._lock.release()
+
+    def _stat(self):
+        """Return (mtime_ns, size) of the file, or None if it does not exist."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _validate_sections(self, config: Any) -> None:
+        """Reject configurations that are not objects or have unknown sections."""
+        if not isinstance(config, Mapping):
+            raise ValueError("Threshold configuration must be a JSON object")
+        unknown = set(config) - set(self.SECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown threshold sections: {sorted(unknown)}")
+
+    def _build(self, config: Mapping[str, Any], source: str, version: int) -> ThresholdSnapshot:
+        """Build a validated snapshot from a configuration."""
+        try:
+            detection_util = DetectionUtil(config.get('detection'))
+            engine = ThresholdEngine(config.get('rules') or self._base_rules)
+        except (TypeError, AttributeError) as e:
+            raise ValueError(f"Invalid threshold configuration: {str(e)}")
+        return ThresholdSnapshot(version, source, detection_util, engine)
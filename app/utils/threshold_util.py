@@ -0,0 +1,153 @@
+import os
+import json
+import logging
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ThresholdEngine:
+    """
+    Vectorized evaluation of sensor threshold rules.
+
+    Rules are defined as data instead of class constants. Each rule is a named
+    conjunction of inclusive bounds on the readings:
+
+        {
+            "FOG":   {"humidity": {"min": 90.0}, "temperature": {"min": 1.0, "max": 20.0}},
+            "SMOKE": {"temperature": {"min": 38.0}, "humidity": {"max": 30.0}}
+        }
+
+    Rules are compiled once into bound matrices, so arrays of readings are
+    evaluated in a single NumPy pass (linear in the number of readings) and
+    single readings use precompiled Python comparisons without rebuilding
+    anything per call.
+    """
+
+    FIELDS = ('temperature', 'humidity')
+    UNITS = {'temperature': '°C', 'humidity': '%'}
+
+    DEFAULT_RULES = {
+        'FOG': {
+            'humidity': {'min': 90.0},                    # >= 90%
+            'temperature': {'min': 1.0, 'max': 20.0}      # 1°C - 20°C
+        },
+        'SMOKE': {
+            'temperature': {'min': 38.0},                 # >= 38°C
+            'humidity': {'max': 30.0}                     # <= 30%
+        }
+    }
+
+    def __init__(self, rules: Optional[Mapping[str, Mapping[str, Mapping[str, float]]]] = None):
+        """
+        Compile the threshold rules.
+
+        Args:
+            rules: Rule definitions (default: DEFAULT_RULES)
+
+        Raises:
+            ValueError: If a rule references an unknown field or has no bounds
+        """
+        rules = self.DEFAULT_RULES if rules is None else rules
+        self.rule_names: List[str] = list(rules)
+
+        lower = np.full((len(rules), len(self.FIELDS)), -np.inf)
+        upper = np.full((len(rules), len(self.FIELDS)), np.inf)
+        self._scalar_rules: List[Tuple[str, List[Tuple[int, float, float]]]] = []
+
+        for r, (name, bounds) in enumerate(rules.items()):
+            if not bounds:
+                raise ValueError(f"Threshold rule '{name}' has no bounds")
+            compiled = []
+            for field, bound in bounds.items():
+                if field not in self.FIELDS:
+                    raise ValueError(f"Threshold rule '{name}' uses unknown field '{field}'")
+                if 'min' not in bound and 'max' not in bound:
+                    raise ValueError(f"Threshold rule '{name}' needs 'min' or 'max' for '{field}'")
+                f = self.FIELDS.index(field)
+                lower[r, f] = float(bound.get('min', -np.inf))
+                upper[r, f] = float(bound.get('max', np.inf))
+                compiled.append((f, lower[r, f], upper[r, f]))
+            self._scalar_rules.append((name, compiled))
+
+        # Shapes (rules, fields, 1) broadcast against readings (fields, n)
+        self._lower = lower[:, :, np.newaxis]
+        self._upper = upper[:, :, np.newaxis]
+        self.rules = {name: {field: dict(bound) for field, bound in bounds.items()}
+                      for name, bounds in rules.items()}
+        self._description = self._describe()
+
+    @classmethod
+    def from_env(cls) -> 'ThresholdEngine':
+        """Build the engine from the THRESHOLD_RULES environment variable (JSON)."""
+        raw = os.getenv('THRESHOLD_RULES')
+        return cls(json.loads(raw) if raw else None)
+
+    def evaluate(self, temperatures: np.ndarray, humidities: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Evaluate every rule over arrays of readings.
+
+        Args:
+            temperatures: Temperatures in Celsius
+            humidities: Humidities as percentage
+
+        Returns:
+            Dictionary rule name -> boolean mask (one entry per reading)
+        """
+        readings = np.vstack([np.asarray(temperatures, dtype=np.float64),
+                              np.asarray(humidities, dtype=np.float64)])
+        matches = ((readings >= self._lower) & (readings <= self._upper)).all(axis=1)
+        return dict(zip(self.rule_names, matches))
+
+    def match(self, temperature: float, humidity: float) -> Dict[str, bool]:
+        """
+        Evaluate every rule for a single reading.
+
+        Returns:
+            Dictionary rule name -> bool
+        """
+        reading = (temperature, humidity)
+        return {
+            name: all(low <= reading[f] <= high for f, low, high in bounds)
+            for name, bounds in self._scalar_rules
+        }
+
+    def check_result(self, matches: Mapping[str, bool]) -> Dict[str, Any]:
+        """
+        Build the threshold check dictionary reported by early detection.
+
+        Args:
+            matches: Dictionary rule name -> whether the rule matched
+
+        Returns:
+            Dictionary with threshold check results
+        """
+        conditions_detected = [name for name in self.rule_names if matches.get(name)]
+        return {
+            'should_analyze': bool(conditions_detected),
+            'fog_conditions_met': bool(matches.get('FOG', False)),
+            'smoke_conditions_met': bool(matches.get('SMOKE', False)),
+            'conditions_detected': conditions_detected,
+            'thresholds': self._description
+        }
+
+    def check(self, temperature: float, humidity: float) -> Dict[str, Any]:
+        """Evaluate a single reading and build its threshold check dictionary."""
+        return self.check_result(self.match(temperature, humidity))
+
+    def _describe(self) -> Dict[str, Dict[str, str]]:
+        """Human-readable thresholds (computed once; treat as read-only)."""
+        description = {}
+        for name, bounds in self.rules.items():
+            description[name.lower()] = {}
+            for field, bound in bounds.items():
+                unit = self.UNITS[field]
+                if 'min' in bound and 'max' in bound:
+                    text = f"{float(bound['min'])}{unit} - {float(bound['max'])}{unit}"
+                elif 'min' in bound:
+                    text = f">= {float(bound['min'])}{unit}"
+                else:
+                    text = f"<= {float(bound['max'])}{unit}"
+                description[name.lower()][field] = text
+        return description
@@ -0,0 +1,80 @@
+"""
+Cold-start benchmark for the Flask fog API.
+
+Measures, in fresh interpreter processes, how long it takes to import the
+application and build it with create_app(), and which heavy modules are
+already loaded once the app is ready to serve its first request. Also reports
+the cost of the first /early-detection request path (controller construction).
+
+Usage:
+    python -m benchmarks.bench_cold_start [--runs 5] [--config production]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ('cv2', 'numpy', 'requests', 'sqlalchemy', 'flask_sqlalchemy', 'flasgger')
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from app.app import create_app
+app = create_app({config!r})
+boot_ms = (time.perf_counter() - start) * 1000
+loaded = [m for m in {heavy!r} if m in sys.modules]
+start = time.perf_counter()
+from app.modules.cloud_fog.route import get_cloud_fog_controller
+get_cloud_fog_controller()
+first_request_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{'boot_ms': boot_ms, 'first_controller_ms': first_request_ms, 'loaded': loaded}}))
+"""
+
+
+def run_once(config: str) -> dict:
+    """Boot the app in a fresh interpreter and return its measurements."""
+    output = subprocess.check_output(
+        [sys.executable, '-c', PROBE.format(config=config, heavy=HEAVY_MODULES)],
+        cwd=ROOT,
+        stderr=subprocess.DEVNULL,
+        text=True
+    )
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='Number of fresh processes to measure')
+    parser.add_argument('--config', default='production', help='Config name passed to create_app')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    runs = [run_once(args.config) for _ in range(args.runs)]
+    boot = [r['boot_ms'] for r in runs]
+    first = [r['first_controller_ms'] for r in runs]
+    summary = {
+        'config': args.config,
+        'runs': args.runs,
+        'boot_ms_median': round(statistics.median(boot), 1),
+        'boot_ms_min': round(min(boot), 1),
+        'first_controller_ms_median': round(statistics.median(first), 1),
+        'heavy_modules_loaded_at_boot': runs[-1]['loaded']
+    }
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"create_app('{args.config}') over {args.runs} fresh processes")
+    print(f"  boot (import + create_app): median {summary['boot_ms_median']} ms, min {summary['boot_ms_min']} ms")
+    print(f"  first controller build:     median {summary['first_controller_ms_median']} ms")
+    print(f"  heavy modules loaded at boot: {', '.join(summary['heavy_modules_loaded_at_boot']) or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
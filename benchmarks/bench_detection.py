@@ -0,0 +1,192 @@
+"""
+Benchmark suite for the detection hot paths.
+
+Times, on deterministic synthetic frames (see benchmarks/synthetic.py):
+  - each DetectionUtil._detect_*_in_frame scorer, per scene and resolution
+  - DetectionUtil.analyze_frames for clips of 1, 8 and 24 frames
+  - the full Cloud_fogController.early_detection path against a FakeCamera
+    and a local FakeCloud HTTP endpoint (detection cache disabled)
+
+Results are written as JSON so runs can be compared between commits.
+
+Usage:
+    python -m benchmarks.bench_detection [--resolutions 480p,720p] [--runs 15]
+                                         [--output results.json]
+                                         [--compare baseline.json] [--tolerance 0.2]
+
+With --compare, every case whose median is more than --tolerance slower
+than the baseline is reported and the exit status is 1.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict
+import cv2
+import numpy as np
+from benchmarks.synthetic import RESOLUTIONS, SCENES, FakeCamera, FakeCloud, make_frame, make_frames
+
+ROOT = Path(__file__).resolve().parent.parent
+SCORERS = ('fog', 'smoke', 'vapor', 'smug')
+CLIP_LENGTHS = (1, 8, 24)
+
+
+def time_case(fn: Callable[[], object], runs: int, warmup: int = 2) -> Dict[str, float]:
+    """Run fn repeatedly and return latency statistics in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'median_ms': round(statistics.median(samples), 3),
+        'min_ms': round(samples[0], 3),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        'runs': runs
+    }
+
+
+def bench_scorers(resolutions, runs: int) -> Dict[str, dict]:
+    from app.utils.detection_util import DetectionUtil
+
+    detection_util = DetectionUtil()
+    results = {}
+    for resolution in resolutions:
+        for scene in SCENES:
+            frame = make_frame(scene, RESOLUTIONS[resolution])
+            for scorer in SCORERS:
+                fn = getattr(detection_util, f'_detect_{scorer}_in_frame')
+                results[f'scorer/{scorer}/{scene}/{resolution}'] = time_case(lambda: fn(frame), runs)
+    return results
+
+
+def bench_analyze_frames(resolutions, runs: int) -> Dict[str, dict]:
+    from app.utils.detection_util import DetectionUtil
+
+    detection_util = DetectionUtil()
+    results = {}
+    for resolution in resolutions:
+        for length in CLIP_LENGTHS:
+            frames = make_frames('fog', RESOLUTIONS[resolution], length)
+            results[f'analyze_frames/{length}/{resolution}'] = time_case(
+                lambda: detection_util.analyze_frames(frames), max(3, runs // 3)
+            )
+    return results
+
+
+def bench_early_detection(resolutions, runs: int) -> Dict[str, dict]:
+    from app.modules.cloud_fog.controller import Cloud_fogController
+    from app.utils.camera_registry import CameraRegistry
+    from app.utils.detection_cache import DetectionCache
+
+    results = {}
+    with FakeCloud() as cloud:
+        for resolution in resolutions:
+            controller = Cloud_fogController()
+            controller.camera_registry = CameraRegistry(
+                [FakeCamera(make_frames('fog', RESOLUTIONS[resolution], controller.num_frames))]
+            )
+            controller.detection_cache = DetectionCache(max_size=0)
+            controller.cloud_api_url = cloud.url
+            results[f'early_detection/{resolution}'] = time_case(
+                lambda: controller.early_detection(temperature=15.0, humidity=95.0), max(3, runs // 3)
+            )
+            controller.shutdown()
+    return results
+
+
+def environment() -> Dict[str, str]:
+    """Describe the machine and code version the results belong to."""
+    try:
+        commit = subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = 'unknown'
+    return {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'platform': platform.platform(),
+        'cpu_threads': str(cv2.getNumThreads())
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> int:
+    """Print the median ratio per case and return the number of regressions."""
+    regressions = 0
+    print(f"\n{'case':<44} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]['median_ms'], current['median_ms']
+        ratio = after / before if before else float('inf')
+        flag = ''
+        if ratio > 1 + tolerance:
+            regressions += 1
+            flag = '  REGRESSION'
+        print(f"{name:<44} {before:>10.3f} {after:>10.3f} {ratio:>7.2f}{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resolutions', default='480p,720p,1080p',
+                        help=f"Comma-separated subset of {','.join(RESOLUTIONS)}")
+    parser.add_argument('--runs', type=int, default=15, help='Timed runs per scorer case')
+    parser.add_argument('--only', choices=('scorers', 'analyze_frames', 'early_detection'),
+                        help='Run a single group of cases')
+    parser.add_argument('--output', type=Path, help='Write results as JSON to this file')
+    parser.add_argument('--compare', type=Path, help='Baseline JSON file from a previous run')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed slowdown before a case counts as a regression (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    resolutions = [r.strip() for r in args.resolutions.split(',') if r.strip()]
+    unknown = [r for r in resolutions if r not in RESOLUTIONS]
+    if unknown:
+        parser.error(f"Unknown resolutions: {', '.join(unknown)}")
+
+    # The detection path logs at INFO per frame; keep the output readable
+    logging.disable(logging.INFO)
+
+    groups = {
+        'scorers': bench_scorers,
+        'analyze_frames': bench_analyze_frames,
+        'early_detection': bench_early_detection,
+    }
+    results: Dict[str, dict] = {}
+    for name, bench in groups.items():
+        if args.only and name != args.only:
+            continue
+        results.update(bench(resolutions, args.runs))
+
+    for name, stats in results.items():
+        print(f"{name:<44} median {stats['median_ms']:>9.3f} ms   p95 {stats['p95_ms']:>9.3f} ms")
+
+    if args.output:
+        args.output.write_text(json.dumps({'environment': environment(), 'results': results}, indent=2) + '\n')
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())['results']
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{regressions} case(s) slower than baseline by more than {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Micro-benchmark of JSON response serialization.
+
+Compares, on responses of 1k and 10k items:
+  - lambda:    DynamoDB-shaped items (Decimal numbers, like get_sensor_data)
+               with the previous json.dumps(default=decimal_default) against
+               lambda_functions/shared/fast_json.dumps (orjson, and its
+               stdlib fallback)
+  - flask:     early-detection-shaped results with Flask's default JSON
+               provider against app.utils.json_util.OrjsonProvider
+               (app.json.dumps and a full jsonify response)
+
+Usage:
+    python -m benchmarks.bench_json [--sizes 1000,10000] [--runs 20] [--json]
+"""
+
+import argparse
+import json
+import random
+import sys
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.bench_detection import time_case
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'lambda_functions' / 'shared'))
+
+import fast_json  # noqa: E402
+
+
+def legacy_decimal_default(obj):
+    """decimal_default as previously copied in every Lambda handler."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError
+
+
+def dynamodb_items(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """Items as returned by boto3 for the sensor-data table."""
+    return [{
+        'id': f'{rng.getrandbits(64):016x}',
+        'timestamp': f'2025-01-01T00:{i % 60:02d}:{i % 60:02d}',
+        'temperature': Decimal(str(round(rng.uniform(5, 50), 1))),
+        'humidity': Decimal(str(round(rng.uniform(20, 99), 1))),
+        'probability_fog': Decimal(str(round(rng.random(), 3))),
+        'probability_smoke': Decimal(str(round(rng.random(), 3))),
+        'probability_vapor': Decimal(str(round(rng.random(), 3))),
+        'probability_smug': Decimal(str(round(rng.random(), 3))),
+        'alert_level': rng.choice(['NORMAL', 'WARNING', 'DANGER']),
+        'alert': rng.random() < 0.1,
+        'danger_conditions': ['HIGH_TEMPERATURE'] if rng.random() < 0.05 else []
+    } for i in range(count)]
+
+
+def detection_results(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """Results shaped like the early-detection / batch responses."""
+    return [{
+        'timestamp': '2025-10-19T10:30:00',
+        'sensor_data': {'temperature': round(rng.uniform(5, 50), 2), 'humidity': round(rng.uniform(20, 99), 2)},
+        'threshold_check': {'exceeded': True, 'conditions_detected': ['FOG']},
+        'detection_results': {
+            'fog_detected': True, 'smoke_detected': False,
+            'probability_fog': round(rng.random(), 3), 'probability_smoke': round(rng.random(), 3),
+            'probability_vapor': round(rng.random(), 3), 'probability_smug': round(rng.random(), 3),
+            'analysis_details': {'frames_analyzed': 8, 'distinct_frames': 2,
+                                 'fog_scores_range': [0.61, 0.78], 'smoke_scores_range': [0.1, 0.2]}
+        },
+        'cloud_upload': {'success': True, 'status_code': 200},
+        'message': 'FOG DETECTED (75.2%) - Data uploaded to cloud'
+    } for _ in range(count)]
+
+
+def bench_lambda(sizes, runs: int) -> Dict[str, dict]:
+    results = {}
+    orjson_module = fast_json.orjson
+    for size in sizes:
+        body = {'count': size, 'data': dynamodb_items(size, random.Random(size))}
+        results[f'lambda/json_default/{size}'] = time_case(
+            lambda: json.dumps(body, default=legacy_decimal_default), runs)
+        if orjson_module is not None:
+            results[f'lambda/fast_json_orjson/{size}'] = time_case(lambda: fast_json.dumps(body), runs)
+        fast_json.orjson = None
+        try:
+            results[f'lambda/fast_json_stdlib/{size}'] = time_case(lambda: fast_json.dumps(body), runs)
+        finally:
+            fast_json.orjson = orjson_module
+    return results
+
+
+def bench_flask(sizes, runs: int) -> Dict[str, dict]:
+    from flask import Flask
+    from flask.json.provider import DefaultJSONProvider
+    from app.utils.json_util import OrjsonProvider, fast_json_available
+
+    providers = {'default': DefaultJSONProvider}
+    if fast_json_available():
+        providers['orjson'] = OrjsonProvider
+
+    results = {}
+    for name, provider in providers.items():
+        app = Flask(__name__)
+        app.json = provider(app)
+        for size in sizes:
+            payload = {'success': True, 'data': detection_results(size, random.Random(size))}
+            results[f'flask/{name}_dumps/{size}'] = time_case(lambda: app.json.dumps(payload), runs)
+            with app.app_context():
+                results[f'flask/{name}_jsonify/{size}'] = time_case(lambda: app.json.response(payload), runs)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,10000', help='Comma-separated item counts')
+    parser.add_argument('--runs', type=int, default=20, help='Timed runs per case')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    results = {**bench_lambda(sizes, args.runs), **bench_flask(sizes, args.runs)}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    if fast_json.orjson is None:
+        print("orjson is not installed: only the stdlib paths are measured")
+    print(f"{'case':<36}{'median ms':>12}{'p95 ms':>10}")
+    for case, stats in results.items():
+        print(f"{case:<36}{stats['median_ms']:>12}{stats['p95_ms']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Texture (local standard deviation) benchmark for smoke detection.
+
+Compares the previous float64 implementation, which allocated a float64 copy
+of the frame plus a full-frame temporary for every step, with
+DetectionUtil._texture_std, which works in float32 on per-thread scratch
+buffers with in-place operations. Reports median latency and the memory
+allocated per call (tracemalloc peak, which includes NumPy and OpenCV
+output arrays) at 720p and 1080p.
+
+Usage:
+    python -m benchmarks.bench_texture [--runs 30] [--json]
+"""
+
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+import cv2
+import numpy as np
+from app.utils.detection_util import DetectionUtil
+
+RESOLUTIONS = {'720p': (720, 1280), '1080p': (1080, 1920)}
+KERNEL_SIZE = 15
+
+
+def texture_float64(gray: np.ndarray) -> np.ndarray:
+    """Previous implementation (float64 copies and temporaries)."""
+    gray_float = gray.astype(float)
+    mean_filtered = cv2.blur(gray_float, (KERNEL_SIZE, KERNEL_SIZE))
+    squared_diff = (gray_float - mean_filtered) ** 2
+    local_var = cv2.blur(squared_diff, (KERNEL_SIZE, KERNEL_SIZE))
+    local_var = np.maximum(local_var, 0)
+    return np.sqrt(local_var)
+
+
+def measure(fn, gray: np.ndarray, runs: int) -> dict:
+    """Return median latency and per-call allocation of fn(gray)."""
+    fn(gray)  # Warm up (and allocate scratch buffers once)
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(gray)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    fn(gray)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'median_ms': round(statistics.median(timings), 2), 'allocated_mb': round(peak / 2 ** 20, 2)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=30, help='Timed calls per implementation and resolution')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    detection_util = DetectionUtil()
+    rng = np.random.default_rng(0)
+    results = {}
+
+    for name, shape in RESOLUTIONS.items():
+        gray = rng.integers(0, 256, shape, dtype=np.uint8)
+        gray = cv2.GaussianBlur(gray, (9, 9), 0)  # Some spatial structure
+        reference = texture_float64(gray)
+        current = detection_util._texture_std(gray)
+        results[name] = {
+            'float64': measure(texture_float64, gray, args.runs),
+            'float32_scratch': measure(detection_util._texture_std, gray, args.runs),
+            'max_abs_diff': round(float(np.max(np.abs(reference - current))), 4)
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for name, result in results.items():
+        before, after = result['float64'], result['float32_scratch']
+        print(f"{name}:")
+        print(f"  float64 temporaries: {before['median_ms']:8.2f} ms  {before['allocated_mb']:8.2f} MB allocated/call")
+        print(f"  float32 scratch:     {after['median_ms']:8.2f} ms  {after['allocated_mb']:8.2f} MB allocated/call")
+        print(f"  max |difference|:    {result['max_abs_diff']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+"""
+Local fake MJPEG camera for load testing CameraUtil and the controller.
+
+Serves the same multipart/x-mixed-replace stream as the IP Webcam app at
+http://<host>:<port>/video, replaying a directory of images, a video file or
+a synthetic scene (see benchmarks/synthetic.py) at a fixed rate and
+resolution. Faults can be injected to reproduce a flaky camera:
+
+    --jitter 0.02            random extra delay per frame (seconds, up to)
+    --stall-every 100        pause the stream every N frames...
+    --stall-seconds 2        ...for this long
+    --disconnect-every 300   drop the connection after N frames
+
+All frames are JPEG-encoded once at startup, so the server itself adds no
+encoding cost to the measurements. Point the app at it with
+CAMERA_IP=127.0.0.1 (default port 8080) or a CAMERAS entry with "url":
+
+    CAMERAS=[{"id": "bench", "url": "http://127.0.0.1:8080/video"}]
+
+Usage:
+    python -m benchmarks.fake_mjpeg_server [--source DIR|VIDEO|SCENE] [--fps 10]
+                                           [--width 1280 --height 720] [--port 8080]
+"""
+
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Optional, Tuple
+import cv2
+import numpy as np
+from benchmarks.synthetic import SCENES, make_frames
+
+BOUNDARY = 'frameboundary'
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def load_frames(source: str, size: Optional[Tuple[int, int]] = None, limit: int = 300) -> List[np.ndarray]:
+    """
+    Load the frames to replay.
+
+    Args:
+        source: Directory of images, video file, or a synthetic scene name
+        size: Output (width, height); None keeps the source size
+            (synthetic scenes default to 1280x720)
+        limit: Maximum number of frames to read from a video file
+
+    Returns:
+        List of BGR frames
+
+    Raises:
+        ValueError: If the source cannot be read or contains no frames
+    """
+    path = Path(source)
+    frames: List[np.ndarray] = []
+
+    if source in SCENES:
+        width, height = size or (1280, 720)
+        frames = make_frames(source, (height, width), 24)
+    elif path.is_dir():
+        for image_path in sorted(p for p in path.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS):
+            image = cv2.imread(str(image_path))
+            if image is not None:
+                frames.append(image)
+    elif path.is_file():
+        cap = cv2.VideoCapture(str(path))
+        try:
+            while len(frames) < limit:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                frames.append(frame)
+        finally:
+            cap.release()
+    else:
+        raise ValueError(f"Source '{source}' is not a directory, a video file or one of {SCENES}")
+
+    if not frames:
+        raise ValueError(f"No frames could be read from '{source}'")
+
+    if size is not None:
+        frames = [cv2.resize(f, size, interpolation=cv2.INTER_AREA) if f.shape[1::-1] != size else f
+                  for f in frames]
+    return frames
+
+
+class FakeMjpegServer:
+    """
+    Threaded MJPEG server replaying frames at a fixed rate.
+
+    Every client gets its own stream starting at the first frame, like a
+    camera accepting several viewers.
+
+    Usage:
+        with FakeMjpegServer(frames, fps=10) as server:
+            camera = CameraUtil(video_url=server.url)
+    """
+
+    def __init__(self, frames: List[np.ndarray], fps: float = 10.0, host: str = '127.0.0.1', port: int = 0,
+                 jitter: float = 0.0, stall_every: int = 0, stall_seconds: float = 0.0,
+                 disconnect_every: int = 0, quality: int = 80, seed: int = 0):
+        """
+        Initialize the server (not started).
+
+        Args:
+            frames: BGR frames to replay (cycled)
+            fps: Frames per second of each stream
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+            jitter: Random extra delay per frame, uniform in [0, jitter] seconds
+            stall_every: Pause the stream every N frames (0 disables)
+            stall_seconds: Duration of each pause
+            disconnect_every: Close the connection after N frames (0 disables)
+            quality: JPEG quality (0-100)
+            seed: Seed of the jitter generator
+        """
+        if fps <= 0:
+            raise ValueError("fps must be positive")
+
+        self.fps = fps
+        self.host = host
+        self.port = port
+        self.jitter = jitter
+        self.stall_every = stall_every
+        self.stall_seconds = stall_seconds
+        self.disconnect_every = disconnect_every
+        self.frames_sent = 0
+        self.connections = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._jpegs = []
+        for frame in frames:
+            ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if not ok:
+                raise ValueError("Failed to JPEG-encode a frame")
+            self._jpegs.append(buffer.tobytes())
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/video"
+
+    def _next_delay(self, sent: int) -> float:
+        """Seconds to wait after the sent-th frame of a stream."""
+        delay = 1.0 / self.fps
+        if self.jitter > 0:
+            with self._lock:
+                delay += self._random.uniform(0, self.jitter)
+        if self.stall_every and sent % self.stall_every == 0:
+            delay += self.stall_seconds
+        return delay
+
+    def _stream(self, handler: BaseHTTPRequestHandler) -> None:
+        """Write frames to one client until it disconnects or a fault is injected."""
+        handler.send_response(200)
+        handler.send_header('Content-Type', f'multipart/x-mixed-replace; boundary={BOUNDARY}')
+        handler.send_header('Cache-Control', 'no-cache')
+        handler.end_headers()
+
+        with self._lock:
+            self.connections += 1
+
+        sent = 0
+        next_time = time.monotonic()
+        while True:
+            jpeg = self._jpegs[sent % len(self._jpegs)]
+            try:
+                handler.wfile.write(
+                    f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n".encode()
+                )
+                handler.wfile.write(jpeg)
+                handler.wfile.write(b'\r\n')
+                handler.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                return
+
+            sent += 1
+            with self._lock:
+                self.frames_sent += 1
+            if self.disconnect_every and sent % self.disconnect_every == 0:
+                return
+
+            # Fixed-rate schedule: a slow write does not shift later frames
+            next_time += self._next_delay(sent)
+            time.sleep(max(0.0, next_time - time.monotonic()))
+
+    def start(self) -> 'FakeMjpegServer':
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/video':
+                    self.send_error(404)
+                    return
+                server._stream(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'FakeMjpegServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source', default='fog',
+                        help=f"Directory of images, video file or synthetic scene ({', '.join(SCENES)})")
+    parser.add_argument('--fps', type=float, default=10.0, help='Frames per second')
+    parser.add_argument('--width', type=int, help='Output width (requires --height)')
+    parser.add_argument('--height', type=int, help='Output height (requires --width)')
+    parser.add_argument('--host', default='0.0.0.0', help='Interface to bind')
+    parser.add_argument('--port', type=int, default=8080, help='Port to bind')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Max random extra delay per frame (s)')
+    parser.add_argument('--stall-every', type=int, default=0, help='Pause the stream every N frames')
+    parser.add_argument('--stall-seconds', type=float, default=2.0, help='Duration of each pause (s)')
+    parser.add_argument('--disconnect-every', type=int, default=0, help='Drop the connection after N frames')
+    parser.add_argument('--quality', type=int, default=80, help='JPEG quality')
+    args = parser.parse_args()
+
+    if (args.width is None) != (args.height is None):
+        parser.error('--width and --height must be given together')
+    size = (args.width, args.height) if args.width else None
+
+    try:
+        frames = load_frames(args.source, size)
+    except ValueError as e:
+        parser.error(str(e))
+
+    server = FakeMjpegServer(
+        frames, fps=args.fps, host=args.host, port=args.port, jitter=args.jitter,
+        stall_every=args.stall_every, stall_seconds=args.stall_seconds,
+        disconnect_every=args.disconnect_every, quality=args.quality
+    ).start()
+    height, width = frames[0].shape[:2]
+    print(f"Serving {len(frames)} frames ({width}x{height}) at {args.fps:g} fps on {server.url}")
+
+    try:
+        while True:
+            time.sleep(5)
+            print(f"connections={server.connections} frames_sent={server.frames_sent}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,444 @@
+"""
+Local performance harness for the Lambda handlers in lambda_functions/.
+
+Each handler is loaded, together with the shared runtime layer
+(lambda_functions/shared), while a small in-memory stand-in for boto3 is
+installed in sys.modules. Its
+DynamoDB tables mirror deployment/dynamodb.tf (keys and global secondary
+indexes); SNS publish and Lambda invoke calls are recorded, not sent.
+
+The tables are seeded with a configurable number of rows, then every
+handler is invoked with a representative event and the harness reports:
+
+    latency     median / p95 per invocation (ms)
+    items read  items examined by DynamoDB per invocation (ScannedCount)
+    response    size of the response body (bytes)
+
+Items read is what DynamoDB bills and what grows with the table: a handler
+that switches from a bounded query to an unbounded scan shows up as a read
+count in the order of the table size. With --read-budget the harness exits
+with status 1 when any handler reads more items per call than allowed.
+
+Usage:
+    python -m benchmarks.lambda_harness [--rows 10000] [--runs 20]
+                                        [--read-budget 1000] [--json]
+
+Seeding is in-memory: 1M rows take a few GB of RAM, 10M rows tens of GB.
+"""
+
+import argparse
+import bisect
+import contextlib
+import importlib.util
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import types
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+LAMBDA_DIR = ROOT / 'lambda_functions'
+# Shared runtime deployed as a Lambda layer (see deployment/lambda.tf)
+SHARED_DIR = LAMBDA_DIR / 'shared'
+SHARED_MODULES = ('fast_json', 'api_responses', 'api_router', 'aws_clients')
+
+# Key schemas from deployment/dynamodb.tf: (hash, range, {index: (hash, range)})
+TABLE_SCHEMAS = {
+    'sensor-data': ('id', 'timestamp', {'AlertLevelIndex': ('alert_level', 'timestamp')}),
+    'sensor-status': ('id', 'timestamp', {'StatusAlertIndex': ('has_alert', 'timestamp')}),
+    'alerts': ('alert_id', 'timestamp', {'AlertTypeIndex': ('alert_type', 'timestamp')}),
+}
+
+# Environment of each function (deployment/lambda.tf and variables.tf defaults)
+ENVIRONMENT = {
+    'SENSOR_DATA_TABLE': 'sensor-data',
+    'SENSOR_STATUS_TABLE': 'sensor-status',
+    'ALERTS_TABLE': 'alerts',
+    'SNS_TOPIC_ARN': 'arn:aws:sns:us-east-1:000000000000:alerts',
+    'ALERT_FUNCTION_NAME': 'send-alerts',
+    'TEMP_THRESHOLD': '45',
+    'HUMIDITY_THRESHOLD': '0.10',
+    'SMOKE_THRESHOLD': '0.70',
+    'FOG_THRESHOLD': '0.60',
+}
+
+
+class KeyCondition:
+    """Equality condition on a key attribute (boto3.dynamodb.conditions.Key)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.value = None
+
+    def eq(self, value: Any) -> 'KeyCondition':
+        self.value = value
+        return self
+
+
+class FakeTable:
+    """
+    In-memory DynamoDB table with global secondary indexes.
+
+    Supports the subset of the Table API used by the handlers: put_item,
+    get_item, scan(Limit) and query(IndexName, KeyConditionExpression=Key().eq(),
+    ScanIndexForward, Limit). Any other argument raises TypeError, so a
+    handler change relying on unsupported behavior fails loudly instead of
+    being measured wrongly.
+    """
+
+    def __init__(self, name: str, hash_key: str, range_key: str, indexes: Dict[str, Tuple[str, str]]):
+        self.name = name
+        self.hash_key = hash_key
+        self.range_key = range_key
+        self.indexes = indexes
+        self.items: Dict[Tuple[Any, Any], dict] = {}
+        # index -> hash value -> sorted list of (range value, primary key)
+        self._index_data: Dict[str, Dict[Any, List[Tuple[Any, Tuple[Any, Any]]]]] = {
+            index: {} for index in indexes
+        }
+        self.items_read = 0
+
+    def _primary_key(self, item: dict) -> Tuple[Any, Any]:
+        return item[self.hash_key], item[self.range_key]
+
+    def put_item(self, Item: dict) -> dict:
+        key = self._primary_key(Item)
+        if key in self.items:
+            self._unindex(key, self.items[key])
+        self.items[key] = Item
+        for index, (hash_attr, range_attr) in self.indexes.items():
+            if hash_attr in Item and range_attr in Item:
+                entries = self._index_data[index].setdefault(Item[hash_attr], [])
+                bisect.insort(entries, (Item[range_attr], key))
+        return {}
+
+    def _unindex(self, key: Tuple[Any, Any], item: dict) -> None:
+        for index, (hash_attr, range_attr) in self.indexes.items():
+            entries = self._index_data[index].get(item.get(hash_attr))
+            if entries:
+                entries.remove((item.get(range_attr), key))
+
+    def bulk_load(self, items: List[dict]) -> None:
+        """Load many items at once (indexes are sorted once at the end)."""
+        for item in items:
+            key = self._primary_key(item)
+            self.items[key] = item
+            for index, (hash_attr, range_attr) in self.indexes.items():
+                if hash_attr in item and range_attr in item:
+                    self._index_data[index].setdefault(item[hash_attr], []).append((item[range_attr], key))
+        for data in self._index_data.values():
+            for entries in data.values():
+                entries.sort()
+
+    def get_item(self, Key: dict) -> dict:
+        self.items_read += 1
+        item = self.items.get((Key[self.hash_key], Key[self.range_key]))
+        return {'Item': item} if item is not None else {}
+
+    def scan(self, Limit: Optional[int] = None) -> dict:
+        items = []
+        for item in self.items.values():
+            if Limit is not None and len(items) >= Limit:
+                break
+            items.append(item)
+        self.items_read += len(items)
+        response = {'Items': items, 'Count': len(items), 'ScannedCount': len(items)}
+        if Limit is not None and len(items) == Limit and len(self.items) > Limit:
+            response['LastEvaluatedKey'] = {self.hash_key: items[-1][self.hash_key],
+                                            self.range_key: items[-1][self.range_key]}
+        return response
+
+    def query(self, KeyConditionExpression: KeyCondition, IndexName: Optional[str] = None,
+              ScanIndexForward: bool = True, Limit: Optional[int] = None) -> dict:
+        if IndexName is None:
+            raise TypeError("Only index queries are supported by the harness")
+        hash_attr, _ = self.indexes[IndexName]
+        if KeyConditionExpression.name != hash_attr:
+            raise TypeError(f"Key condition must be on the index hash key '{hash_attr}'")
+
+        entries = self._index_data[IndexName].get(KeyConditionExpression.value, [])
+        ordered = entries if ScanIndexForward else reversed(entries)
+        items = []
+        for _, key in ordered:
+            if Limit is not None and len(items) >= Limit:
+                break
+            items.append(self.items[key])
+        self.items_read += len(items)
+        return {'Items': items, 'Count': len(items), 'ScannedCount': len(items)}
+
+
+class FakeAWS:
+    """Tables, SNS messages and Lambda invocations shared by the fake boto3."""
+
+    def __init__(self):
+        self.tables = {
+            name: FakeTable(name, hash_key, range_key, indexes)
+            for name, (hash_key, range_key, indexes) in TABLE_SCHEMAS.items()
+        }
+        self.published: List[dict] = []
+        self.invocations: List[dict] = []
+
+    def items_read(self) -> int:
+        return sum(table.items_read for table in self.tables.values())
+
+    def module(self) -> types.ModuleType:
+        """Build a module object standing in for boto3."""
+        aws = self
+
+        class Resource:
+            def Table(self, name):
+                return aws.tables[name]
+
+        class SNSClient:
+            def publish(self, TopicArn, Message, Subject=None, **kwargs):
+                aws.published.append({'TopicArn': TopicArn, 'Subject': Subject, 'Message': Message})
+                return {'MessageId': str(uuid.uuid4())}
+
+        class LambdaClient:
+            def invoke(self, FunctionName, Payload=None, InvocationType='RequestResponse', **kwargs):
+                aws.invocations.append({'FunctionName': FunctionName, 'Payload': Payload})
+                return {'StatusCode': 202 if InvocationType == 'Event' else 200}
+
+        def resource(service, **kwargs):
+            if service != 'dynamodb':
+                raise ValueError(f"Unsupported resource '{service}'")
+            return Resource()
+
+        def client(service, **kwargs):
+            clients = {'sns': SNSClient, 'lambda': LambdaClient}
+            if service not in clients:
+                raise ValueError(f"Unsupported client '{service}'")
+            return clients[service]()
+
+        boto3 = types.ModuleType('boto3')
+        boto3.resource = resource
+        boto3.client = client
+        boto3.dynamodb = types.ModuleType('boto3.dynamodb')
+        boto3.dynamodb.conditions = types.ModuleType('boto3.dynamodb.conditions')
+        boto3.dynamodb.conditions.Key = KeyCondition
+        return boto3
+
+    @staticmethod
+    def botocore_module() -> types.ModuleType:
+        """Stand-in for botocore.config (the tuned Config is accepted and ignored)."""
+        class Config:
+            def __init__(self, **kwargs):
+                self.options = kwargs
+
+        botocore = types.ModuleType('botocore')
+        botocore.config = types.ModuleType('botocore.config')
+        botocore.config.Config = Config
+        return botocore
+
+
+@contextlib.contextmanager
+def installed(aws: FakeAWS) -> Iterator[None]:
+    """Install the fake boto3 and the function environment, restoring both afterwards."""
+    boto3 = aws.module()
+    botocore = aws.botocore_module()
+    modules = {
+        'boto3': boto3,
+        'boto3.dynamodb': boto3.dynamodb,
+        'boto3.dynamodb.conditions': boto3.dynamodb.conditions,
+        'botocore': botocore,
+        'botocore.config': botocore.config,
+    }
+    saved_modules = {name: sys.modules.get(name) for name in modules}
+    # The shared runtime caches its clients: import it afresh against this fake
+    for name in SHARED_MODULES:
+        sys.modules.pop(name, None)
+    saved_env = {name: os.environ.get(name) for name in ENVIRONMENT}
+    sys.modules.update(modules)
+    os.environ.update(ENVIRONMENT)
+    try:
+        yield
+    finally:
+        for name in SHARED_MODULES:
+            sys.modules.pop(name, None)
+        for name, module in saved_modules.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+        for name, value in saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def load_handler(name: str):
+    """Import lambda_functions/<name>.py as a fresh module and return its lambda_handler."""
+    if str(SHARED_DIR) not in sys.path:
+        sys.path.insert(0, str(SHARED_DIR))
+    spec = importlib.util.spec_from_file_location(f'harness_{name}', LAMBDA_DIR / f'{name}.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.lambda_handler
+
+
+def seed(aws: FakeAWS, rows: int, danger_ratio: float = 0.05, seed_value: int = 0) -> None:
+    """
+    Fill the tables with synthetic records.
+
+    Args:
+        aws: Fake AWS whose tables are filled
+        rows: Sensor data rows (sensor status and alerts get rows // 10)
+        danger_ratio: Fraction of DANGER sensor data rows / problem status rows
+        seed_value: Random seed
+    """
+    rng = random.Random(seed_value)
+    start = datetime(2025, 1, 1)
+
+    def timestamp(i: int, total: int) -> str:
+        return (start + timedelta(seconds=i * 30 * 24 * 3600 // max(total, 1))).isoformat()
+
+    def probability() -> Decimal:
+        return Decimal(str(round(rng.random(), 3)))
+
+    aws.tables['sensor-data'].bulk_load([{
+        'id': str(uuid.UUID(int=rng.getrandbits(128))),
+        'timestamp': timestamp(i, rows),
+        'temperature': Decimal(str(round(rng.uniform(5, 50), 1))),
+        'humidity': Decimal(str(round(rng.random(), 2))),
+        'probability_vapor': probability(),
+        'probability_smug': probability(),
+        'probability_smoke': probability(),
+        'probability_fog': probability(),
+        'alert': '',
+        'danger_alert': '',
+        'alert_level': 'DANGER' if rng.random() < danger_ratio else 'NORMAL',
+        'danger_conditions': []
+    } for i in range(rows)])
+
+    secondary = max(rows // 10, 1)
+    aws.tables['sensor-status'].bulk_load([{
+        'id': str(uuid.UUID(int=rng.getrandbits(128))),
+        'timestamp': timestamp(i, secondary),
+        'alert': False,
+        'has_alert': 'true' if rng.random() < danger_ratio else 'false',
+        'status_sensor_humidity': True,
+        'status_sensor_temperature': True,
+        'status_cameras': [{'camera': 'default', 'status': True}],
+        'sensors_ok': True,
+        'cameras_ok': True,
+        'all_systems_operational': True
+    } for i in range(secondary)])
+
+    aws.tables['alerts'].bulk_load([{
+        'alert_id': str(uuid.UUID(int=rng.getrandbits(128))),
+        'timestamp': timestamp(i, secondary),
+        'alert_type': rng.choice(('DANGER_THRESHOLD_EXCEEDED', 'SENSOR_MALFUNCTION')),
+        'sns_message_id': str(uuid.UUID(int=rng.getrandbits(128))),
+        'payload': '{}',
+        'status': 'sent'
+    } for i in range(secondary)])
+
+
+SENSOR_DATA = {
+    'temperature': 25.5, 'humidity': 0.65, 'probability_vapor': 0.1,
+    'probability_smug': 0.05, 'probability_smoke': 0.02, 'probability_fog': 0.75,
+    'alert': 'Fog detected', 'danger_alert': ''
+}
+
+# (case name, handler module, event)
+CASES = [
+    ('insert_sensor_data', 'insert_sensor_data', {'body': json.dumps({'data': SENSOR_DATA})}),
+    ('insert_sensor_status', 'insert_sensor_status', {'body': json.dumps({'data': {
+        'alert': False, 'status_sensor_humidity': True, 'status_sensor_temperature': True,
+        'status_cameras': [{'camera': 'default', 'status': True}]}})}),
+    ('send_alerts', 'send_alerts', {'alert_type': 'DANGER_THRESHOLD_EXCEEDED',
+                                    'conditions': ['HIGH FOG DETECTED'], 'sensor_data': SENSOR_DATA}),
+    ('get_sensor_data', 'get_sensor_data', {'queryStringParameters': {'limit': '50'}}),
+    ('get_sensor_data[DANGER]', 'get_sensor_data',
+     {'queryStringParameters': {'limit': '50', 'alert_level': 'DANGER'}}),
+    ('get_ml_detection', 'get_ml_detection', {'queryStringParameters': {'limit': '50', 'min_probability': '0.5'}}),
+    ('get_alerts', 'get_alerts', {'queryStringParameters': {'limit': '100'}}),
+    ('get_alerts[type]', 'get_alerts',
+     {'queryStringParameters': {'limit': '100', 'alert_type': 'SENSOR_MALFUNCTION'}}),
+    ('get_sensor_status', 'get_sensor_status', {'queryStringParameters': {'limit': '50'}}),
+    ('get_sensor_status[problems]', 'get_sensor_status',
+     {'queryStringParameters': {'limit': '50', 'only_problems': 'true'}}),
+    ('check_sensor_status', 'check_sensor_status', {}),
+]
+
+
+def run_case(aws: FakeAWS, handler, event: dict, runs: int) -> Dict[str, Any]:
+    """Invoke a handler runs times and return latency, read and size statistics."""
+    timings, reads, sizes, statuses = [], [], [], set()
+    for _ in range(runs):
+        before = aws.items_read()
+        start = time.perf_counter()
+        response = handler(json.loads(json.dumps(event)), None)
+        timings.append((time.perf_counter() - start) * 1000)
+        reads.append(aws.items_read() - before)
+        sizes.append(len(response.get('body') or ''))
+        statuses.add(response.get('statusCode'))
+    timings.sort()
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        'items_read': max(reads),
+        'response_bytes': max(sizes),
+        'status_codes': sorted(statuses)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000, help='Sensor data rows to seed')
+    parser.add_argument('--danger-ratio', type=float, default=0.05, help='Fraction of DANGER/problem rows')
+    parser.add_argument('--runs', type=int, default=20, help='Invocations per handler case')
+    parser.add_argument('--only', help='Comma-separated case names to run')
+    parser.add_argument('--read-budget', type=int,
+                        help='Exit 1 if any case reads more items per invocation than this')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    cases = CASES
+    if args.only:
+        wanted = {name.strip() for name in args.only.split(',')}
+        cases = [case for case in CASES if case[0] in wanted]
+
+    aws = FakeAWS()
+    start = time.perf_counter()
+    seed(aws, args.rows, args.danger_ratio)
+    seed_seconds = time.perf_counter() - start
+
+    results = {}
+    with installed(aws), contextlib.redirect_stdout(sys.stderr):
+        handlers = {}
+        for name, module, event in cases:
+            if module not in handlers:
+                handlers[module] = load_handler(module)
+            results[name] = run_case(aws, handlers[module], event, args.runs)
+
+    over_budget = [name for name, result in results.items()
+                   if args.read_budget is not None and result['items_read'] > args.read_budget]
+
+    if args.json:
+        print(json.dumps({'rows': args.rows, 'seed_seconds': round(seed_seconds, 2), 'results': results}, indent=2))
+    else:
+        print(f"Seeded {args.rows} sensor data rows in {seed_seconds:.1f} s")
+        print(f"{'case':<30} {'median ms':>10} {'p95 ms':>10} {'items read':>11} {'body bytes':>11}  status")
+        for name, result in results.items():
+            flag = '  OVER BUDGET' if name in over_budget else ''
+            print(f"{name:<30} {result['median_ms']:>10.3f} {result['p95_ms']:>10.3f} "
+                  f"{result['items_read']:>11} {result['response_bytes']:>11}  "
+                  f"{','.join(map(str, result['status_codes']))}{flag}")
+        print(f"SNS messages: {len(aws.published)}  Lambda invocations: {len(aws.invocations)}")
+
+    if over_budget:
+        print(f"{len(over_budget)} case(s) over the read budget of {args.read_budget} items", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+"""
+Load generator simulating a fleet of Arduino sensor nodes.
+
+Each simulated node follows the loop of arduino/sensor_arduino.ino: read
+temperature and humidity, send one HTTP GET and wait for the answer, then
+sleep the reporting interval (3 s on the board). Nodes start at random
+phases and run concurrently on one asyncio event loop (stdlib only, one
+connection per reading like the board's HttpClient).
+
+Readings are sent to /api/v1/cloud_fog/early-detection. Scenarios:
+
+    normal  mild readings, no camera analysis is triggered
+    fog     every node reports fog conditions (high humidity, low temperature)
+    fire    every node reports the board's fire adjustment (+70 °C, humidity x0.1)
+    event   normal readings, and --event-fraction of the nodes switch to fog
+            between --event-start and --event-start + --event-duration seconds
+
+Reported: latency percentiles, throughput, camera-analysis rate (readings
+whose response contains analyzed frames), failed cloud uploads, and the
+backlog: peak readings in flight and how late nodes report compared to
+their interval (a fog node that cannot keep up shows a growing lag).
+For an off-site capacity number, run the fog node against
+benchmarks.fake_mjpeg_server as its camera.
+
+Usage:
+    python -m benchmarks.load_sensors [--url http://127.0.0.1:5000] [--sensors 100]
+                                      [--interval 3] [--duration 60]
+                                      [--scenario normal|fog|fire|event] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+ENDPOINT = '/api/v1/cloud_fog/early-detection'
+SCENARIOS = ('normal', 'fog', 'fire', 'event')
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(round(q / 100 * len(values))) - 1))]
+
+
+class Stats:
+    """Aggregated results of all nodes."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.lags: List[float] = []
+        self.status_codes: Dict[str, int] = {}
+        self.analyzed = 0
+        self.upload_failures = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def record(self, status: str, latency: float, body: Optional[dict]) -> None:
+        self.latencies.append(latency)
+        self.status_codes[status] = self.status_codes.get(status, 0) + 1
+        data = (body or {}).get('data') or {}
+        details = (data.get('detection_results') or {}).get('analysis_details') or {}
+        if details.get('frames_analyzed'):
+            self.analyzed += 1
+        if data and not (data.get('cloud_upload') or {}).get('success'):
+            self.upload_failures += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        lags = sorted(self.lags)
+        total = len(latencies)
+        return {
+            'requests': total,
+            'elapsed_s': round(elapsed, 2),
+            'throughput_rps': round(total / elapsed, 2) if elapsed else 0.0,
+            'status_codes': self.status_codes,
+            'latency_ms': {
+                'p50': round(percentile(latencies, 50), 1),
+                'p90': round(percentile(latencies, 90), 1),
+                'p99': round(percentile(latencies, 99), 1),
+                'max': round(latencies[-1], 1) if latencies else 0.0,
+                'mean': round(statistics.fmean(latencies), 1) if latencies else 0.0
+            },
+            'camera_analysis': {
+                'count': self.analyzed,
+                'rate_per_s': round(self.analyzed / elapsed, 2) if elapsed else 0.0,
+                'fraction': round(self.analyzed / total, 3) if total else 0.0
+            },
+            'upload_failures': self.upload_failures,
+            'backlog': {
+                'peak_in_flight': self.peak_in_flight,
+                'lag_p50_s': round(percentile(lags, 50), 3),
+                'lag_p99_s': round(percentile(lags, 99), 3),
+                'lag_max_s': round(lags[-1], 3) if lags else 0.0
+            }
+        }
+
+
+async def http_get(host: str, port: int, path: str, timeout: float) -> Tuple[str, Optional[dict]]:
+    """
+    Send one GET request and read the whole response.
+
+    Returns:
+        Tuple (status, JSON body or None); status is the HTTP code or an error name
+    """
+    writer = None
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        raw = await asyncio.wait_for(reader.read(), timeout)
+    except asyncio.TimeoutError:
+        return 'timeout', None
+    except OSError as e:
+        return type(e).__name__, None
+    finally:
+        if writer is not None:
+            writer.close()
+
+    head, _, payload = raw.partition(b'\r\n\r\n')
+    status_line = head.split(b'\r\n', 1)[0].split()
+    status = status_line[1].decode() if len(status_line) > 1 else 'invalid'
+    if b'chunked' in head.lower():
+        payload = _dechunk(payload)
+    try:
+        return status, json.loads(payload)
+    except ValueError:
+        return status, None
+
+
+def _dechunk(payload: bytes) -> bytes:
+    """Decode a chunked transfer-encoded body."""
+    body = b''
+    while payload:
+        size_line, _, payload = payload.partition(b'\r\n')
+        size = int(size_line.split(b';')[0] or b'0', 16)
+        if size == 0:
+            break
+        body += payload[:size]
+        payload = payload[size + 2:]
+    return body
+
+
+def reading(scenario: str, rng: random.Random, in_event: bool) -> Tuple[float, float]:
+    """Return one (temperature, humidity) reading for a node."""
+    if scenario == 'fog' or (scenario == 'event' and in_event):
+        return round(rng.uniform(4, 12), 2), round(rng.uniform(92, 99), 2)
+    if scenario == 'fire':
+        temperature, humidity = rng.uniform(30, 40), rng.uniform(30, 60)
+        return round(temperature + 70.0, 2), round(humidity * 0.1, 2)
+    return round(rng.uniform(15, 26), 2), round(rng.uniform(40, 70), 2)
+
+
+async def sensor_node(index: int, args, stats: Stats, started: float, deadline: float) -> None:
+    """Run one node's read/send/sleep loop until the deadline."""
+    rng = random.Random(args.seed * 100003 + index)
+    in_event_group = rng.random() < args.event_fraction
+    target = urlsplit(args.url)
+    host, port = target.hostname, target.port or 80
+
+    await asyncio.sleep(rng.uniform(0, args.interval))
+    due = time.monotonic()
+    while True:
+        now = time.monotonic()
+        if now >= deadline:
+            return
+        stats.lags.append(max(0.0, now - due))
+
+        elapsed = now - started
+        in_event = in_event_group and args.event_start <= elapsed < args.event_start + args.event_duration
+        temperature, humidity = reading(args.scenario, rng, in_event)
+        query = {'temperature': temperature, 'humidity': humidity}
+        if args.camera_id:
+            query['camera_id'] = args.camera_id
+        path = f"{target.path.rstrip('/')}{ENDPOINT}?{urlencode(query)}"
+
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        start = time.monotonic()
+        status, body = await http_get(host, port, path, args.timeout)
+        stats.in_flight -= 1
+        stats.record(status, (time.monotonic() - start) * 1000, body)
+
+        # The board only sleeps after the response: a slow answer delays the next reading
+        due = time.monotonic() + args.interval
+        await asyncio.sleep(args.interval)
+
+
+async def run(args) -> Dict[str, Any]:
+    stats = Stats()
+    started = time.monotonic()
+    deadline = started + args.duration
+    await asyncio.gather(*(sensor_node(i, args, stats, started, deadline) for i in range(args.sensors)))
+    return stats.summary(time.monotonic() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='Base URL of the fog API')
+    parser.add_argument('--sensors', type=int, default=100, help='Number of simulated nodes')
+    parser.add_argument('--interval', type=float, default=3.0, help='Seconds between readings of a node')
+    parser.add_argument('--duration', type=float, default=60.0, help='Test duration in seconds')
+    parser.add_argument('--scenario', choices=SCENARIOS, default='normal', help='Reading pattern')
+    parser.add_argument('--event-fraction', type=float, default=0.3, help='Fraction of nodes in the fog event')
+    parser.add_argument('--event-start', type=float, default=10.0, help='Fog event start (s from test start)')
+    parser.add_argument('--event-duration', type=float, default=30.0, help='Fog event duration (s)')
+    parser.add_argument('--camera-id', help='camera_id query parameter to send')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    if urlsplit(args.url).scheme != 'http':
+        parser.error('Only http:// URLs are supported')
+
+    summary = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    latency, camera, backlog = summary['latency_ms'], summary['camera_analysis'], summary['backlog']
+    print(f"{args.sensors} sensors, scenario '{args.scenario}', {summary['elapsed_s']} s")
+    print(f"  requests:        {summary['requests']} ({summary['throughput_rps']} req/s)  "
+          f"status {summary['status_codes']}")
+    print(f"  latency ms:      p50 {latency['p50']}  p90 {latency['p90']}  p99 {latency['p99']}  "
+          f"max {latency['max']}")
+    print(f"  camera analysis: {camera['count']} ({camera['rate_per_s']}/s, {camera['fraction']:.1%} of readings)")
+    print(f"  upload failures: {summary['upload_failures']}")
+    print(f"  backlog:         peak in flight {backlog['peak_in_flight']}  "
+          f"lag p50 {backlog['lag_p50_s']} s  p99 {backlog['lag_p99_s']} s  max {backlog['lag_max_s']} s")
+
+    if any(not code.startswith('2') for code in summary['status_codes']):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""
+Synthetic scenes and local stand-ins shared by the benchmarks.
+
+Frames are generated deterministically (seeded) so runs are comparable
+between commits:
+
+    clear  textured, saturated street-like scene with sharp edges
+    fog    the clear scene washed out towards bright gray (low contrast/saturation)
+    smoke  the clear scene with localized, blurred gray plumes
+    smog   the clear scene with a blurred yellow-brown haze
+
+FakeCamera replaces the network stream of a CameraUtil and FakeCloud is a
+local HTTP endpoint accepting the cloud uploads.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+import cv2
+import numpy as np
+from app.utils.camera_util import CameraUtil
+
+SCENES = ('clear', 'fog', 'smoke', 'smog')
+RESOLUTIONS: Dict[str, Tuple[int, int]] = {
+    '480p': (480, 640),
+    '720p': (720, 1280),
+    '1080p': (1080, 1920),
+}
+
+
+def make_frame(scene: str, shape: Tuple[int, int] = (480, 640), seed: int = 0) -> np.ndarray:
+    """
+    Generate a synthetic BGR frame.
+
+    Args:
+        scene: One of SCENES
+        shape: (height, width)
+        seed: Random seed (same seed, same frame)
+
+    Returns:
+        uint8 BGR frame
+    """
+    if scene not in SCENES:
+        raise ValueError(f"Unknown scene '{scene}' (expected one of {SCENES})")
+
+    rng = np.random.default_rng(seed)
+    h, w = shape
+    frame = np.empty((h, w, 3), dtype=np.uint8)
+    frame[:] = (170, 140, 110)
+
+    # Buildings/objects: saturated rectangles with sharp edges
+    for _ in range(40):
+        x0, y0 = int(rng.integers(0, w)), int(rng.integers(h // 4, h))
+        x1, y1 = x0 + int(rng.integers(w // 20, w // 5)), y0 + int(rng.integers(h // 20, h // 3))
+        color = tuple(int(c) for c in rng.integers(0, 256, 3))
+        cv2.rectangle(frame, (x0, y0), (x1, y1), color, -1)
+    noise = rng.normal(0, 6, frame.shape)
+    frame = np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+    if scene == 'fog':
+        haze = np.full_like(frame, 175)
+        frame = cv2.addWeighted(cv2.GaussianBlur(frame, (0, 0), 3), 0.2, haze, 0.8, 0)
+    elif scene == 'smoke':
+        plume = np.zeros((h, w), dtype=np.float32)
+        for _ in range(4):
+            center = (int(rng.integers(0, w)), int(rng.integers(0, h)))
+            cv2.circle(plume, center, int(min(h, w) * rng.uniform(0.1, 0.25)), 1.0, -1)
+        plume = cv2.GaussianBlur(plume, (0, 0), min(h, w) / 20)[:, :, np.newaxis] * 0.85
+        gray = np.full_like(frame, 120, dtype=np.float32)
+        frame = (frame * (1 - plume) + gray * plume).astype(np.uint8)
+    elif scene == 'smog':
+        tint = np.empty_like(frame)
+        tint[:] = (60, 140, 170)
+        frame = cv2.addWeighted(cv2.GaussianBlur(frame, (0, 0), 2), 0.45, tint, 0.55, 0)
+
+    return frame
+
+
+def make_frames(scene: str, shape: Tuple[int, int], count: int, seed: int = 0) -> List[np.ndarray]:
+    """
+    Generate a short clip: one scene with per-frame sensor noise.
+
+    Frames differ slightly (like a real static camera), so frame grouping
+    behaves as it would on a live stream.
+    """
+    base = make_frame(scene, shape, seed)
+    rng = np.random.default_rng(seed + 1)
+    return [
+        np.clip(base + rng.normal(0, 2, base.shape), 0, 255).astype(np.uint8)
+        for _ in range(count)
+    ]
+
+
+class FakeCamera(CameraUtil):
+    """CameraUtil serving pre-generated frames instead of an HTTP stream."""
+
+    def __init__(self, frames: List[np.ndarray], camera_id: str = 'default', frame_interval: float = 0.0,
+                 roi=None):
+        """
+        Initialize the fake camera.
+
+        Args:
+            frames: Frames to serve (cycled)
+            camera_id: Camera id inside the registry
+            frame_interval: Seconds per frame read (simulates the stream rate)
+            roi: Optional region of interest (see CameraUtil)
+        """
+        super().__init__(camera_ip='127.0.0.1', camera_id=camera_id, roi=roi)
+        self.frames = frames
+        self.frame_interval = frame_interval
+        self.reads = 0
+
+    def capture_frames(self, num_frames: int = 24, delay: float = 0.1,
+                       stop_condition: Optional[Callable[[np.ndarray], bool]] = None,
+                       timer=None) -> List[np.ndarray]:
+        captured = []
+        for i in range(num_frames):
+            if self.frame_interval > 0:
+                time.sleep(self.frame_interval)
+            captured.append(self.frames[self.reads % len(self.frames)].copy())
+            self.reads += 1
+            if stop_condition is not None and len(captured) == 1 and stop_condition(captured[0]):
+                break
+        return captured
+
+
+class FakeCloud:
+    """
+    Local HTTP endpoint standing in for the API Gateway /sensor-data route.
+
+    Usage:
+        with FakeCloud() as cloud:
+            controller.cloud_api_url = cloud.url
+    """
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Initialize the endpoint (not started).
+
+        Args:
+            latency: Seconds to wait before answering each upload
+        """
+        self.latency = latency
+        self.uploads = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeCloud':
+        cloud = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if cloud.latency > 0:
+                    time.sleep(cloud.latency)
+                with cloud._lock:
+                    cloud.uploads += 1
+                body = json.dumps({'success': True}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'FakeCloud':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
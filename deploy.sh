@@ -55,6 +55,11 @@ echo ""
 
 cd "./deployment"  # Ir al directorio del script
 
+# Preparar la capa compartida de las Lambdas (router, clientes AWS, orjson)
+print_info "Preparando capa compartida de Lambda..."
+./build_layer.sh
+echo ""
+
 # Inicializar OpenTofu
 print_info "Inicializando OpenTofu..."
 tofu init
@@ -0,0 +1,28 @@
+#!/bin/bash
+
+# Prepara la capa compartida de las funciones Lambda en
+# deployment/.terraform/lambda_layer (empaquetada por lambda.tf):
+#   python/  módulos de lambda_functions/shared + dependencias (orjson)
+
+set -e
+
+DEPLOYMENT_DIR="$(cd "$(dirname "$0")" && pwd)"
+SHARED_DIR="${DEPLOYMENT_DIR}/../lambda_functions/shared"
+LAYER_DIR="${DEPLOYMENT_DIR}/.terraform/lambda_layer"
+
+rm -rf "${LAYER_DIR}"
+mkdir -p "${LAYER_DIR}/python"
+
+cp "${SHARED_DIR}"/*.py "${LAYER_DIR}/python/"
+
+# Wheels para el runtime de Lambda (python3.11, x86_64), no los del equipo local
+pip install \
+    --quiet \
+    --requirement "${SHARED_DIR}/requirements.txt" \
+    --target "${LAYER_DIR}/python" \
+    --platform manylinux2014_x86_64 \
+    --implementation cp \
+    --python-version 3.11 \
+    --only-binary=:all:
+
+echo "Capa Lambda preparada en ${LAYER_DIR}"
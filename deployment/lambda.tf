@@ -16,6 +16,23 @@ data "archive_file" "lambda_functions" {
   output_path = "${path.module}/.terraform/lambda_zips/${each.key}.zip"
 }
 
+# Capa compartida: router, respuestas, fast_json, clientes AWS y orjson.
+# build_layer.sh la prepara en .terraform/lambda_layer antes del plan.
+data "archive_file" "shared_layer" {
+  type        = "zip"
+  source_dir  = "${path.module}/.terraform/lambda_layer"
+  output_path = "${path.module}/.terraform/lambda_zips/shared_layer.zip"
+}
+
+resource "aws_lambda_layer_version" "shared" {
+  filename                 = data.archive_file.shared_layer.output_path
+  layer_name               = "${var.project_name}-shared"
+  description              = "Runtime compartido de las funciones Lambda"
+  source_code_hash         = data.archive_file.shared_layer.output_base64sha256
+  compatible_runtimes      = ["python3.11"]
+  compatible_architectures = ["x86_64"]
+}
+
 # Lambda Function: Insertar datos de sensores
 resource "aws_lambda_function" "insert_sensor_data" {
   filename         = data.archive_file.lambda_functions["insert_sensor_data"].output_path
@@ -24,6 +41,7 @@ resource "aws_lambda_function" "insert_sensor_data" {
   handler         = "insert_sensor_data.lambda_handler"
   source_code_hash = data.archive_file.lambda_functions["insert_sensor_data"].output_base64sha256
   runtime         = "python3.11"
+  layers          = [aws_lambda_layer_version.shared.arn]
   timeout         = 30
 
   environment {
@@ -51,6 +69,7 @@ resource "aws_lambda_function" "insert_sensor_status" {
   handler         = "insert_sensor_status.lambda_handler"
   source_code_hash = data.archive_file.lambda_functions["insert_sensor_status"].output_base64sha256
   runtime         = "python3.11"
+  layers          = [aws_lambda_layer_version.shared.arn]
   timeout         = 30
 
   environment {
@@ -72,6 +91,7 @@ resource "aws_lambda_function" "send_alerts" {
   handler         = "send_alerts.lambda_handler"
   source_code_hash = data.archive_file.lambda_functions["send_alerts"].output_base64sha256
   runtime         = "python3.11"
+  layers          = [aws_lambda_layer_version.shared.arn]
   timeout         = 30
 
   environment {
@@ -94,6 +114,7 @@ resource "aws_lambda_function" "get_sensor_data" {
   handler         = "get_sensor_data.lambda_handler"
   source_code_hash = data.archive_file.lambda_functions["get_sensor_data"].output_base64sha256
   runtime         = "python3.11"
+  layers          = [aws_lambda_layer_version.shared.arn]
   timeout         = 30
 
   environment {
@@ -115,6 +136,7 @@ resource "aws_lambda_function" "get_ml_detection" {
   handler         = "get_ml_detection.lambda_handler"
   source_code_hash = data.archive_file.lambda_functions["get_ml_detection"].output_base64sha256
   runtime         = "python3.11"
+  layers          = [aws_lambda_layer_version.shared.arn]
   timeout         = 30
 
   environment {
@@ -136,6 +158,7 @@ resource "aws_lambda_function" "get_alerts" {
   handler         = "get_alerts.lambda_handler"
   source_code_hash = data.archive_file.lambda_functions["get_alerts"].output_base64sha256
   runtime         = "python3.11"
+  layers          = [aws_lambda_layer_version.shared.arn]
   timeout         = 30
 
   environment {
@@ -158,6 +181,7 @@ resource "aws_lambda_function" "get_sensor_status" {
   handler         = "get_sensor_status.lambda_handler"
   source_code_hash = data.archive_file.lambda_functions["get_sensor_status"].output_base64sha256
   runtime         = "python3.11"
+  layers          = [aws_lambda_layer_version.shared.arn]
   timeout         = 30
 
   environment {
@@ -179,6 +203,7 @@ resource "aws_lambda_function" "check_sensor_status" {
   handler         = "check_sensor_status.lambda_handler"
   source_code_hash = data.archive_file.lambda_functions["check_sensor_status"].output_base64sha256
   runtime         = "python3.11"
+  layers          = [aws_lambda_layer_version.shared.arn]
   timeout         = 60
 
   environment {
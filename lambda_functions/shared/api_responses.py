@@ -0,0 +1,32 @@
+"""
+Construcción de respuestas para API Gateway (proxy, payload 1.0 y 2.0).
+"""
+
+from fast_json import dumps
+
+# Cabeceras de todas las respuestas JSON (CORS abierto, como el API Gateway)
+JSON_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*'
+}
+
+
+class BadRequest(ValueError):
+    """Error del cliente: se responde con 400 y el mensaje"""
+
+
+def json_response(body, status=200, headers=None):
+    """Respuesta con body JSON serializado con fast_json"""
+    response_headers = dict(JSON_HEADERS)
+    if headers:
+        response_headers.update(headers)
+    return {
+        'statusCode': status,
+        'headers': response_headers,
+        'body': dumps(body)
+    }
+
+
+def error_response(message, status=500):
+    """Respuesta de error {'error': message}"""
+    return json_response({'error': message}, status)
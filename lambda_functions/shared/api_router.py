@@ -0,0 +1,117 @@
+"""
+Router ligero para los handlers Lambda.
+
+Normaliza el evento (API Gateway payload 1.0 o 2.0, o invocación directa
+desde otra Lambda o EventBridge), despacha por método HTTP y convierte el
+resultado en la respuesta de API Gateway:
+
+    router = Router('get_sensor_data')
+
+    @router.route('GET', 'DIRECT')
+    def get_sensor_data(request):
+        return {'count': 0, 'data': []}       # 200 con body JSON
+
+    lambda_handler = router
+
+Un handler puede devolver un dict (body de un 200), una tupla (body,
+status) o una respuesta ya construida (dict con 'statusCode'). BadRequest
+se responde con 400 y cualquier otra excepción con 500.
+"""
+
+import base64
+
+from fast_json import loads
+from api_responses import BadRequest, error_response, json_response
+
+# Pseudo-método de las invocaciones que no vienen de API Gateway
+DIRECT = 'DIRECT'
+
+
+class Request:
+    """Evento normalizado que recibe el handler"""
+
+    __slots__ = ('event', 'context', 'method', '_body')
+
+    def __init__(self, event, context, method):
+        self.event = event
+        self.context = context
+        self.method = method
+        self._body = None
+
+    @property
+    def direct(self):
+        """True si la invocación no viene de API Gateway"""
+        return self.method == DIRECT
+
+    @property
+    def query(self):
+        """Parámetros de query (dict vacío si no hay)"""
+        return self.event.get('queryStringParameters') or {}
+
+    @property
+    def body(self):
+        """
+        Body JSON parseado (dict vacío si no hay).
+
+        En una invocación directa sin 'body', el propio evento es el payload.
+        """
+        if self._body is None:
+            if 'body' in self.event or not self.direct:
+                body = self.event.get('body')
+                if isinstance(body, str) and body:
+                    if self.event.get('isBase64Encoded'):
+                        body = base64.b64decode(body)
+                    try:
+                        body = loads(body)
+                    except ValueError:
+                        raise BadRequest('Body must be valid JSON')
+                self._body = body or {}
+            else:
+                self._body = self.event
+        return self._body
+
+
+class Router:
+    """Despacha los eventos de una función Lambda a sus handlers"""
+
+    def __init__(self, name):
+        """
+        Args:
+            name: Nombre de la función (para los logs)
+        """
+        self.name = name
+        self._routes = {}
+
+    def route(self, *methods):
+        """Registra el handler para estos métodos HTTP (y/o DIRECT)"""
+        def register(handler):
+            for method in methods:
+                self._routes[method.upper()] = handler
+            return handler
+        return register
+
+    def __call__(self, event, context=None):
+        if isinstance(event, (str, bytes)):
+            event = loads(event)
+        if not isinstance(event, dict):
+            event = {'body': event}
+
+        method = event.get('httpMethod') or (event.get('requestContext') or {}).get('http', {}).get('method')
+        method = method.upper() if method else DIRECT
+        handler = self._routes.get(method)
+        if handler is None:
+            return error_response(f'Method {method} not allowed', 405)
+
+        try:
+            result = handler(Request(event, context, method))
+        except BadRequest as e:
+            return error_response(str(e), 400)
+        except Exception as e:
+            print(f"Error in {self.name}: {str(e)}")
+            return error_response(str(e), 500)
+
+        if isinstance(result, tuple):
+            return json_response(*result)
+        if isinstance(result, dict) and 'statusCode' in result:
+            return result
+        return json_response(result)
@@ -0,0 +1,69 @@
+"""
+Clientes de AWS compartidos por las funciones Lambda.
+
+Los clientes y tablas se crean en el primer uso y se reutilizan en las
+invocaciones siguientes del mismo contenedor, manteniendo abiertas sus
+conexiones (pool de urllib3 con TCP keep-alive). Una función que responde
+sin tocar AWS (por ejemplo un 400) no paga su creación.
+
+Configuración (variables de entorno):
+    AWS_MAX_POOL_CONNECTIONS  conexiones por cliente (10)
+    AWS_MAX_ATTEMPTS          intentos por llamada, modo de reintentos 'standard' (3)
+    AWS_CONNECT_TIMEOUT       segundos para conectar (2)
+    AWS_READ_TIMEOUT          segundos de espera de respuesta (5)
+"""
+
+import os
+
+_config = None
+_clients = {}
+_tables = {}
+_dynamodb = None
+
+
+def config():
+    """Configuración de botocore común a todos los clientes"""
+    global _config
+    if _config is None:
+        from botocore.config import Config  # type: ignore
+        _config = Config(
+            tcp_keepalive=True,
+            max_pool_connections=int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '10')),
+            connect_timeout=float(os.environ.get('AWS_CONNECT_TIMEOUT', '2')),
+            read_timeout=float(os.environ.get('AWS_READ_TIMEOUT', '5')),
+            retries={
+                'mode': 'standard',
+                'max_attempts': int(os.environ.get('AWS_MAX_ATTEMPTS', '3'))
+            }
+        )
+    return _config
+
+
+def client(service):
+    """Cliente de bajo nivel de boto3 (sns, lambda, ...), creado una vez por contenedor"""
+    found = _clients.get(service)
+    if found is None:
+        import boto3  # type: ignore
+        found = _clients[service] = boto3.client(service, config=config())
+    return found
+
+
+def table(name):
+    """Tabla de DynamoDB por nombre, sobre un único resource compartido"""
+    global _dynamodb
+    found = _tables.get(name)
+    if found is None:
+        if _dynamodb is None:
+            import boto3  # type: ignore
+            _dynamodb = boto3.resource('dynamodb', config=config())
+        found = _tables[name] = _dynamodb.Table(name)
+    return found
+
+
+def reset():
+    """Descarta los clientes creados (pruebas locales)"""
+    global _config, _dynamodb
+    _config = None
+    _dynamodb = None
+    _clients.clear()
+    _tables.clear()
@@ -0,0 +1,39 @@
+"""
+Serialización JSON compartida por las funciones Lambda.
+
+Usa orjson cuando está disponible (recorre la respuesta en una sola pasada
+en C) y json de la librería estándar si no. En ambos casos los Decimal de
+DynamoDB se convierten con decimal_default, como hacía cada handler; otro
+tipo no serializable lanza TypeError.
+"""
+
+import json
+from decimal import Decimal
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - depende del paquete desplegado
+    orjson = None
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def decimal_default(obj):
+    """Helper para serializar Decimal a JSON"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj) -> str:
+    """Serializa obj a un string JSON compacto (body de API Gateway o payload de Lambda/SNS)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=decimal_default, option=_ORJSON_OPTIONS).decode('utf-8')
+    return json.dumps(obj, default=decimal_default, separators=(',', ':'))
+
+
+def loads(data):
+    """Parsea un string o bytes JSON"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)